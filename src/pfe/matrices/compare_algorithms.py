@@ -19,6 +19,8 @@ from pfe.matrices.plot_heatmap import plot_matrix
 from pfe.matrices.semiusefull_stuff import get_year_from_filename, get_mapping
 from pfe.misc.log import Pretty
 from pfe.misc.style import blue, magenta
+from pfe.tasks.contingency import Contingency
+from pfe.tasks.partition import Partition, read
 
 
 def jaccard(x: set, y: set):
@@ -46,21 +48,17 @@ def difference_matrix_collaborations(algorithm: str, nice_2018: Path, graph_2018
         # to keep only needed nodes
         # nx.subgraph(graph, subset).copy()
 
-        with open(nice_2018 / f'{algorithm}_communities.json', 'r') as file:
-            communities_2018 = json.load(file)
+        communities_2018 = read(nice_2018, algorithm).as_dict()
 
         for year in range(_from, 2018):
             nice_year = Path(f'test-data/COMP-data/graph/nice/by_year/int/nx_comp_nice_{year}_int_graph')
             graph_year = nx.read_graphml(f'test-data/COMP-data/graph/nice/by_year/int/nx_comp_nice_{year}_int_graph.xml')
 
             log.info(f'Reading communities {year}.')
-            with open(nice_year / f'{algorithm}_communities.json', 'r') as file:
-                communities_year = json.load(file)
+            partition_year = read(nice_year, algorithm)
 
-            with open(nice_year / f'{algorithm}_author-community.json', 'r') as file:
-                authors_year = dict(json.load(file))
-
-            authors_year = set([int(k) for k in authors_year.keys()])
+            communities_year = partition_year.as_dict()
+            authors_year = set(partition_year.nodes.tolist())
 
             m_communities = len(communities_2018.keys())
             n_communities = len(communities_year.keys())
@@ -101,65 +99,48 @@ def difference_matrix_by_year_members(algorithm: str, nice_2018: Path, _from=201
     # nice_2018 = Path('test-data/COMP-data/graph/nice/by_year/int/nx_comp_nice_2018_int_graph')
 
     log.info(f'Reading communities {2018}.')
-    with open(nice_2018 / f'{algorithm}_communities.json', 'r') as file:
-        communities_2018 = json.load(file)
+    partition_2018 = read(nice_2018, algorithm)
 
-    print('2018 communities:', len(communities_2018
-                                   ))
+    print('2018 communities:', len(partition_2018))
 
     for year in range(_from, 2018):
         nice_year = Path(f'test-data/COMP-data/graph/nice/by_year/int/nx_comp_nice_{year}_int_graph')
 
         log.info(f'Reading communities {year}.')
-        with open(nice_year / f'{algorithm}_communities.json', 'r') as file:
-            communities_year = json.load(file)
-
-        with open(nice_year / f'{algorithm}_author-community.json', 'r') as file:
-            authors_year = dict(json.load(file))
+        partition_year = read(nice_year, algorithm)
 
-        authors_year = set([int(k) for k in authors_year.keys()])
-
-        m_communities = len(communities_2018.keys())
-        n_communities = len(communities_year.keys())
-        matrix = np.zeros(shape=(m_communities, n_communities))
+        m_communities = len(partition_2018)
+        n_communities = len(partition_year)
 
         with log.scope.info('Filling matrix...'):
-            for c_18 in communities_2018.keys():
-                for c_year in communities_year.keys():
-                    members_18 = set(communities_2018[c_18]).intersection(authors_year)
-                    members_year = set(communities_year[c_year])
-
-                    diff = len(members_year.intersection(members_18))/len(members_year)
-
-                    matrix[int(c_18), int(c_year)] = diff
+            table = Contingency.of(partition_2018, partition_year)
+            matrix = table.containment(rows=False).toarray()
 
         np.savetxt(nice_year / f'mtr_similarities_{algorithm}_18_{year - 2000}_per_members.csv', matrix, fmt='%.4f')
         m = pd.DataFrame(matrix, [str(i) for i in range(m_communities)], [str(i) for i in range(n_communities)])
 
-        print(year, ' communities', len(communities_year))
+        print(year, ' communities', len(partition_year))
         m, best_matching = sort_matrix(m, year=year)
 
-        all_authors = sum(len(communities_year[c]) for c in communities_year.keys())
+        sizes_year = partition_year.sizes()
+        all_authors = int(sizes_year.sum())
 
         some = []
         stayed = 0
         total = 0
         for c_year, c_18, _ in best_matching:
-            c_18 = str(c_18)
-            c_year = str(c_year)
-            members_18 = set(communities_2018[c_18])
-            members_year = set(communities_year[c_year])
+            members_stayed_in = int(table.table[int(c_18), int(c_year)])
+            members_year = int(sizes_year[int(c_year)])
 
-            members_stayed_in = len(members_year.intersection(members_18))
             some.append({
                 'year': year,
-                'from_community': c_year,
-                'in_community': c_18,
+                'from_community': str(c_year),
+                'in_community': str(c_18),
                 'stayed': members_stayed_in,
-                'total': len(members_year)
+                'total': members_year
             })
 
-            total += len(members_year)
+            total += members_year
             stayed += members_stayed_in
 
         print('Total in community: ', total)
@@ -176,7 +157,7 @@ def difference_matrix_by_year_members(algorithm: str, nice_2018: Path, _from=201
         #             title=f'Similarities between {algorithm} 2018-{year}\n'
         #                   f'|Members({year}) ∩ Members(2018)|/'
         #                   f'|Members({year})|',
-        #             subtitle=f'{len(communities_2018)} communities in 2018 & {len(communities_year)} communities in {year}',
+        #             subtitle=f'{m_communities} communities in 2018 & {n_communities} communities in {year}',
         #             xlabel=f'{year}',
         #             ylabel='2018',
         #             prob=True)
@@ -189,7 +170,7 @@ def difference_matrix_by_year_members(algorithm: str, nice_2018: Path, _from=201
         #                   f'Transposed\n'
         #                   f'|Members({year}) ∩ Members(2018)|/'
         #                   f'|Members({year})|',
-        #             subtitle=f'{len(communities_2018)} communities in 2018 & {len(communities_year)} communities in {year}',
+        #             subtitle=f'{m_communities} communities in 2018 & {n_communities} communities in {year}',
         #             ylabel=f'{year}',
         #             xlabel='2018',
         #             prob=True)
@@ -201,34 +182,20 @@ def difference_matrix_by_year_members_jaccard(algorithm: str, nice_2018: Path, _
     # nice_2018 = Path('test-data/COMP-data/graph/nice/by_year/int/nx_comp_nice_2018_int_graph')
 
     log.info(f'Reading communities {2018}.')
-    with open(nice_2018 / f'{algorithm}_communities.json', 'r') as file:
-        communities_2018 = json.load(file)
+    partition_2018 = read(nice_2018, algorithm)
 
     for year in range(_from, 2018):
         nice_year = Path(f'test-data/COMP-data/graph/nice/by_year/int/nx_comp_nice_{year}_int_graph')
 
         log.info(f'Reading communities {year}.')
-        with open(nice_year / f'{algorithm}_communities.json', 'r') as file:
-            communities_year = json.load(file)
-
-        with open(nice_year / f'{algorithm}_author-community.json', 'r') as file:
-            authors_year = dict(json.load(file))
-
-        authors_year = set([int(k) for k in authors_year.keys()])
+        partition_year = read(nice_year, algorithm)
 
-        m_communities = len(communities_2018.keys())
-        n_communities = len(communities_year.keys())
-        matrix = np.zeros(shape=(m_communities, n_communities))
+        m_communities = len(partition_2018)
+        n_communities = len(partition_year)
 
         with log.scope.info('Filling matrix...'):
-            for c_18 in communities_2018.keys():
-                for c_year in communities_year.keys():
-                    members_18 = set(communities_2018[c_18]).intersection(authors_year)
-                    members_year = set(communities_year[c_year])
-
-                    diff = jaccard(members_year, members_18)
-
-                    matrix[int(c_18), int(c_year)] = diff
+            # Communities of 2018 are restricted to authors of the year (unlike communities of the year).
+            matrix = Contingency.of(partition_2018, partition_year).restricted(columns=False).jaccard().toarray()
 
         np.savetxt(nice_year / f'mtr_similarities_{algorithm}_18_{year-2000}_jac_members.csv', matrix, fmt='%.4f')
 
@@ -237,7 +204,7 @@ def difference_matrix_by_year_members_jaccard(algorithm: str, nice_2018: Path, _
 
         plot_matrix(m, f'similarities_{algorithm}_18_{year-2000}_jac_members', nice_year,
                     title=f'Similarities between {algorithm} 2018-{year}\nJaccard index by members of 2 communities',
-                    subtitle=f'{len(communities_2018)} communities in 2018 & {len(communities_year)} communities in {year}',
+                    subtitle=f'{m_communities} communities in 2018 & {n_communities} communities in {year}',
                     xlabel=f'{year}',
                     ylabel='2018',
                     prob=True)
@@ -249,33 +216,29 @@ def difference_matrix_leidens(path_to_files: Path):
     # path_to_files = Path('test-data/COMP-data/graph/nice/by_year/int/nx_comp_nice_1993_int_graph')
 
     log.info('Reading communities.')
-    with open(path_to_files / 'leiden_communities.json', 'r') as file:
-        leiden_communities = json.load(file)
+    leiden = read(path_to_files, 'leiden')
 
     log.info('Reading communities.')
-    with open(path_to_files / 'ig_leiden_communities.json', 'r') as file:
-        louvain_communities = json.load(file)
+    ig_leiden = read(path_to_files, 'ig_leiden')
 
-    m_communities = len(leiden_communities.keys())
-    n_communities = len(louvain_communities.keys())
-    matrix = np.zeros(shape=(m_communities, n_communities))
-
-    with log.scope.info('Filling matrix...'):
-        for c_leiden in leiden_communities.keys():
-            for c_louvain in louvain_communities.keys():
-                leiden_members = set(leiden_communities[c_leiden])
-                mapping = {}
-                with open(get_mapping(path_to_files, path_to_files), 'r') as file:
-                    reader = csv.reader(file)
-                    for row in reader:
-                        mapping[int(row[1])] = int(row[0])
+    mapping = {}
+    with open(get_mapping(path_to_files, path_to_files), 'r') as file:
+        reader = csv.reader(file)
+        for row in reader:
+            mapping[int(row[1])] = int(row[0])
 
-                louvain_members = set([mapping[i] for i in louvain_communities[c_louvain] if i != 0])
+    # Map `igraph` vertices to node IDs (the vertex 0 is not a node).
+    vertices = np.asarray(ig_leiden.nodes)
+    vertices = vertices[vertices != 0]
+    ids = np.fromiter((mapping[i] for i in vertices.tolist()), dtype=np.int64, count=len(vertices))
+    order = np.argsort(ids)
+    ig_leiden = Partition.of(ids[order], ig_leiden.communities_of(vertices)[order])
 
-                # diff = jaccard(leiden_members, louvain_members)
-                diff = len(leiden_members.intersection(louvain_members)) / len(leiden_members)
+    m_communities = len(leiden)
+    n_communities = len(ig_leiden)
 
-                matrix[int(c_leiden), int(c_louvain)] = diff
+    with log.scope.info('Filling matrix...'):
+        matrix = Contingency.of(leiden, ig_leiden).containment().toarray()
 
     np.savetxt(path_to_files / f'mtr_similarities_leiden_ig_cdlib_per.csv', matrix, fmt='%.4f')
 
@@ -301,27 +264,16 @@ def difference_matrix_leiden_louvain(path_to_files: Path):
     #                 difference_matrix_leiden_louvain(subfolder)
 
     log.info('Reading communities.')
-    with open(path_to_files / 'leiden_communities.json', 'r') as file:
-        leiden_communities = json.load(file)
+    leiden = read(path_to_files, 'leiden')
 
     log.info('Reading communities.')
-    with open(path_to_files / 'louvain_communities.json', 'r') as file:
-        louvain_communities = json.load(file)
+    louvain = read(path_to_files, 'louvain')
 
-    m_communities = len(leiden_communities.keys())
-    n_communities = len(louvain_communities.keys())
-    matrix = np.zeros(shape=(m_communities, n_communities))
+    m_communities = len(leiden)
+    n_communities = len(louvain)
 
     with log.scope.info('Filling matrix...'):
-        for c_leiden in leiden_communities.keys():
-            for c_louvain in louvain_communities.keys():
-                leiden_members = set(leiden_communities[c_leiden])
-                louvain_members = set(louvain_communities[c_louvain])
-
-                # diff = jaccard(leiden_members, louvain_members)
-                diff = len(leiden_members.intersection(louvain_members)) / len(leiden_members)
-
-                matrix[int(c_leiden), int(c_louvain)] = diff
+        matrix = Contingency.of(leiden, louvain).containment().toarray()
 
     np.savetxt(path_to_files / f'similarities_leiden_louvain_per.csv', matrix, fmt='%.4f')
 
@@ -14,14 +14,14 @@ from pfe.matrices.plot_heatmap import plot_matrix
 from pfe.misc.log import Pretty
 from pfe.misc.style import blue
 from pfe.parse import publications_in
+from pfe.tasks.partition import read
 import matplotlib.pyplot as plt
 
 def p_matrix_year(year, graph, diagonal:bool, log=Pretty()):
     data_path_18 = Path('test-data/COMP-data/graph/nice/by_year/int/nx_comp_nice_2018_int_graph')
 
     with log.scope.info('Reading communities ...'):
-        with open(data_path_18 / 'leiden_author-community.json', 'r') as file:
-            communities = json.load(file)
+        communities = read(data_path_18, 'leiden').as_author_dict()
 
     with log.scope.info('Collecting statistics...'):
 
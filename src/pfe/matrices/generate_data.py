@@ -8,12 +8,14 @@ import igraph as ig
 
 from os.path import basename
 from pathlib import Path
+from typing import Optional
 
 from pfe.matrices.semiusefull_stuff import get_year_from_filename
 from pfe.misc.log import Pretty, Log
 from pfe.misc.style import blue, underlined, magenta
 from pfe.parse import publications_in
-from pfe.tasks.communities import leiden_nx, louvain
+from pfe.tasks.communities import ALGORITHMS, arrays_of, detect, modularity, without_singletons
+from pfe.tasks.partition import Partition, read
 
 
 # data = Path('test-data/COMP-data')
@@ -21,33 +23,33 @@ from pfe.tasks.communities import leiden_nx, louvain
 # new_data = Path('test-data/COMP-data')
 
 
-def create_data(graph: nx.Graph, new_data: Path, algorithm: str, publications_till=2018, log_file=Path(''), log=Pretty()):
-    if algorithm == 'leiden':
-        leiden_nx(graph, new_data, log)
-    elif algorithm == 'louvain':
-        louvain(graph, new_data, log)
-    else:
+def create_data(graph: nx.Graph, new_data: Path, algorithm: str, publications_till=2018, log_file=Path(''), log=Pretty(),
+                cache: Optional[Path] = Path('.communities')):
+    if algorithm not in ALGORITHMS:
         m = f'Wrong name of the algorithm.\n'\
-            f'Got {algorithm}, expected \'leiden\' or \'louvain\''
+            f'Got {algorithm}, expected one of {list(ALGORITHMS)}'
         log.error(m)
         raise Exception(m)
 
+    # Detection is skipped if the graph and the algorithm did not change since the last run.
+    arrays = arrays_of(graph)
+    membership = detect(arrays, algorithm, cache=cache, log=log)
+
+    nodes, score = arrays[0], modularity(arrays, membership)
 
-    log.info('Reading communities.')
-    with open(new_data / f'{algorithm}_communities.json', 'r') as file:
-            communities = json.load(file)
+    # Singletons of the Leiden method are not saved (as in partitions of `cdlib`, which were used before).
+    if algorithm == 'leiden':
+        nodes, membership = without_singletons(nodes, membership)
 
-    new_dict = {}
+    partition = Partition.of(nodes, membership, algorithm=algorithm, seed=0, modularity=score)
 
-    for k_community, v_authors in communities.items():
-        for author in v_authors:
-            new_dict[str(author)] = int(k_community)
+    log.info('Saving communities into a file...')
+    partition.save(new_data / f'{algorithm}.partition')
 
-    communities = new_dict
+    with open(new_data / 'graph.log', 'a+') as file:
+        file.write(f'{algorithm.capitalize()}: {score}\n')
 
-    log.info('Saving author-community into a file...')
-    with open(new_data / f'{algorithm}_author-community.json', 'w') as file:
-        json.dump(communities, file)
+    communities = partition.as_author_dict()
 
     node_list = [int(x) for x in graph.nodes()]
 
@@ -167,8 +169,7 @@ def generate_data_for_algorithms(graph_folders):
                             copyfile(graph_file, new_subdirectory/basename(graph_file))
                             graph = nx.read_graphml(new_subdirectory/basename(graph_file))
 
-                            with open(new_subdirectory / f'{algorithm}_author-community.json', 'r') as file:
-                                author_community = dict(json.load(file))
+                            author_community = read(new_subdirectory, algorithm).as_author_dict()
 
                             # graph.remove_nodes_from([node for node in graph.nodes() if node not in author_community.keys()])
 
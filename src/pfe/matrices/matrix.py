@@ -9,6 +9,7 @@ import networkx as nx
 
 from pfe.misc.log import Pretty
 from pfe.misc.style import blue, magenta
+from pfe.tasks.partition import read
 
 
 def difference(matr_18: np.ndarray, matr_year: np.ndarray):
@@ -41,36 +42,19 @@ def sort_matrix(df: pd.DataFrame, year=0):
 
 
 def number_of_communities(louvain, data_path, log=Pretty()):
-    if louvain:
-        log.warn('Louvain')
-        with log.scope.info('Reading communities ...'):
-            with open(data_path / 'louvain_communities.json', 'r') as file:
-                communities = json.load(file)
-    else:
-        log.warn('Leiden')
-        with log.scope.info('Reading communities ...'):
-            with open(data_path / 'leiden_communities.json', 'r') as file:
-                communities = json.load(file)
+    log.warn('Louvain' if louvain else 'Leiden')
 
-    return len([x for x in communities.keys()])
+    with log.scope.info('Reading communities ...'):
+        partition = read(data_path, 'louvain' if louvain else 'leiden')
 
+    return len(partition)
 
-def community_sizes(louvain, data_path, log=Pretty()):
-    if louvain:
-        with log.scope.info('Reading communities ...'):
-            with open(data_path / 'louvain_communities.json', 'r') as file:
-                communities = json.load(file)
-    else:
-        with log.scope.info('Reading communities ...'):
-            with open(data_path / 'leiden_communities.json', 'r') as file:
-                communities = json.load(file)
 
-    community_size = {}
-
-    for c in communities.keys():
-        community_size[c] = len(communities[c])
+def community_sizes(louvain, data_path, log=Pretty()):
+    with log.scope.info('Reading communities ...'):
+        partition = read(data_path, 'louvain' if louvain else 'leiden')
 
-    return community_size
+    return {str(c): size for c, size in enumerate(partition.sizes().tolist())}
 
 
 def prob_matrix_by_row(k: pd.DataFrame):
@@ -178,14 +162,8 @@ def collaboration_matrix(louvain, data_path, graph: nx.Graph, log=Pretty()):
              f'{blue | graph.number_of_nodes()} nodes and '
              f'{blue | graph.number_of_edges()} edges.')
 
-    if louvain:
-        with log.scope.info(f'Reading { blue| "Louvain" } communities ...'):
-            with open(data_path / 'louvain_communities.json', 'r') as file:
-                communities = json.load(file)
-    else:
-        with log.scope.info(f'Reading { blue| "Leiden" } communities ...'):
-            with open(data_path / 'leiden_communities.json', 'r') as file:
-                communities = json.load(file)
+    with log.scope.info(f'Reading { blue| "Louvain" if louvain else "Leiden" } communities ...'):
+        communities = read(data_path, 'louvain' if louvain else 'leiden').as_dict()
 
     log.warn(f'Number of {blue| "louvain" if louvain else "leiden"} communities: {blue | len(communities)}')
 
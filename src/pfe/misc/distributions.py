@@ -1,36 +1,211 @@
 """
-Contains functions that allow defining different discrete distributions.
+Contains functions that allow defining different discrete distributions
+(e.g., of cardinalities of hyperedges).
+
+Distributions are picklable objects that can either be called to draw
+a single value or asked for a whole array of values with ``sample``.
+Both accept a ``Random``, so that models draw values from their own
+(block-buffered, seedable) stream; thus, a generated graph is fully
+determined by the seed of the model.
 """
 
-from typing import Callable
+from abc import ABC, abstractmethod
+from bisect import bisect_right
+from math import cos, log, pi, sqrt
+from typing import TYPE_CHECKING, Iterable, Optional, Union
 
 import numpy as np
 
+from pfe.misc.rng import Random
+
+if TYPE_CHECKING:
+    from pfe.tasks.distributions import Distribution
+
+
+class Cardinality(ABC):
+    """A distribution of positive integers.
+
+    Subclasses implement ``draw`` (a single value) and ``draws``
+    (an array of values) given a source of random numbers.
+    """
+
+    __slots__ = ('_random', )
+
+    def __init__(self):
+        self._random: Optional[Random] = None
+
+    def __call__(self, random: Optional[Random] = None) -> int:
+        """Returns a random value.
+
+        :param random: a source of random numbers (optional; a private
+                       stream of the distribution is used if not specified).
+        """
+        return self.draw(random if random is not None else self._own())
+
+    def sample(self, k: int, random: Optional[Random] = None) -> np.ndarray:
+        """Returns ``k`` random values.
+
+        :param k: the number of values.
+        :param random: a source of random numbers (optional; a private
+                       stream of the distribution is used if not specified).
+        """
+        return self.draws(k, random if random is not None else self._own())
+
+    @abstractmethod
+    def draw(self, random: Random) -> int:
+        """Returns a random value drawn with ``random``."""
+
+    @abstractmethod
+    def draws(self, k: int, random: Random) -> np.ndarray:
+        """Returns ``k`` random values drawn with ``random``."""
+
+    def __getstate__(self) -> dict:
+        """Returns the state of the distribution (for pickling);
+        the private stream is not pickled."""
+        return {x: getattr(self, x) for x in _slots(type(self)) if x != '_random'}
+
+    def __setstate__(self, state: dict):
+        """Restores the state of the distribution (for unpickling)."""
+
+        for key, value in state.items():
+            setattr(self, key, value)
+
+        self._random = None
+
+    def _own(self) -> Random:
+        """Returns the private stream of the distribution."""
+
+        if self._random is None:
+            self._random = Random()
+
+        return self._random
+
+
+class Discrete(Cardinality):
+    """A distribution over a finite set of values.
+
+    A value is drawn by the inverse transform of a single uniform number
+    (with a binary search over cumulative probabilities).
+
+    :param values: values of the distribution.
+    :param weights: weights of values (optional; uniform by default).
+    """
+
+    __slots__ = ('values', 'p', '_cumulative', '_values', '_cumulative_list')
+
+    def __init__(self, values: Iterable[int], weights: Optional[Iterable[float]] = None):
+        super().__init__()
+
+        self.values = np.asarray(list(values), dtype=np.int64)
 
-def constant(value: int) -> Callable[[], int]:
-    """Returns a function that always returns the same ``value``."""
+        if len(self.values) == 0:
+            raise ValueError('`values` must not be empty.')
 
-    def next() -> int:
-        return value
+        weights = np.ones(len(self.values)) if weights is None else np.asarray(list(weights), dtype=np.float64)
 
-    return next
+        if len(weights) != len(self.values):
+            raise ValueError('`values` and `weights` must be of the same length.')
+        if np.any(weights < 0) or weights.sum() <= 0:
+            raise ValueError('`weights` must be non-negative and not all zeros.')
 
+        self.p = weights / weights.sum()
 
-def uniform(*values: int) -> Callable[[], int]:
-    """Returns a function that uniformly picks a value
+        self._cumulative = np.cumsum(self.p)
+        self._cumulative[-1] = 1.0
+
+        self._values = self.values.tolist()
+        self._cumulative_list = self._cumulative.tolist()
+
+    def __repr__(self) -> str:
+        return f'Discrete({self._values}, {self.p.tolist()})'
+
+    def draw(self, random: Random) -> int:
+        if len(self._values) == 1:
+            return self._values[0]
+
+        return self._values[bisect_right(self._cumulative_list, random.uniform())]
+
+    def draws(self, k: int, random: Random) -> np.ndarray:
+        if len(self._values) == 1:
+            return np.full(k, self._values[0], dtype=np.int64)
+
+        return self.values[np.searchsorted(self._cumulative, random.uniforms(k), side='right')]
+
+
+class Normal(Cardinality):
+    """The normal (Gaussian) distribution rounded to integers.
+
+    Values are drawn with the Box–Muller transform of pairs of uniforms;
+    values below ``minimum`` are raised to it, so that cardinalities
+    of hyperedges never yield empty hyperedges or singletons.
+
+    :param loc: the mean of the distribution.
+    :param scale: the standard deviation of the distribution.
+    :param minimum: the minimum value (``2`` by default).
+    """
+
+    __slots__ = ('loc', 'scale', 'minimum')
+
+    def __init__(self, loc: float, scale: float, minimum: int = 2):
+        super().__init__()
+
+        if scale < 0:
+            raise ValueError('`scale` must be non-negative.')
+        if minimum < 1:
+            raise ValueError('`minimum` must be positive.')
+
+        self.loc = loc
+        self.scale = scale
+        self.minimum = minimum
+
+    def __repr__(self) -> str:
+        return f'Normal({self.loc}, {self.scale}, minimum={self.minimum})'
+
+    def draw(self, random: Random) -> int:
+        u, v = random.uniform(), random.uniform()
+
+        return max(self.minimum, round(self.loc + self.scale * sqrt(-2 * log(1 - u)) * cos(2 * pi * v)))
+
+    def draws(self, k: int, random: Random) -> np.ndarray:
+        u = random.uniforms(2 * k)
+
+        z = np.sqrt(-2 * np.log1p(-u[:k])) * np.cos(2 * np.pi * u[k:])
+
+        return np.maximum(np.rint(self.loc + self.scale * z).astype(np.int64), self.minimum)
+
+
+def constant(value: int) -> Discrete:
+    """Returns a distribution that always returns the same ``value``."""
+    return Discrete([value])
+
+
+def uniform(*values: int) -> Discrete:
+    """Returns a distribution that uniformly picks a value
     from the provided list of ``values``."""
+    return Discrete(values)
+
+
+def normal(loc: float, scale: float, minimum: int = 2) -> Normal:
+    """Returns a distribution of integer random values according to
+    the normal (Gaussian) distribution with parameters ``loc`` and ``scale``
+    (values below ``minimum`` are raised to it)."""
+    return Normal(loc, scale, minimum)
+
 
-    def next() -> int:
-        return np.random.choice(values)
+def empirical(distribution: Union['Distribution', dict[int, int]]) -> Discrete:
+    """Returns a distribution that picks values proportionally
+    to the number of times they were observed, e.g.,
+    ``empirical(authors_per_publication(publications))``.
 
-    return next
+    :param distribution: either a ``Distribution`` or a dictionary that maps
+                         an observed value to the number of observations.
+    """
 
+    items = sorted(distribution.items())
 
-def normal(loc: float, scale: float) -> Callable[[], int]:
-    """Returns a function that generates integer random values according to
-    the normal (Gaussian) distribution with parameters ``loc`` and ``scale``."""
+    return Discrete((k for k, _ in items), (n for _, n in items))
 
-    def next() -> int:
-        return round(np.random.normal(loc=loc, scale=scale))
 
-    return next
+def _slots(cls: type) -> list[str]:
+    """Returns names of all slots of the class (including its bases)."""
+    return [x for c in cls.__mro__ for x in getattr(c, '__slots__', ())]
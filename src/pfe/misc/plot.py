@@ -84,6 +84,21 @@ class Plot:
 
         self.ax.plot(x, y, **kwargs)
 
+    def band(self, x: Iterable[float], low: Iterable[float], high: Iterable[float], **kwargs: Any):
+        """Fills the area between `low` and `high` (e.g., a confidence band).
+
+        :param x: coordinates of points.
+        :param low: lower bounds at the points.
+        :param high: upper bounds at the points.
+        """
+
+        # Set the default style.
+        kwargs.setdefault('color', 'gray')
+        kwargs.setdefault('alpha', 0.3)
+        kwargs.setdefault('linewidth', 0)
+
+        self.ax.fill_between(list(x), list(low), list(high), **kwargs)
+
     def title(self, text: str):
         """An alias for `set_title`."""
         self.ax.set_title(text)
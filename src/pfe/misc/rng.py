@@ -0,0 +1,116 @@
+"""
+A seedable source of random numbers shared by generative models.
+"""
+
+from typing import Optional, Sequence, TypeVar, Union
+
+import numpy as np
+
+
+T = TypeVar('T')
+
+
+class Random:
+    """A block-buffered source of random numbers.
+
+    Drawing a single number from NumPy costs microseconds of overhead,
+    which dominates the innermost loops of generative models. This class
+    draws uniforms from ``numpy.random.Generator`` in large blocks and hands
+    them out one by one (or in batches), refilling the block transparently.
+
+    Unlike the global (legacy) NumPy RNG, every instance is an independent
+    stream, which makes runs reproducible (given a seed) and safe to run
+    in parallel (given streams obtained with ``spawn``).
+
+    :param seed: a seed of the stream (optional; a fresh entropy is used
+                 if not specified).
+    :param block: the number of uniforms to draw at once.
+    """
+
+    __slots__ = ('generator', '_seed', '_size', '_block', '_values', '_i')
+
+    def __init__(self, seed: Union[None, int, np.random.SeedSequence] = None, block: int = 2**16):
+        if block <= 0:
+            raise ValueError('`block` must be positive.')
+
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+
+        self.generator = np.random.Generator(np.random.PCG64(seed))
+
+        self._seed = seed
+        self._size = block
+        self._block = np.empty(0)
+        self._values: list[float] = []
+        self._i = 0
+
+    def __getstate__(self) -> tuple:
+        """Returns the state of the stream (for pickling); only the unused
+        part of the block is kept, and its list copy is not kept at all."""
+        return self.generator, self._seed, self._size, self._block[self._i:]
+
+    def __setstate__(self, state: tuple):
+        """Restores the state of the stream (for unpickling)."""
+
+        self.generator, self._seed, self._size, self._block = state
+        self._values = self._block.tolist()
+        self._i = 0
+
+    def spawn(self, n: int) -> list['Random']:
+        """Returns ``n`` independent streams derived from this one."""
+        return [Random(x, block=self._size) for x in self._seed.spawn(n)]
+
+    def uniform(self) -> float:
+        """Returns a random number uniformly distributed in ``[0, 1)``."""
+
+        if self._i == len(self._values):
+            self._refill()
+
+        u = self._values[self._i]
+        self._i += 1
+
+        return u
+
+    def uniforms(self, k: int) -> np.ndarray:
+        """Returns ``k`` random numbers uniformly distributed in ``[0, 1)``."""
+
+        parts = []
+
+        while k > 0:
+            if self._i == len(self._values):
+                self._refill()
+
+            part = self._block[self._i:self._i + k]
+            parts.append(part)
+
+            self._i += len(part)
+            k -= len(part)
+
+        if len(parts) == 1:
+            return parts[0]
+
+        return np.concatenate(parts) if parts else np.empty(0)
+
+    def integer(self, n: int) -> int:
+        """Returns a random integer uniformly distributed in ``[0, n)``."""
+        return int(self.uniform() * n)
+
+    def integers(self, n: Union[int, np.ndarray], k: Optional[int] = None) -> np.ndarray:
+        """Returns ``k`` random integers uniformly distributed in ``[0, n)``;
+        ``n`` can also be an array of upper bounds (one per integer)."""
+
+        if k is None:
+            k = len(n)
+
+        return (self.uniforms(k) * n).astype(np.int64)
+
+    def choice(self, values: Sequence[T]) -> T:
+        """Returns an element of ``values`` chosen uniformly at random."""
+        return values[int(self.uniform() * len(values))]
+
+    def _refill(self):
+        """Draws a new block of uniforms."""
+
+        self._block = self.generator.random(self._size)
+        self._values = self._block.tolist()
+        self._i = 0
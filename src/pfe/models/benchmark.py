@@ -0,0 +1,61 @@
+"""
+Measures how the generation time of models scales with the size of graphs.
+"""
+
+from time import perf_counter
+from typing import Callable, Iterable
+
+from pfe.misc import distributions
+from pfe.misc.log import Log, Pretty, Nothing
+from pfe.misc.rng import Random
+from pfe.misc.style import blue, magenta
+from pfe.models import hypergraph_regular
+
+
+def benchmark(generate: Callable[[int], object],
+              sizes: Iterable[int],
+              log: Log = Nothing()) -> dict[int, float]:
+    """Measures the time of generating graphs of the provided sizes.
+
+    If the generation scales linearly, then the time per node
+    (which is logged along with the total time) stays roughly the same.
+
+    :param generate: a function that generates a graph with the provided
+                     number of nodes.
+    :param sizes: numbers of nodes of graphs to generate.
+    :param log: an instance of ``Log`` to log the results with.
+
+    :return: a dictionary that maps the number of nodes
+             to the time of generation (in seconds).
+    """
+
+    times = {}
+
+    for n in sizes:
+        start = perf_counter()
+        generate(n)
+        times[n] = perf_counter() - start
+
+        log.info(f'Nodes: {magenta | n}.'.ljust(30) +
+                 f'Time: {blue | f"{times[n]:.3f}"}s, '.ljust(30) +
+                 f'per node: {blue | f"{times[n] / n * 10**6:.3f}"}µs.')
+
+    return times
+
+
+if __name__ == '__main__':
+    log = Pretty()
+    log.info('Starting.')
+
+    def regular(n: int) -> hypergraph_regular.Hypergraph:
+        parameters = hypergraph_regular.Parameters(
+            n0=10,
+            n=n,
+            p=0.3,
+            d=distributions.uniform(3, 4, 5)
+        )
+
+        return hypergraph_regular.Hypergraph.generate(parameters, random=Random(0))
+
+    with log.scope.info(f'Benchmarking `{magenta | "hypergraph_regular"}`.'):
+        benchmark(regular, [10**3, 10**4, 10**5, 10**6], log=log)
@@ -0,0 +1,95 @@
+"""
+Periodic checkpoints of the state of generative models,
+which allow resuming an interrupted generation.
+"""
+
+import os
+import pickle
+from pathlib import Path
+from time import monotonic
+from typing import Any, Optional, Tuple, Union
+
+import numpy as np
+
+
+class Checkpoint:
+    """Saves the state of a generator every ``steps`` steps
+    and/or every ``seconds`` seconds of wall time.
+
+    The state is pickled into a single binary file, which is replaced
+    atomically, so that an interruption while saving never corrupts
+    the previous checkpoint. Along with the state, the state of the global
+    NumPy RNG is saved (in case a custom cardinality distribution
+    draws from it), so that a resumed generation continues
+    exactly as the original one would.
+
+    An example.
+    ::
+        checkpoint = Checkpoint('graph.checkpoint', seconds=600)
+
+        graph = Hypergraph.generate(parameters, random=Random(0), checkpoint=checkpoint)
+        # ...or, after an interruption:
+        graph = Hypergraph.resume('graph.checkpoint', parameters, checkpoint=checkpoint)
+
+    :param path: the path to the checkpoint file.
+    :param steps: the interval of checkpoints in steps (optional).
+    :param seconds: the interval of checkpoints in seconds (optional).
+    """
+
+    __slots__ = ('path', 'steps', 'seconds', '_step', '_time')
+
+    def __init__(self,
+                 path: Union[str, Path],
+                 steps: Optional[int] = None,
+                 seconds: Optional[float] = None):
+        if steps is None and seconds is None:
+            raise ValueError('`steps` or `seconds` must be specified.')
+        if steps is not None and steps <= 0:
+            raise ValueError('`steps` must be positive.')
+        if seconds is not None and seconds <= 0:
+            raise ValueError('`seconds` must be positive.')
+
+        self.path = Path(path)
+        self.steps = steps
+        self.seconds = seconds
+
+        self._step: Optional[int] = None
+        self._time = monotonic()
+
+    def __call__(self, step: int, state: Any):
+        """Saves the state if a checkpoint is due at the step ``step``."""
+
+        if self._step is None:
+            self._step = step
+
+        if (self.steps is not None and step - self._step >= self.steps) or \
+           (self.seconds is not None and monotonic() - self._time >= self.seconds):
+            self.save(step, state)
+
+    def save(self, step: int, state: Any):
+        """Saves the state unconditionally."""
+
+        temporary = self.path.with_name(self.path.name + '.tmp')
+
+        with open(temporary, 'wb') as file:
+            pickle.dump((step, state, np.random.get_state()), file, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(temporary, self.path)
+
+        self._step = step
+        self._time = monotonic()
+
+
+def load(path: Union[str, Path]) -> Tuple[int, Any]:
+    """Loads a checkpoint saved by ``Checkpoint``
+    (and restores the state of the global NumPy RNG).
+
+    :return: the step of the checkpoint and the state.
+    """
+
+    with open(path, 'rb') as file:
+        step, state, legacy = pickle.load(file)
+
+    np.random.set_state(legacy)
+
+    return step, state
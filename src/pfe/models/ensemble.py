@@ -0,0 +1,126 @@
+"""
+Ensembles of replicas of generative models.
+
+A single generated graph is a noisy estimate of the degree distribution
+of a model; an ensemble generates several independent replicas
+and aggregates their degree distributions, e.g.,
+::
+
+    result = ensemble('graph_cutoff', {'p': 0.25, 'q': 0.95, 'm': 5, 'k': 10**5}, replicas=32)
+
+    plot = Plot()
+    plot.band(result.degrees, result.bands[0.05], result.bands[0.95])
+    plot.draw(dict(zip(result.degrees, result.mean)))
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+from pfe.misc.log import Log, Nothing
+from pfe.misc.log.misc import percents
+from pfe.misc.style import blue, magenta
+from pfe.models.registry import parameters_of
+from pfe.models.sweep import Summary, summarise
+from pfe.tasks.distributions import Accumulator, Distribution
+
+
+@dataclass
+class Ensemble:
+    # noinspection PyUnresolvedReferences
+    """Aggregated degree distributions of replicas of a model.
+
+    :param degrees: degrees ``k`` (``1, 2, ...``) that the arrays below refer to.
+    :param mean: the mean (over replicas) fraction of nodes with degree ``k``.
+    :param bands: maps a quantile to the corresponding quantile (over replicas)
+                  of the fraction of nodes with degree ``k``.
+    :param distribution: the degree distribution of all replicas pooled together.
+    :param alphas: fitted exponents of the power law of every replica.
+    :param xmins: fitted lower bounds of the power law of every replica.
+    """
+
+    degrees: np.ndarray
+    mean: np.ndarray
+    bands: dict[float, np.ndarray]
+    distribution: Distribution
+    alphas: np.ndarray
+    xmins: np.ndarray
+
+
+def ensemble(model: str,
+             design: dict[str, Any],
+             replicas: int,
+             seed: Optional[int] = None,
+             quantiles: Iterable[float] = (0.05, 0.5, 0.95),
+             processes: Optional[int] = None,
+             fit: bool = True,
+             log: Log = Nothing()) -> Ensemble:
+    """Generates replicas of the model in parallel and aggregates
+    their degree distributions.
+
+    Every replica is generated with its own stream of random numbers
+    spawned from ``seed``. Only degree histograms of replicas are sent back
+    from worker processes, and they are merged as soon as they arrive,
+    so that the memory is bounded by ``replicas`` histograms
+    (and never holds more than one graph per process).
+
+    :param model: the name of the model (see ``registry.MODELS``).
+    :param design: parameters of the model.
+    :param replicas: the number of replicas.
+    :param seed: the seed of the ensemble (optional).
+    :param quantiles: quantiles of the bands.
+    :param processes: the number of processes to generate replicas in;
+                      if ``1``, replicas are generated in the current process.
+    :param fit: whether to fit a power law to degrees of every replica.
+    :param log: an instance of ``Log`` to log the progress with.
+    """
+
+    if replicas <= 0:
+        raise ValueError('`replicas` must be positive.')
+
+    # Validate parameters before spawning any processes.
+    parameters_of(model, design)
+
+    seeds = np.random.SeedSequence(seed).spawn(replicas)
+    tasks = [(model, design, x, replica, fit) for replica, x in enumerate(seeds)]
+
+    pooled = Accumulator()
+    summaries: list[Summary] = []
+
+    def merge(summary: Summary):
+        pooled.add_many(np.arange(len(summary.histogram)), summary.histogram)
+        summaries.append(summary)
+
+        log.info(f'Replica {magenta | summary.replica}: '
+                 f'{blue | summary.nodes} nodes, {blue | summary.edges} edges. '
+                 f'[{percents(len(summaries), replicas)}]')
+
+    if processes == 1:
+        for task in tasks:
+            merge(summarise(*task))
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            for future in as_completed([pool.submit(summarise, *task) for task in tasks]):
+                merge(future.result())
+
+    summaries.sort(key=lambda x: x.replica)
+
+    # Fractions of nodes of every degree (starting from 1) in every replica.
+    size = max(len(x.histogram) for x in summaries)
+    pdfs = np.zeros((replicas, max(size - 1, 1)))
+
+    for i, summary in enumerate(summaries):
+        histogram = summary.histogram[1:]
+        pdfs[i, :len(histogram)] = histogram / max(histogram.sum(), 1)
+
+    quantiles = list(quantiles)
+    bands = np.quantile(pdfs, quantiles, axis=0) if quantiles else []
+
+    return Ensemble(degrees=np.arange(1, pdfs.shape[1] + 1),
+                    mean=pdfs.mean(axis=0),
+                    bands=dict(zip(quantiles, bands)),
+                    distribution=pooled.distribution(),
+                    alphas=np.asarray([np.nan if x.alpha is None else x.alpha for x in summaries]),
+                    xmins=np.asarray([np.nan if x.xmin is None else x.xmin for x in summaries]))
@@ -4,17 +4,22 @@ a power-law distribution with an exponential cutoff.
 """
 
 from dataclasses import dataclass
-from typing import Optional
+from pathlib import Path
+from typing import Iterable, Optional, Tuple, Union
 
-import networkx as nx
 import numpy as np
 import powerlaw as pl
 
 from pfe.misc.log import Log, Pretty, Nothing, suppress_stderr
 from pfe.misc.log.misc import percents
 from pfe.misc.plot import Plot
+from pfe.misc.rng import Random
 from pfe.misc.style import blue, magenta
-from pfe.tasks.distributions import degree_distribution
+from pfe.models.checkpoint import Checkpoint, load
+from pfe.models.incidence import EdgeList
+from pfe.models.observers import Observer, Snapshot
+from pfe.models.sampling import FenwickTree, IndexedSet
+from pfe.tasks.distributions import Distribution
 
 
 @dataclass
@@ -67,7 +72,11 @@ class Parameters:
                 raise ValueError('`k` must be positive.')
 
 
-def generate(parameters: Parameters, log: Log = Nothing()) -> nx.Graph:
+def generate(parameters: Parameters,
+             log: Log = Nothing(),
+             random: Optional[Random] = None,
+             checkpoint: Optional[Checkpoint] = None,
+             observers: Iterable[Observer] = ()) -> EdgeList:
     """Generates a graph whose degree distribution follows
     a power law with an exponential cutoff.
 
@@ -77,104 +86,304 @@ def generate(parameters: Parameters, log: Log = Nothing()) -> nx.Graph:
            Social Networks, vol. 29, no. 1, pp. 70–80, 2007.
            https://doi.org/10.1016/j.socnet.2005.12.003
 
+    Every step of the process takes ``O(log n)`` time: active balls are
+    picked uniformly from an ``IndexedSet``, and urns are picked from
+    a ``FenwickTree`` over their weights ``i * len(active_urn[i])``.
+    The graph is returned as an ``EdgeList`` (use ``to_networkx``
+    to get an ``nx.Graph``).
+
     :param parameters: parameters of the model.
     :param log: an instance of ``Log`` to log the execution with.
+    :param random: a source of random numbers (optional).
+    :param checkpoint: a ``Checkpoint`` to save the state with (optional).
+    :param observers: ``Observer``-s to pass snapshots of the graph to.
     """
 
-    active_urns: dict[int, set[int]] = {0: set()}
-    inactive_urns: dict[int, set[int]] = {}
-
-    # Maps active balls to their urns.
-    active_balls: dict[int, int] = {}
+    process = Process(random if random is not None else Random())
 
     # Generate the initial graph.
-    graph = nx.Graph()
-    steps = 0
+    for _ in range(parameters.m):
+        process.add_node()
+
+    return process.run(parameters, log, checkpoint, observers)
+
+
+def resume(path: Union[str, Path],
+           parameters: Parameters,
+           log: Log = Nothing(),
+           checkpoint: Optional[Checkpoint] = None,
+           observers: Iterable[Observer] = ()) -> EdgeList:
+    """Resumes the generation from a checkpoint.
+
+    :param path: the path to the checkpoint file.
+    :param parameters: parameters of the model (the same as
+                       the ones of the interrupted generation).
+    :param log: an instance of ``Log`` to log the execution with.
+    :param checkpoint: a ``Checkpoint`` to save the state with (optional).
+    :param observers: ``Observer``-s to pass snapshots of the graph to.
+    """
+
+    _, process = load(path)
+
+    return process.run(parameters, log, checkpoint, observers)
+
+
+class Process:
+    """The state of the process of ``generate``.
+
+    :param random: a source of random numbers.
+    """
+
+    def __init__(self, random: Random):
+        self.random = random
+
+        # `active_urns[i]` contains active balls with degree `i`.
+        self.active_urns: dict[int, IndexedSet] = {0: IndexedSet()}
+        self.inactive_urns: dict[int, set[int]] = {}
+
+        # Maps active balls to their urns.
+        self.active_balls: dict[int, int] = {}
+        self.active = IndexedSet()
+
+        # Weights `i * len(active_urns[i])` of selecting `active_urn[i]`.
+        self.weights = FenwickTree()
+
+        self.graph = EdgeList()
+        self.nodes = 0
+        self.steps = 0
+
+    def run(self,
+            parameters: Parameters,
+            log: Log = Nothing(),
+            checkpoint: Optional[Checkpoint] = None,
+            observers: Iterable[Observer] = ()) -> EdgeList:
+        """Runs the process until it has ``parameters.n`` nodes
+        or makes ``parameters.k`` steps.
+
+        :param parameters: parameters of the model.
+        :param log: an instance of ``Log`` to log the execution with.
+        :param checkpoint: a ``Checkpoint`` to save the state with (optional).
+        :param observers: ``Observer``-s to pass snapshots of the graph to.
+        """
+
+        random = self.random
+        weights = self.weights
+
+        while True:
+            if parameters.n is not None and self.nodes >= parameters.n:
+                break
+            if parameters.k is not None and self.steps >= parameters.k:
+                break
+
+            p = random.uniform()
+            q = random.uniform()
+
+            if p <= parameters.p:
+                self.add_node()
+            elif weights.total() > 0:
+                # Select a random `active_urn[i]` with the probability
+                # proportional to `i * len(active_urns[i])`.
+                i = weights.find(random.uniform())
+                j = self.active_urns[i].choice(random.uniform())
+
+                if q <= parameters.q:
+                    self.add_edge(j)
+                else:
+                    self.deactivate_node(j)
+
+            if (steps := self.steps + 1) % 1000 == 0:
+                if parameters.n is not None:
+                    progress = f'[{percents(self.nodes, parameters.n)}]'
+                if parameters.k is not None:
+                    progress = f'[{percents(steps, parameters.k)}]'
+
+                log.info(f'Step {magenta | steps}.'.ljust(23) +
+                         f'Nodes: {blue | self.nodes}, '.ljust(23) +
+                         f'Edges: {blue | self.graph.number_of_multiedges()}. '.ljust(25) +
+                         progress)  # NOQA.
+
+            self.steps = steps
+
+            if checkpoint is not None:
+                checkpoint(steps, self)
+
+            for observer in observers:
+                observer(steps, self)
+
+        return self.graph
+
+    def number_of_nodes(self) -> int:
+        """Returns the number of nodes."""
+        return self.nodes
+
+    def snapshot(self, step: int) -> Snapshot:
+        """Returns a summary of the graph at the step ``step``.
 
-    def add_node(j: int):
-        graph.add_node(j)
+        The degree histogram is read off the sizes of urns (which are
+        maintained by the process anyway); thus, degrees are those
+        of the process, where repeated edges are counted
+        (see ``EdgeList.multidegree`` and ``expected_distribution``).
+        """
 
-        active_urns[0].add(j)
-        active_balls[j] = 0
+        histogram = np.zeros(max(max(self.active_urns), max(self.inactive_urns, default=0)) + 1, dtype=np.int64)
+
+        for i, urn in self.active_urns.items():
+            histogram[i] += len(urn)
+        for i, urn in self.inactive_urns.items():
+            histogram[i] += len(urn)
+
+        return Snapshot(step=step,
+                        nodes=self.nodes,
+                        edges=self.graph.number_of_multiedges(),
+                        active=len(self.active),
+                        histogram=histogram)
+
+    def transfer(self, j: int, i: int, k: int):
+        """Transfers ball `j` from `active_urn[i]` to `active_urn[k]`."""
+
+        self.active_urns[i].remove(j)
+        self.active_urns.setdefault(k, IndexedSet())
+        self.active_urns[k].add(j)
+        self.active_balls[j] = k
+
+        self.weights.add(i, -i)
+        self.weights.add(k, k)
+
+    def add_node(self):
+        """Adds a new ball (node)."""
+
+        self.graph.add_nodes()
+        j = self.nodes
+        self.nodes += 1
+
+        self.active_urns[0].add(j)
+        self.active_balls[j] = 0
+        self.active.add(j)
 
         # Note: in "World-Wide Web scaling exponent from Simon's 1955 model"
         # (S. Bornholdt and H. Ebel, 2000) they propose to add an edge between
         # the new node and an arbitrarily chosen one. This would ensure that
         # `active_urn[i]` contains only balls with degree `i`, and not with
         # degree `i-1`.
-        if len(active_balls) > 1:
-            add_edge(j)
+        if len(self.active) > 1:
+            self.add_edge(j)
+
+    def add_edge(self, j: int):
+        """Adds an edge between ball `j` and a random active ball."""
+
+        if len(self.active) < 2:
+            return
 
-    def add_edge(j: int):
-        i = active_balls[j]
+        i = self.active_balls[j]
 
         # Pick a random node to attach to.
-        l = np.random.choice([l for l in active_balls.keys() if l != j])
-        k = active_balls[l]
+        l = self.active.choice_except(self.random.uniform(), j)
+        k = self.active_balls[l]
 
-        # Transfer ball `j` from `active_urn[i]` to `active_urn[i+1]`.
-        active_urns[i].remove(j)
-        active_urns.setdefault(i+1, set())
-        active_urns[i+1].add(j)
-        active_balls[j] = i+1
+        self.transfer(j, i, i+1)
+        self.transfer(l, k, k+1)
 
-        # Transfer ball `l` from `active_urn[k]` to `active_urn[k+1]`.
-        active_urns[k].remove(l)
-        active_urns.setdefault(k+1, set())
-        active_urns[k+1].add(l)
-        active_balls[l] = k+1
+        self.graph.append(j, l)
 
-        graph.add_edge(j, l)
+    def deactivate_node(self, j: int):
+        """Deactivates ball `j`."""
 
-    def deactivate_node(j: int):
-        i = active_balls[j]
+        i = self.active_balls[j]
 
-        # Deactivate ball `j`.
-        active_urns[i].remove(j)
-        active_balls.pop(j)
+        self.active_urns[i].remove(j)
+        self.active_balls.pop(j)
+        self.active.remove(j)
 
-        inactive_urns.setdefault(i, set())
-        inactive_urns[i].add(j)
+        self.weights.add(i, -i)
 
-    for j in range(parameters.m):
-        add_node(j)
+        self.inactive_urns.setdefault(i, set())
+        self.inactive_urns[i].add(j)
 
-    while True:
-        if parameters.n is not None and graph.number_of_nodes() >= parameters.n:
-            break
-        if parameters.k is not None and steps >= parameters.k:
-            break
 
-        p = np.random.uniform()
-        q = np.random.uniform()
+def expected_distribution(parameters: Parameters,
+                          nodes: Optional[int] = None,
+                          tolerance: float = 1e-12) -> Distribution:
+    """Computes the expected stationary degree distribution of graphs
+    generated by ``generate`` without simulating the process.
 
-        if p <= parameters.p:
-            add_node(graph.number_of_nodes())
-        else:
-            # Select a random `active_urn[i]`.
-            w = np.asarray([k * len(active_urns[k]) for k in active_urns], dtype=np.float64)
-            w /= w.sum()
+    Let ``a[i]`` and ``b[i]`` be the expected numbers of active and inactive
+    balls with degree ``i`` added per step in the stationary regime, and let
+    ``α = sum(a) = p - (1 - p)(1 - q)`` and ``σ = sum(i * a[i])``. Every step
+    adds a new ball with the probability ``p``, creates an edge with
+    the probability ``r = p + (1 - p) q`` (whose second end is a uniformly
+    chosen active ball) and selects a ball of degree ``i`` with the probability
+    ``(1 - p) i a[i] / σ``. Balancing the expected in- and outflow of every urn
+    (the mean-field equations of [1]) gives
+    ::
+        a[1] = p / (1 + r / α + (1 - p) / σ),
+        a[i] = a[i - 1] (r / α + (1 - p) q (i - 1) / σ) / (1 + r / α + (1 - p) i / σ),
+        b[i] = (1 - p) (1 - q) i a[i] / σ,
 
-            i = np.random.choice(list(active_urns.keys()), p=w)
-            j = np.random.choice(list(active_urns[i]))
+    which is evaluated with a cumulative product for a fixed ``σ``,
+    while ``σ`` itself is found by the fixed-point iteration.
+    The initial graph (and, thus, ``m``) does not affect the stationary
+    distribution.
 
-            if q <= parameters.q:
-                add_edge(j)
-            else:
-                deactivate_node(j)
+    .. [1] Trevor Fenner, Mark Levene and George Loizou,
+           "A model for collaboration networks giving rise to
+           a power-law distribution with an exponential cutoff",
+           Social Networks, vol. 29, no. 1, pp. 70–80, 2007.
+           https://doi.org/10.1016/j.socnet.2005.12.003
+
+    :param parameters: parameters of the model.
+    :param nodes: the number of nodes to scale the distribution to
+                  (by default, ``n`` or the expected number of nodes
+                  after ``k`` steps).
+    :param tolerance: the relative tolerance of ``σ``.
+
+    :return: the expected numbers of nodes of every degree
+             (rounded to integers) as a ``Distribution``.
+    """
+
+    p, q = parameters.p, parameters.q
+
+    if nodes is None:
+        nodes = parameters.n if parameters.n is not None else round(p * parameters.k)
+
+    r = p + (1 - p) * q
+    alpha = p - (1 - p) * (1 - q)
+
+    def solve(sigma: float, size: int) -> Tuple[np.ndarray, np.ndarray]:
+        i = np.arange(1, size + 1)
+
+        uniform = r / alpha
+        preferential = (1 - p) / sigma
+
+        ratios = (uniform + preferential * q * i[:-1]) / (1 + uniform + preferential * i[1:])
+
+        active = np.empty(size)
+        active[0] = p / (1 + uniform + preferential)
+        np.cumprod(ratios, out=active[1:])
+        active[1:] *= active[0]
+
+        return active, preferential * (1 - q) * i * active
+
+    size = 1024
+    sigma = 2 * r
+
+    for _ in range(10**4):
+        active, inactive = solve(sigma, size)
+
+        # Extend the support until its tail becomes negligible.
+        if (active[-1] + inactive[-1]) * nodes / p > 1e-3 and size < 2**24:
+            size *= 2
+            continue
+
+        previous, sigma = sigma, float(np.arange(1, size + 1) @ active)
+
+        if abs(sigma - previous) <= tolerance * previous:
+            break
 
-        if (steps := steps + 1) % 1000 == 0:
-            if parameters.n is not None:
-                progress = f'[{percents(graph.number_of_nodes(), parameters.n)}]'
-            if parameters.k is not None:
-                progress = f'[{percents(steps, parameters.k)}]'
+    active, inactive = solve(sigma, size)
 
-            log.info(f'Step {magenta | steps}.'.ljust(23) +
-                     f'Nodes: {blue | graph.number_of_nodes()}, '.ljust(23) +
-                     f'Edges: {blue | graph.number_of_edges()}. '.ljust(25) +
-                     progress)  # NOQA.
+    counts = np.rint((active + inactive) * (nodes / (active + inactive).sum())).astype(np.int64)
 
-    return graph
+    return Distribution({k: n for k, n in enumerate(counts.tolist(), start=1) if n > 0})
 
 
 if __name__ == '__main__':
@@ -185,7 +394,7 @@ if __name__ == '__main__':
 
     if read:
         with log.scope.info(f'Reading a graph from "{magenta | read}".'):
-            graph = nx.read_edgelist(read)
+            graph = EdgeList.load(read)
     else:
         with log.scope.info('Generating a graph.'):
             parameters = Parameters(
@@ -202,10 +411,11 @@ if __name__ == '__main__':
                      f'{blue | graph.number_of_edges()} edges.')
 
         with log.scope.info('Saving the generated graph.'):
-            nx.write_edgelist(graph, f'graph-k-{parameters.k}.txt')
+            graph.save(f'graph-k-{parameters.k}.npz')
 
     with log.scope.info('Computing the degree distribution.'):
-        distribution = degree_distribution(graph)
+        # Degrees in the simple graph (repeated edges are counted once).
+        distribution = Distribution(graph.degree.tolist())
 
     with log.scope.info('Fitting a power law.'), suppress_stderr():
         fit = pl.Fit(distribution.as_list(), discrete=True)
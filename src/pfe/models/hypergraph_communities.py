@@ -4,17 +4,22 @@ A model that generates hypergraphs with communities.
 
 from dataclasses import dataclass, asdict, field
 from itertools import product
-from typing import Callable, Union
+from pathlib import Path
+from typing import Iterable, Optional, Union
 
 import numpy as np
 import powerlaw as pl
 
 from pfe.misc import distributions
-from pfe.misc.errors import ಠ_ಠ
 from pfe.misc.log import Pretty, Log, Nothing, suppress_stderr
 from pfe.misc.log.misc import percents
 from pfe.misc.plot import Plot
+from pfe.misc.rng import Random
 from pfe.misc.style import magenta, blue
+from pfe.models.checkpoint import Checkpoint, load
+from pfe.models.incidence import Incidence
+from pfe.models.observers import Observer, Snapshot
+from pfe.models.sampling import AliasTable, EndpointPool
 from pfe.tasks.distributions import Distribution
 
 
@@ -42,7 +47,7 @@ class Parameters:
     p: Union[np.ndarray, list[list[float]]]
     m: Union[np.ndarray, list[float]]
     gamma: float
-    distribution: Callable[[], int]
+    distribution: distributions.Cardinality
 
     class Aux:
         """Auxiliary fields that are convenient
@@ -54,6 +59,10 @@ class Parameters:
             self.communities_pairs = \
                 np.asarray(list(product(self.communities, self.communities)))
 
+            # Alias tables allow choosing a community (or a pair of them) in `O(1)`.
+            self.communities_table = AliasTable(parameter.m)
+            self.communities_pairs_table = AliasTable(self.p_flat)
+
     aux: Aux = field(init=False)
 
     def __post_init__(self):
@@ -94,77 +103,134 @@ class Parameters:
 class Hypergraph:
     """A hypergraph generated according to the model.
 
-    :param nodes: a list of communities of nodes.
-    :param edges: a list of hyperedges (each hyperedge is represented
-                  as a list of vertices).
+    :param nodes: a list of communities of nodes
+                  (each community is an append-only ``EndpointPool``).
+    :param edges: an ``Incidence`` of hyperedges, which also keeps degrees
+                  of nodes (``d``) and hyperedges of every node (``edges_of``).
 
     :param e:
         > list of list, each list corresponds to one community, and
         > contains a list of nodes repeated as their degrees; useful to pick
         > randomly a node depending of its degree (size ``c``)
-    :param d: a list of degrees of nodes (``d[i] := deg(i)``).
-    :param v:
-        > list of the labels of hyperedges associated to each nodes (``v[0]`` is
-        > the list of the label of the hyperedges the node `0` belongs to;
-        > the correspondence between the label and the hyperedges can be found
-        > using ``edges``).
+        (each list is an ``EndpointPool``).
     :param q: a list of communities of nodes
               (``q[i]`` is the community of the node `i`).
+    :param random: a source of random numbers.
     """
 
     def __init__(self,
-                 nodes: list[list[int]],
-                 edges: list[list[int]],
-                 e: list[list[int]],
-                 v: list[list[int]],
-                 d: list[int],
-                 q: list[int]):
+                 nodes: list[EndpointPool],
+                 edges: Incidence,
+                 e: list[EndpointPool],
+                 q: list[int],
+                 random: Random):
         """Initialises the graph."""
 
         self.nodes = nodes
         self.edges = edges
 
         self.e = e
-        self.v = v
-        self.d = d
         self.q = q
 
-    @classmethod
-    def generate(cls, parameters: Parameters, log: Log = Nothing()) -> 'Hypergraph':
-        """Generates a graph according to the model with the provided parameters."""
+        self.random = random
 
-        graph = cls.initial(parameters)
-        steps = 0
+    @property
+    def d(self) -> np.ndarray:
+        """Returns degrees of nodes (``d[i] := deg(i)``)."""
+        return self.edges.degree
 
-        while graph.number_of_nodes() < parameters.n:
-            u = np.random.random()
+    def v(self, node: int) -> np.ndarray:
+        """Returns labels of hyperedges the node belongs to
+        (the correspondence between the label and the hyperedges
+        can be found using ``edges``)."""
+        return self.edges.edges_of(node)
+
+    @classmethod
+    def generate(cls,
+                 parameters: Parameters,
+                 log: Log = Nothing(),
+                 random: Optional[Random] = None,
+                 checkpoint: Optional[Checkpoint] = None,
+                 observers: Iterable[Observer] = ()) -> 'Hypergraph':
+        """Generates a graph according to the model with the provided parameters.
+
+        :param parameters: parameters of the model.
+        :param log: an instance of ``Log`` to log the execution with.
+        :param random: a source of random numbers (optional).
+        :param checkpoint: a ``Checkpoint`` to save the state with (optional).
+        :param observers: ``Observer``-s to pass snapshots of the graph to.
+        """
+        return cls.initial(parameters, random).run(parameters, 0, log, checkpoint, observers)
+
+    @classmethod
+    def resume(cls,
+               path: Union[str, Path],
+               parameters: Parameters,
+               log: Log = Nothing(),
+               checkpoint: Optional[Checkpoint] = None,
+               observers: Iterable[Observer] = ()) -> 'Hypergraph':
+        """Resumes the generation from a checkpoint.
+
+        :param path: the path to the checkpoint file.
+        :param parameters: parameters of the model (the same as
+                           the ones of the interrupted generation).
+        :param log: an instance of ``Log`` to log the execution with.
+        :param checkpoint: a ``Checkpoint`` to save the state with (optional).
+        :param observers: ``Observer``-s to pass snapshots of the graph to.
+        """
+
+        steps, graph = load(path)
+
+        return graph.run(parameters, steps, log, checkpoint, observers)
+
+    def run(self,
+            parameters: Parameters,
+            steps: int = 0,
+            log: Log = Nothing(),
+            checkpoint: Optional[Checkpoint] = None,
+            observers: Iterable[Observer] = ()) -> 'Hypergraph':
+        """Runs the process until the graph has ``parameters.n`` nodes.
+
+        :param parameters: parameters of the model.
+        :param steps: the number of steps that were already made.
+        :param log: an instance of ``Log`` to log the execution with.
+        :param checkpoint: a ``Checkpoint`` to save the state with (optional).
+        :param observers: ``Observer``-s to pass snapshots of the graph to.
+        """
+
+        while self.number_of_nodes() < parameters.n:
+            u = self.random.uniform()
 
             if u < parameters.pv:
-                graph.add_node(parameters)
+                self.add_node(parameters)
             elif u < parameters.pv + parameters.pve:
-                graph.add_node_and_edge(parameters)
+                self.add_node_and_edge(parameters)
             else:
-                graph.add_edge(parameters)
+                self.add_edge(parameters)
 
             if (steps := steps + 1) % 1000 == 0:
                 log.info(f'Step {magenta | steps}.'.ljust(23) +
-                         f'Nodes: {blue | graph.number_of_nodes()}, '.ljust(23) +
-                         f'Edges: {blue | graph.number_of_edges()}. '.ljust(25) +
-                         f'[{percents(graph.number_of_nodes(), parameters.n)}]')
+                         f'Nodes: {blue | self.number_of_nodes()}, '.ljust(23) +
+                         f'Edges: {blue | self.number_of_edges()}. '.ljust(25) +
+                         f'[{percents(self.number_of_nodes(), parameters.n)}]')
+
+            if checkpoint is not None:
+                checkpoint(steps, self)
 
-        return graph
+            for observer in observers:
+                observer(steps, self)
+
+        return self
 
     @classmethod
-    def initial(cls, parameters: Parameters) -> 'Hypergraph':
+    def initial(cls, parameters: Parameters, random: Optional[Random] = None) -> 'Hypergraph':
         """Generates the initial graph according to the model."""
 
-        e = [[] for _ in range(parameters.c)]
-        v = [[] for _ in range(parameters.n)]
-        d = [0  for _ in range(parameters.n)]
+        e = [EndpointPool() for _ in range(parameters.c)]
         q = []
 
-        nodes = [[] for _ in range(parameters.c)]
-        edges = []
+        nodes = [EndpointPool() for _ in range(parameters.c)]
+        edges = Incidence(parameters.n0)
 
         for node in range(parameters.n0):
             # Assign nodes to communities in a cyclic manner,
@@ -175,7 +241,9 @@ class Hypergraph:
             nodes[community].append(node)
             q.append(community)
 
-        return Hypergraph(nodes, edges, e=e, v=v, d=d, q=q)
+        random = random if random is not None else Random()
+
+        return Hypergraph(nodes, edges, e=e, q=q, random=random)
 
     def number_of_nodes(self) -> int:
         """Returns the number of nodes in the graph."""
@@ -185,62 +253,86 @@ class Hypergraph:
         """Returns the number of edges in the graph."""
         return len(self.edges)
 
+    def snapshot(self, step: int) -> Snapshot:
+        """Returns a summary of the graph at the step ``step``."""
+        return Snapshot(step=step,
+                        nodes=self.number_of_nodes(),
+                        edges=self.number_of_edges(),
+                        active=self.number_of_nodes(),
+                        histogram=np.bincount(self.d))
+
     def add_node(self, parameters: Parameters):
         """Adds a node to the graph."""
 
-        community = np.random.choice(parameters.aux.communities, p=parameters.m)
+        self.add_node_to(parameters.aux.communities_table.choice(self.random.uniform()))
+
+    def add_node_to(self, community: int):
+        """Adds a node to the community ``community``."""
 
         self.nodes[community].append(len(self.q))
         self.q.append(community)
+        self.edges.add_nodes()
 
     def add_node_and_edge(self, parameters: Parameters):
-        """Adds a node and an edge to the graph. Or does it?"""
-        raise ಠ_ಠ("This shouldn't have happened...")
+        """Adds a node to the graph along with a hyperedge that connects it
+        with ``h - 1`` other nodes of its community (``h`` is drawn from
+        ``distribution``), which are picked as in ``add_edge``."""
+
+        community = parameters.aux.communities_table.choice(self.random.uniform())
+        h = parameters.distribution(self.random)
+
+        # Other members are picked before the node is added,
+        # so that the node is not picked as a member of its own hyperedge.
+        edge = np.append(self.hyperedge(parameters, community, h - 1), len(self.q))
+
+        self.add_node_to(community)
+
+        self.edges.append(edge)
+        self.e[community].extend(edge)
 
     def add_edge(self, parameters: Parameters):
         """Adds an edge to the graph."""
 
         # Select a random pair from `communities_pairs`.
-        pair_idx = np.random.choice(parameters.aux.communities_pairs.shape[0], p=parameters.aux.p_flat)
+        pair_idx = parameters.aux.communities_pairs_table.choice(self.random.uniform())
         pair = parameters.aux.communities_pairs[pair_idx]
 
         q1, q2 = pair
-        h1, h2 = parameters.distribution(), parameters.distribution()
+        h1, h2 = parameters.distribution(self.random), parameters.distribution(self.random)
+
+        e1 = self.hyperedge(parameters, q1, h1)
+        e2 = self.hyperedge(parameters, q2, h2)
+
+        self.edges.append(np.concatenate((e1, e2)))
+
+        self.e[q1].extend(e1)
+        self.e[q2].extend(e2)
 
-        def hyperedge(q: int, h: int) -> list[int]:
-            e = []
-            x = len(self.nodes[q])  # The number of nodes in the community `q`.
-            y = len(self.e[q])      # The sum of degrees of nodes in the community `q`.
-            p = parameters.gamma * x / (y + parameters.gamma * x)
+    def hyperedge(self, parameters: Parameters, q: int, h: int) -> np.ndarray:
+        """Picks ``h`` random nodes of the community ``q`` for a hyperedge.
 
-            # Pick `h` random nodes for a hyperedge.
-            for _ in range(h):
-                # Either we pick a completely random node because of `gamma`,
-                # or according to degrees of nodes.
-                if np.random.uniform() < p:
-                    u = np.random.choice(self.nodes[q])
-                else:
-                    d = int(len(self.e[q]) * np.random.uniform())
-                    u = self.e[q][d]
+        Every node is either picked uniformly (because of ``gamma``) or
+        according to degrees of nodes; all ``h`` nodes are drawn at once.
+        """
 
-                e.append(u)
+        h = max(h, 0)  # Normal distributions may yield negative sizes.
 
-            return e
+        x = len(self.nodes[q])  # The number of nodes in the community `q`.
+        y = len(self.e[q])      # The sum of degrees of nodes in the community `q`.
+        p = parameters.gamma * x / (y + parameters.gamma * x)
 
-        e1 = hyperedge(q1, h1)
-        e2 = hyperedge(q2, h2)
+        u = self.random.uniforms(2 * h)
 
-        self.edges.append(e1 + e2)
+        # Either a node is picked uniformly, or according to its degree;
+        # the second half of `u` gives positions in the corresponding pool.
+        uniformly = u[:h] < p
+        positions = (u[h:] * np.where(uniformly, x, y)).astype(np.int64)
 
-        for u in e1:
-            self.v[u].append(len(self.edges))
-            self.d[u] += 1
-            self.e[q1].append(u)
+        e = np.empty(h, dtype=np.int32)
+        e[uniformly] = self.nodes[q].as_array()[positions[uniformly]]
+        e[~uniformly] = self.e[q].as_array()[positions[~uniformly]]
 
-        for u in e2:
-            self.v[u].append(len(self.edges))
-            self.d[u] += 1
-            self.e[q2].append(u)
+        return e
 
 
 if __name__ == '__main__':
@@ -275,7 +367,7 @@ if __name__ == '__main__':
                  f'{blue | graph.number_of_edges()} edges.')
 
     with log.scope.info('Computing the degree distribution.'), suppress_stderr():
-        distribution = Distribution(graph.d)
+        distribution = Distribution(graph.d.tolist())
         fit = pl.Fit(distribution.as_list(), discrete=True)
 
     with log.scope.info('Plotting the distribution.'):
@@ -4,7 +4,8 @@ a power-law distribution with an exponential cutoff.
 """
 
 from dataclasses import dataclass, asdict
-from typing import Callable
+from pathlib import Path
+from typing import Iterable, Optional, Union
 
 import numpy as np
 import powerlaw as pl
@@ -13,7 +14,12 @@ from pfe.misc import distributions
 from pfe.misc.log import Pretty, Log, Nothing, suppress_stderr
 from pfe.misc.log.misc import percents
 from pfe.misc.plot import Plot
+from pfe.misc.rng import Random
 from pfe.misc.style import magenta, blue
+from pfe.models.checkpoint import Checkpoint, load
+from pfe.models.incidence import Incidence
+from pfe.models.observers import Observer, Snapshot
+from pfe.models.sampling import FenwickTree, IndexedSet
 from pfe.tasks.distributions import Distribution
 
 
@@ -33,7 +39,7 @@ class Parameters:
     n: int
     p: float
     q: float
-    d: Callable[[], int]
+    d: distributions.Cardinality
 
     def __post_init__(self):
         """Validates parameters of the model."""
@@ -56,57 +62,125 @@ class Hypergraph:
     """A hypergraph generated according to the model.
 
     :param nodes: a list of nodes.
-    :param edges: a list of hyperedges
-                  (each hyperedge is represented as a list of vertices).
+    :param edges: an ``Incidence`` of hyperedges (which also keeps degrees).
+    :param active: a list of flags whether nodes are active.
+    :param random: a source of random numbers.
+
+    Active nodes are additionally kept in an ``IndexedSet`` (to pick them
+    uniformly) and in a ``FenwickTree`` over ``degree * active`` (to pick them
+    proportionally to their degrees), so that every step takes ``O(log n)``.
     """
 
     def __init__(self,
                  nodes: list[int],
-                 edges: list[list[int]],
-                 degree: list[int],
-                 active: list[bool]):
+                 edges: Incidence,
+                 active: list[bool],
+                 random: Random):
         """Initialises the graph."""
 
         self.nodes = nodes
         self.edges = edges
-        self.degree = degree
         self.active = active
+        self.random = random
 
-    @classmethod
-    def generate(cls, parameters: Parameters, log: Log = Nothing()) -> 'Hypergraph':
-        """Generates a graph according to the model with the provided parameters."""
+        self.active_nodes = IndexedSet(n for n in nodes if active[n])
+        self.weights = FenwickTree(len(active))
+
+        for n in self.active_nodes:
+            self.weights.add(n, int(self.degree[n]))
 
-        graph = cls.initial(parameters)
-        steps = 0
+    @property
+    def degree(self) -> np.ndarray:
+        """Returns degrees of nodes."""
+        return self.edges.degree
+
+    @classmethod
+    def generate(cls,
+                 parameters: Parameters,
+                 log: Log = Nothing(),
+                 random: Optional[Random] = None,
+                 checkpoint: Optional[Checkpoint] = None,
+                 observers: Iterable[Observer] = ()) -> 'Hypergraph':
+        """Generates a graph according to the model with the provided parameters.
+
+        :param parameters: parameters of the model.
+        :param log: an instance of ``Log`` to log the execution with.
+        :param random: a source of random numbers (optional).
+        :param checkpoint: a ``Checkpoint`` to save the state with (optional).
+        :param observers: ``Observer``-s to pass snapshots of the graph to.
+        """
+        return cls.initial(parameters, random).run(parameters, 0, log, checkpoint, observers)
 
-        while graph.number_of_nodes() < parameters.n:
-            p = np.random.uniform()
-            q = np.random.uniform()
+    @classmethod
+    def resume(cls,
+               path: Union[str, Path],
+               parameters: Parameters,
+               log: Log = Nothing(),
+               checkpoint: Optional[Checkpoint] = None,
+               observers: Iterable[Observer] = ()) -> 'Hypergraph':
+        """Resumes the generation from a checkpoint.
+
+        :param path: the path to the checkpoint file.
+        :param parameters: parameters of the model (the same as
+                           the ones of the interrupted generation).
+        :param log: an instance of ``Log`` to log the execution with.
+        :param checkpoint: a ``Checkpoint`` to save the state with (optional).
+        :param observers: ``Observer``-s to pass snapshots of the graph to.
+        """
+
+        steps, graph = load(path)
+
+        return graph.run(parameters, steps, log, checkpoint, observers)
+
+    def run(self,
+            parameters: Parameters,
+            steps: int = 0,
+            log: Log = Nothing(),
+            checkpoint: Optional[Checkpoint] = None,
+            observers: Iterable[Observer] = ()) -> 'Hypergraph':
+        """Runs the process until the graph has ``parameters.n`` nodes.
+
+        :param parameters: parameters of the model.
+        :param steps: the number of steps that were already made.
+        :param log: an instance of ``Log`` to log the execution with.
+        :param checkpoint: a ``Checkpoint`` to save the state with (optional).
+        :param observers: ``Observer``-s to pass snapshots of the graph to.
+        """
+
+        while self.number_of_nodes() < parameters.n:
+            p = self.random.uniform()
+            q = self.random.uniform()
 
             if p <= parameters.p:
-                graph.add_node(parameters)
+                self.add_node(parameters)
             else:
                 if q <= parameters.q:
-                    graph.add_edge(parameters)
+                    self.add_edge(parameters)
                 else:
-                    graph.deactivate_node(parameters)
+                    self.deactivate_node(parameters)
 
             if (steps := steps + 1) % 1000 == 0:
                 log.info(f'Step {magenta | steps}.'.ljust(23) +
-                         f'Nodes: {blue | graph.number_of_nodes()}, '.ljust(23) +
-                         f'Edges: {blue | graph.number_of_edges()}. '.ljust(25) +
-                         f'[{percents(graph.number_of_nodes(), parameters.n)}]')
+                         f'Nodes: {blue | self.number_of_nodes()}, '.ljust(23) +
+                         f'Edges: {blue | self.number_of_edges()}. '.ljust(25) +
+                         f'[{percents(self.number_of_nodes(), parameters.n)}]')
 
-        return graph
+            if checkpoint is not None:
+                checkpoint(steps, self)
+
+            for observer in observers:
+                observer(steps, self)
+
+        return self
 
     @classmethod
-    def initial(cls, parameters: Parameters) -> 'Hypergraph':
+    def initial(cls, parameters: Parameters, random: Optional[Random] = None) -> 'Hypergraph':
         """Generates the initial graph according to the model."""
 
         graph = Hypergraph(nodes=[],
-                           edges=[],
-                           degree=[0] * parameters.n,
-                           active=[True] * parameters.n)
+                           edges=Incidence(),
+                           active=[True] * parameters.n,
+                           random=random if random is not None else Random())
 
         for _ in range(parameters.n0):
             graph.add_node(parameters)
@@ -121,48 +195,62 @@ class Hypergraph:
         """Returns the number of edges in the graph."""
         return len(self.edges)
 
-    def add_node(self, _: Parameters):
+    def snapshot(self, step: int) -> Snapshot:
+        """Returns a summary of the graph at the step ``step``."""
+        return Snapshot(step=step,
+                        nodes=self.number_of_nodes(),
+                        edges=self.number_of_edges(),
+                        active=len(self.active_nodes),
+                        histogram=np.bincount(self.degree))
+
+    def add_node(self, parameters: Parameters):
         """Adds a node to the graph."""
 
         self.nodes.append(node := self.number_of_nodes())
+        self.edges.add_nodes()
+        self.active_nodes.add(node)
 
-        active = [n for n in self.nodes if self.active[n]]
+        active = self.active_nodes
 
-        if len(active) >= (size := parameters.d()):
-            edge = np.random.choice(active, size=size - 1)
-            edge = np.append(edge, node)
-            edge = list(edge)
+        if len(active) >= (size := parameters.d(self.random)):
+            edge = [active.choice(self.random.uniform()) for _ in range(size - 1)]
+            edge.append(node)
 
-            self.edges.append(edge)
-
-            for x in edge:
-                self.degree[x] += 1
+            self.append(edge)
 
     def add_edge(self, parameters: Parameters):
         """Adds an edge to the graph."""
 
-        p = [self.degree[n] * self.active[n] for n in self.nodes]
-        p = np.asarray(p, dtype=np.float64)
-        p = p / p.sum()
+        # Nodes are chosen proportionally to their degrees,
+        # which requires at least one active node with a positive degree.
+        if self.weights.total() <= 0:
+            return
 
-        size = parameters.d()
-        edge = np.random.choice(self.nodes, p=p, size=size)  # Should `replace=False` be set?
+        size = parameters.d(self.random)
+        edge = [self.weights.find(self.random.uniform()) for _ in range(size)]  # Should `replace=False` be set?
 
-        self.edges.append(edge)
-
-        for node in edge:
-            self.degree[node] += 1
+        self.append(edge)
 
     def deactivate_node(self, _: Parameters):
         """Deactivate a node."""
 
-        p = [self.degree[n] * self.active[n] for n in self.nodes]
-        p = np.asarray(p, dtype=np.float64)
-        p = p / p.sum()
+        if self.weights.total() <= 0:
+            return
 
-        node = np.random.choice(self.nodes, p=p)
+        node = self.weights.find(self.random.uniform())
 
         self.active[node] = False
+        self.active_nodes.remove(node)
+        self.weights.add(node, -int(self.degree[node]))
+
+    def append(self, edge: list[int]):
+        """Appends a hyperedge and updates weights of its active members."""
+
+        self.edges.append(edge)
+
+        for node in edge:
+            if self.active[node]:
+                self.weights.add(node, 1)
 
 
 if __name__ == '__main__':
@@ -192,7 +280,7 @@ if __name__ == '__main__':
                  f'{blue | graph.number_of_edges()} edges.')
 
     with log.scope.info('Computing the degree distribution.'), suppress_stderr():
-        distribution = Distribution(graph.degree)
+        distribution = Distribution(graph.degree.tolist())
         fit = pl.Fit(distribution.as_list(), discrete=True)
 
     with log.scope.info('Plotting the distribution.'):
@@ -3,7 +3,8 @@ A model that generates hypergraphs.
 """
 
 from dataclasses import dataclass, asdict
-from typing import Callable
+from pathlib import Path
+from typing import Iterable, Optional, Union
 
 import numpy as np
 import powerlaw as pl
@@ -12,7 +13,11 @@ from pfe.misc import distributions
 from pfe.misc.log import Pretty, Log, Nothing, suppress_stderr
 from pfe.misc.log.misc import percents
 from pfe.misc.plot import Plot
+from pfe.misc.rng import Random
 from pfe.misc.style import magenta, blue
+from pfe.models.checkpoint import Checkpoint, load
+from pfe.models.incidence import Incidence
+from pfe.models.observers import Observer, Snapshot
 from pfe.tasks.distributions import Distribution
 
 
@@ -30,7 +35,7 @@ class Parameters:
     n0: int
     n: int
     p: float
-    d: Callable[[], int]
+    d: distributions.Cardinality
 
     def __post_init__(self):
         """Validates parameters of the model."""
@@ -46,48 +51,112 @@ class Hypergraph:
     """A hypergraph generated according to the model.
 
     :param nodes: a list of nodes.
-    :param edges: a list of hyperedges
-                  (each hyperedge is represented as a list of vertices).
+    :param edges: an ``Incidence`` of hyperedges (which also keeps degrees).
+    :param random: a source of random numbers.
+
+    Nodes are picked proportionally to their degrees from the endpoints
+    of ``edges``, where every node is repeated as many times as its degree,
+    so that every step takes ``O(size)`` time, where ``size`` is
+    the cardinality of the added hyperedge.
     """
 
     def __init__(self,
                  nodes: list[int],
-                 edges: list[list[int]],
-                 degree: list[int]):
+                 edges: Incidence,
+                 random: Random):
         """Initialises the graph."""
 
         self.nodes = nodes
         self.edges = edges
-        self.degree = degree
+        self.random = random
 
-    @classmethod
-    def generate(cls, parameters: Parameters, log: Log = Nothing()) -> 'Hypergraph':
-        """Generates a graph according to the model with the provided parameters."""
+    @property
+    def degree(self) -> np.ndarray:
+        """Returns degrees of nodes."""
+        return self.edges.degree
 
-        graph = cls.initial(parameters)
-        steps = 0
+    @classmethod
+    def generate(cls,
+                 parameters: Parameters,
+                 log: Log = Nothing(),
+                 random: Optional[Random] = None,
+                 checkpoint: Optional[Checkpoint] = None,
+                 observers: Iterable[Observer] = ()) -> 'Hypergraph':
+        """Generates a graph according to the model with the provided parameters.
+
+        :param parameters: parameters of the model.
+        :param log: an instance of ``Log`` to log the execution with.
+        :param random: a source of random numbers (optional).
+        :param checkpoint: a ``Checkpoint`` to save the state with (optional).
+        :param observers: ``Observer``-s to pass snapshots of the graph to.
+        """
+        return cls.initial(parameters, random).run(parameters, 0, log, checkpoint, observers)
 
-        while graph.number_of_nodes() < parameters.n:
-            p = np.random.uniform()
+    @classmethod
+    def resume(cls,
+               path: Union[str, Path],
+               parameters: Parameters,
+               log: Log = Nothing(),
+               checkpoint: Optional[Checkpoint] = None,
+               observers: Iterable[Observer] = ()) -> 'Hypergraph':
+        """Resumes the generation from a checkpoint.
+
+        :param path: the path to the checkpoint file.
+        :param parameters: parameters of the model (the same as
+                           the ones of the interrupted generation).
+        :param log: an instance of ``Log`` to log the execution with.
+        :param checkpoint: a ``Checkpoint`` to save the state with (optional).
+        :param observers: ``Observer``-s to pass snapshots of the graph to.
+        """
+
+        steps, graph = load(path)
+
+        return graph.run(parameters, steps, log, checkpoint, observers)
+
+    def run(self,
+            parameters: Parameters,
+            steps: int = 0,
+            log: Log = Nothing(),
+            checkpoint: Optional[Checkpoint] = None,
+            observers: Iterable[Observer] = ()) -> 'Hypergraph':
+        """Runs the process until the graph has ``parameters.n`` nodes.
+
+        :param parameters: parameters of the model.
+        :param steps: the number of steps that were already made.
+        :param log: an instance of ``Log`` to log the execution with.
+        :param checkpoint: a ``Checkpoint`` to save the state with (optional).
+        :param observers: ``Observer``-s to pass snapshots of the graph to.
+        """
+
+        while self.number_of_nodes() < parameters.n:
+            p = self.random.uniform()
 
             if p <= parameters.p:
-                graph.add_node(parameters)
+                self.add_node(parameters)
             else:
-                graph.add_edge(parameters)
+                self.add_edge(parameters)
 
             if (steps := steps + 1) % 1000 == 0:
                 log.info(f'Step {magenta | steps}.'.ljust(23) +
-                         f'Nodes: {blue | graph.number_of_nodes()}, '.ljust(23) +
-                         f'Edges: {blue | graph.number_of_edges()}. '.ljust(25) +
-                         f'[{percents(graph.number_of_nodes(), parameters.n)}]')
+                         f'Nodes: {blue | self.number_of_nodes()}, '.ljust(23) +
+                         f'Edges: {blue | self.number_of_edges()}. '.ljust(25) +
+                         f'[{percents(self.number_of_nodes(), parameters.n)}]')
 
-        return graph
+            if checkpoint is not None:
+                checkpoint(steps, self)
+
+            for observer in observers:
+                observer(steps, self)
+
+        return self
 
     @classmethod
-    def initial(cls, parameters: Parameters) -> 'Hypergraph':
+    def initial(cls, parameters: Parameters, random: Optional[Random] = None) -> 'Hypergraph':
         """Generates the initial graph according to the model."""
 
-        graph = Hypergraph(nodes=[], edges=[], degree=[0] * parameters.n)
+        graph = Hypergraph(nodes=[],
+                           edges=Incidence(),
+                           random=random if random is not None else Random())
 
         for _ in range(parameters.n0):
             graph.add_node(parameters)
@@ -102,36 +171,39 @@ class Hypergraph:
         """Returns the number of edges in the graph."""
         return len(self.edges)
 
-    def add_node(self, _: Parameters):
+    def snapshot(self, step: int) -> Snapshot:
+        """Returns a summary of the graph at the step ``step``."""
+        return Snapshot(step=step,
+                        nodes=self.number_of_nodes(),
+                        edges=self.number_of_edges(),
+                        active=self.number_of_nodes(),
+                        histogram=np.bincount(self.degree))
+
+    def add_node(self, parameters: Parameters):
         """Adds a node to the graph."""
 
         self.nodes.append(node := self.number_of_nodes())
+        self.edges.add_nodes()
 
-        if len(self.nodes) >= (size := parameters.d()):
-            edge = np.random.choice(self.nodes, size=size - 1)
+        if len(self.nodes) >= (size := parameters.d(self.random)):
+            edge = self.random.integers(len(self.nodes), size - 1)
             edge = np.append(edge, node)
-            edge = list(edge)
 
             self.edges.append(edge)
 
-            for x in edge:
-                self.degree[x] += 1
-
     def add_edge(self, parameters: Parameters):
         """Adds an edge to the graph."""
 
-        p = [self.degree[n] for n in self.nodes]
-        p = np.asarray(p, dtype=np.float64)
-        p = p / p.sum()
+        # Nodes are chosen proportionally to their degrees,
+        # which requires at least one node with a positive degree.
+        if (incidences := self.edges.number_of_incidences()) == 0:
+            return
 
-        size = parameters.d()
-        edge = np.random.choice(self.nodes, p=p, size=size)  # Should `replace=False` be set?
+        size = parameters.d(self.random)
+        edge = self.edges.endpoints()[self.random.integers(incidences, size)]  # Should `replace=False` be set?
 
         self.edges.append(edge)
 
-        for node in edge:
-            self.degree[node] += 1
-
 
 if __name__ == '__main__':
     log = Pretty()
@@ -159,7 +231,7 @@ if __name__ == '__main__':
                  f'{blue | graph.number_of_edges()} edges.')
 
     with log.scope.info('Computing the degree distribution.'), suppress_stderr():
-        distribution = Distribution(graph.degree)
+        distribution = Distribution(graph.degree.tolist())
         fit = pl.Fit(distribution.as_list(), discrete=True)
 
     with log.scope.info('Plotting the distribution.'):
@@ -0,0 +1,384 @@
+"""
+A compact storage of incidences of generated hypergraphs
+(and of edges of generated graphs).
+"""
+
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+import networkx as nx
+import numpy as np
+
+
+class Incidence:
+    """A growable, array-backed incidence structure of a hypergraph.
+
+    Hyperedges are stored in the CSR format: members of the hyperedge ``i``
+    are ``nodes[offsets[i]:offsets[i + 1]]``. Along with the degrees of nodes,
+    this takes 4 bytes per incidence and 8 bytes per node and hyperedge.
+    The inverse index (hyperedges of every node) is built lazily,
+    also in the CSR format, and is invalidated whenever a hyperedge is added.
+
+    All arrays are ``int32`` and are grown geometrically.
+    """
+
+    __slots__ = ('_offsets', '_nodes', '_degree', '_edges', '_incidences', '_size', '_index')
+
+    def __init__(self, nodes: int = 0, capacity: int = 1024):
+        """Initialises an empty incidence.
+
+        :param nodes: the initial number of nodes.
+        :param capacity: the initial capacity (in hyperedges).
+        """
+
+        self._offsets = np.zeros(max(capacity, 1) + 1, dtype=np.int32)
+        self._nodes = np.empty(4 * max(capacity, 1), dtype=np.int32)
+        self._degree = np.zeros(max(nodes, 16), dtype=np.int32)
+
+        self._edges = 0
+        self._incidences = 0
+        self._size = 0
+        self._index: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+        self.add_nodes(nodes)
+
+    @classmethod
+    def of(cls, edges: Iterable[Iterable[int]], nodes: int = 0) -> 'Incidence':
+        """Constructs an incidence from the provided hyperedges."""
+
+        incidence = cls(nodes)
+        for edge in edges:
+            incidence.append(edge)
+
+        return incidence
+
+    def __getstate__(self) -> tuple:
+        """Returns the used parts of the arrays (for pickling)."""
+        return tuple(x.copy() for x in self.as_arrays())
+
+    def __setstate__(self, state: tuple):
+        """Restores the incidence (for unpickling)."""
+
+        offsets, nodes, degree = state
+
+        self._offsets = offsets
+        self._nodes = nodes
+        self._degree = degree
+        self._edges = len(offsets) - 1
+        self._incidences = len(nodes)
+        self._size = len(degree)
+        self._index = None
+
+    def __len__(self) -> int:
+        """Returns the number of hyperedges."""
+        return self._edges
+
+    def __getitem__(self, i: int) -> np.ndarray:
+        """Returns members of the hyperedge ``i`` (without copying)."""
+
+        if not -self._edges <= i < self._edges:
+            raise IndexError(i)
+
+        i %= self._edges
+
+        return self._nodes[self._offsets[i]:self._offsets[i + 1]]
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        """Returns an iterator over hyperedges."""
+        return (self[i] for i in range(self._edges))
+
+    def number_of_nodes(self) -> int:
+        """Returns the number of nodes."""
+        return self._size
+
+    def number_of_edges(self) -> int:
+        """Returns the number of hyperedges."""
+        return self._edges
+
+    def number_of_incidences(self) -> int:
+        """Returns the number of incidences (the sum of degrees)."""
+        return self._incidences
+
+    @property
+    def degree(self) -> np.ndarray:
+        """Returns degrees of nodes (without copying)."""
+        return self._degree[:self._size]
+
+    def add_nodes(self, k: int = 1) -> int:
+        """Adds ``k`` isolated nodes and returns the label of the first one."""
+
+        first = self._size
+
+        if self._size + k > len(self._degree):
+            self._degree = _grown(self._degree, self._size + k, self._size)
+
+        self._size += k
+
+        return first
+
+    def append(self, edge: Union[Iterable[int], np.ndarray]) -> int:
+        """Adds a hyperedge and returns its label.
+
+        Members of the hyperedge must be existing nodes;
+        repeated members are counted as multiple incidences.
+        """
+
+        edge = edge.tolist() if isinstance(edge, np.ndarray) else list(edge)
+
+        start = self._incidences
+        end = start + len(edge)
+
+        if self._edges + 2 > len(self._offsets):
+            self._offsets = _grown(self._offsets, self._edges + 2, self._edges + 1)
+        if end > len(self._nodes):
+            self._nodes = _grown(self._nodes, end, start)
+
+        self._nodes[start:end] = edge
+
+        # Incrementing one by one is faster than `np.add.at` for small hyperedges.
+        degree = self._degree
+        for x in edge:
+            degree[x] += 1
+
+        self._edges += 1
+        self._offsets[self._edges] = end
+        self._incidences = end
+        self._index = None
+
+        return self._edges - 1
+
+    def endpoints(self) -> np.ndarray:
+        """Returns members of all hyperedges (without copying).
+
+        Every node is present in the result as many times as its multidegree,
+        thus, the result can also be used as an ``EndpointPool``.
+        """
+        return self._nodes[:self._incidences]
+
+    def edges_of(self, node: int) -> np.ndarray:
+        """Returns labels of hyperedges the node belongs to."""
+
+        indptr, indices = self.index()
+
+        return indices[indptr[node]:indptr[node + 1]]
+
+    def index(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the node→hyperedges index in the CSR format (``indptr, indices``),
+        building it if hyperedges were added since the last call."""
+
+        if self._index is None:
+            offsets, nodes, _ = self.as_arrays()
+
+            edges = np.repeat(np.arange(self._edges, dtype=np.int32), np.diff(offsets))
+            order = np.argsort(nodes, kind='stable')
+
+            indptr = np.zeros(self._size + 1, dtype=np.int32)
+            np.cumsum(np.bincount(nodes, minlength=self._size), out=indptr[1:])
+
+            self._index = (indptr, edges[order])
+
+        return self._index
+
+    def as_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns ``offsets``, ``nodes`` and ``degree`` (without copying)."""
+        return (self._offsets[:self._edges + 1],
+                self._nodes[:self._incidences],
+                self._degree[:self._size])
+
+    def save(self, path: Union[str, Path]):
+        """Saves the incidence into an (uncompressed) ``.npz`` file."""
+
+        offsets, nodes, degree = self.as_arrays()
+
+        np.savez(path, offsets=offsets, nodes=nodes, degree=degree)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'Incidence':
+        """Loads an incidence saved with ``save``."""
+
+        with np.load(path) as arrays:
+            state = arrays['offsets'], arrays['nodes'], arrays['degree']
+
+        incidence = cls.__new__(cls)
+        incidence.__setstate__(state)
+
+        return incidence
+
+
+class EdgeList:
+    """A growable, array-backed list of edges of a graph.
+
+    Endpoints of the edge ``i`` are ``endpoints[2 * i]`` and
+    ``endpoints[2 * i + 1]``; along with degrees of nodes, this takes 8 bytes
+    per edge and 4 bytes per node (instead of hundreds of bytes per edge
+    of ``nx.Graph``). Repeated edges are kept: they are counted
+    in ``multidegree`` (the degree in the process that generates the graph),
+    but not in ``degree`` (the degree in the simple graph, as in ``nx.Graph``).
+
+    A ``networkx`` graph is only built on demand (``to_networkx``).
+    All arrays are ``int32`` and are grown geometrically.
+    """
+
+    __slots__ = ('_endpoints', '_degree', '_edges', '_size', '_graph')
+
+    def __init__(self, nodes: int = 0, capacity: int = 1024):
+        """Initialises an empty list of edges.
+
+        :param nodes: the initial number of nodes.
+        :param capacity: the initial capacity (in edges).
+        """
+
+        self._endpoints = np.empty(2 * max(capacity, 1), dtype=np.int32)
+        self._degree = np.zeros(max(nodes, 16), dtype=np.int32)
+
+        self._edges = 0
+        self._size = 0
+        self._graph: Optional[nx.Graph] = None
+
+        self.add_nodes(nodes)
+
+    def __getstate__(self) -> tuple:
+        """Returns the used parts of the arrays (for pickling)."""
+        return tuple(x.copy() for x in self.as_arrays())
+
+    def __setstate__(self, state: tuple):
+        """Restores the list (for unpickling)."""
+
+        endpoints, degree = state
+
+        self._endpoints = endpoints.ravel()
+        self._degree = degree
+        self._edges = len(self._endpoints) // 2
+        self._size = len(degree)
+        self._graph = None
+
+    def __len__(self) -> int:
+        """Returns the number of stored edges (including repeated ones)."""
+        return self._edges
+
+    def number_of_nodes(self) -> int:
+        """Returns the number of nodes."""
+        return self._size
+
+    def number_of_edges(self) -> int:
+        """Returns the number of edges in the simple graph (i.e., repeated edges
+        are counted once, as in ``nx.Graph``); computed in ``O(m log m)``."""
+        return len(self._unique())
+
+    def number_of_multiedges(self) -> int:
+        """Returns the number of edges (including repeated ones)."""
+        return self._edges
+
+    @property
+    def multidegree(self) -> np.ndarray:
+        """Returns degrees of nodes where repeated edges
+        are counted as many times as they occur (without copying)."""
+        return self._degree[:self._size]
+
+    @property
+    def degree(self) -> np.ndarray:
+        """Returns degrees of nodes in the simple graph, i.e., the numbers
+        of distinct neighbours (a self-loop counts twice, as in ``nx.Graph``).
+
+        Unlike ``multidegree``, degrees are computed on every call
+        (in ``O(m log m)``).
+        """
+
+        unique = self._unique()
+
+        return np.bincount(np.concatenate((unique // self._size, unique % self._size)),
+                           minlength=self._size).astype(np.int32)
+
+    def add_nodes(self, k: int = 1) -> int:
+        """Adds ``k`` isolated nodes and returns the label of the first one."""
+
+        first = self._size
+
+        if self._size + k > len(self._degree):
+            self._degree = _grown(self._degree, self._size + k, self._size)
+
+        self._size += k
+        self._graph = None
+
+        return first
+
+    def append(self, u: int, v: int):
+        """Adds an edge between existing nodes ``u`` and ``v``."""
+
+        i = 2 * self._edges
+
+        if i + 2 > len(self._endpoints):
+            self._endpoints = _grown(self._endpoints, i + 2, i)
+
+        self._endpoints[i] = u
+        self._endpoints[i + 1] = v
+
+        self._degree[u] += 1
+        self._degree[v] += 1
+
+        self._edges += 1
+        self._graph = None
+
+    def endpoints(self) -> np.ndarray:
+        """Returns endpoints of all edges (without copying).
+
+        Every node is present in the result as many times as its degree,
+        thus, the result can also be used as an ``EndpointPool``.
+        """
+        return self._endpoints[:2 * self._edges]
+
+    def as_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns edges as an ``(m, 2)`` array and multidegrees (without copying)."""
+        return self.endpoints().reshape(-1, 2), self.multidegree
+
+    def to_networkx(self) -> nx.Graph:
+        """Returns the graph as ``nx.Graph`` (where repeated edges are merged).
+
+        The graph is built on the first call and cached
+        until the list is changed.
+        """
+
+        if self._graph is None:
+            graph = nx.Graph()
+            graph.add_nodes_from(range(self._size))
+            graph.add_edges_from(self.as_arrays()[0].tolist())
+
+            self._graph = graph
+
+        return self._graph
+
+    def save(self, path: Union[str, Path]):
+        """Saves the list into an (uncompressed) ``.npz`` file."""
+
+        edges, degree = self.as_arrays()
+
+        np.savez(path, edges=edges, degree=degree)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'EdgeList':
+        """Loads a list saved with ``save``."""
+
+        with np.load(path) as arrays:
+            state = arrays['edges'], arrays['degree']
+
+        edges = cls.__new__(cls)
+        edges.__setstate__(state)
+
+        return edges
+
+    def _unique(self) -> np.ndarray:
+        """Returns distinct edges encoded as ``u * n + v`` (where ``u <= v``)."""
+
+        edges = np.sort(self.as_arrays()[0].astype(np.int64), axis=1)
+
+        return np.unique(edges[:, 0] * self._size + edges[:, 1])
+
+
+def _grown(array: np.ndarray, capacity: int, used: int) -> np.ndarray:
+    """Returns a copy of the first ``used`` elements of ``array``
+    in a new (zero-filled) array of at least ``capacity`` elements."""
+
+    grown = np.zeros(max(capacity, 2 * len(array)), dtype=array.dtype)
+    grown[:used] = array[:used]
+
+    return grown
@@ -0,0 +1,155 @@
+"""
+Observers that receive summaries of generated graphs during generation,
+which allows studying the evolution of a graph within a single run.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator, Optional, Union
+
+import numpy as np
+
+
+@dataclass
+class Snapshot:
+    # noinspection PyUnresolvedReferences
+    """A summary of a graph at some step of the generation.
+
+    :param step: the number of steps made.
+    :param nodes: the number of nodes.
+    :param edges: the number of (hyper)edges.
+    :param active: the number of active nodes.
+    :param histogram: the degree histogram
+                      (``histogram[k]`` is the number of nodes of degree ``k``).
+    """
+
+    step: int
+    nodes: int
+    edges: int
+    active: int
+    histogram: np.ndarray
+
+
+class Observer:
+    """Receives a ``Snapshot`` of a graph every ``steps`` steps
+    and/or every ``nodes`` added nodes.
+
+    Generators call an observer with the current step and the graph
+    (which must provide ``number_of_nodes()`` and ``snapshot(step)``)
+    after every step; the snapshot is only built when it is due.
+    Subclasses override ``observe``.
+
+    :param steps: the interval of snapshots in steps (optional).
+    :param nodes: the interval of snapshots in nodes (optional).
+    """
+
+    __slots__ = ('steps', 'nodes', '_nodes')
+
+    def __init__(self, steps: Optional[int] = None, nodes: Optional[int] = None):
+        if steps is None and nodes is None:
+            raise ValueError('`steps` or `nodes` must be specified.')
+        if steps is not None and steps <= 0:
+            raise ValueError('`steps` must be positive.')
+        if nodes is not None and nodes <= 0:
+            raise ValueError('`nodes` must be positive.')
+
+        self.steps = steps
+        self.nodes = nodes
+
+        self._nodes = 0
+
+    def __call__(self, step: int, graph: Any):
+        """Passes a snapshot of the graph to ``observe`` if it is due."""
+
+        due = self.steps is not None and step % self.steps == 0
+
+        if self.nodes is not None and (nodes := graph.number_of_nodes()) - self._nodes >= self.nodes:
+            self._nodes = nodes
+            due = True
+
+        if due:
+            self.observe(graph.snapshot(step))
+
+    def observe(self, snapshot: Snapshot):
+        """Receives a snapshot."""
+
+
+class Series(Observer):
+    """An observer that stores snapshots as a compact time series.
+
+    Only scalar summaries and histograms are kept (never the graph itself).
+    When saved into an ``.npz`` file, scalar summaries are packed into
+    an ``int64`` table, and histograms are concatenated into a single array
+    (in the CSR format).
+
+    An example.
+    ::
+        series = Series(nodes=1000)
+
+        Hypergraph.generate(parameters, observers=[series])
+
+        for snapshot in series:
+            print(snapshot.nodes, snapshot.histogram)
+    """
+
+    __slots__ = ('_rows', '_histograms')
+
+    def __init__(self, steps: Optional[int] = None, nodes: Optional[int] = None):
+        super().__init__(steps, nodes)
+
+        self._rows: list[tuple[int, int, int, int]] = []
+        self._histograms: list[np.ndarray] = []
+
+    def __len__(self) -> int:
+        """Returns the number of snapshots."""
+        return len(self._rows)
+
+    def __getitem__(self, i: int) -> Snapshot:
+        """Returns the snapshot ``i``."""
+        return Snapshot(*self._rows[i], histogram=self._histograms[i])
+
+    def __iter__(self) -> Iterator[Snapshot]:
+        """Returns an iterator over snapshots."""
+        return (self[i] for i in range(len(self)))
+
+    def observe(self, snapshot: Snapshot):
+        """Stores the snapshot."""
+
+        self._rows.append((snapshot.step, snapshot.nodes, snapshot.edges, snapshot.active))
+        self._histograms.append(np.asarray(snapshot.histogram, dtype=np.int64))
+
+    def column(self, name: str) -> np.ndarray:
+        """Returns values of a scalar summary (``step``, ``nodes``, ``edges``
+        or ``active``) of all snapshots as an array."""
+
+        i = ('step', 'nodes', 'edges', 'active').index(name)
+
+        return np.fromiter((row[i] for row in self._rows), dtype=np.int64, count=len(self._rows))
+
+    def save(self, path: Union[str, Path]):
+        """Saves the series into an ``.npz`` file."""
+
+        offsets = np.zeros(len(self._histograms) + 1, dtype=np.int64)
+        np.cumsum([len(x) for x in self._histograms], out=offsets[1:])
+
+        np.savez_compressed(path,
+                            rows=np.asarray(self._rows, dtype=np.int64).reshape(-1, 4),
+                            offsets=offsets,
+                            histograms=np.concatenate(self._histograms or [np.zeros(0, dtype=np.int64)]),
+                            intervals=np.asarray([self.steps or 0, self.nodes or 0]))
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'Series':
+        """Loads a series saved with ``save``."""
+
+        with np.load(path) as arrays:
+            rows = arrays['rows']
+            offsets = arrays['offsets']
+            histograms = arrays['histograms']
+            steps, nodes = arrays['intervals'].tolist()
+
+        series = cls(steps or None, nodes or None)
+        series._rows = [tuple(row) for row in rows.tolist()]
+        series._histograms = [histograms[offsets[i]:offsets[i + 1]] for i in range(len(rows))]
+
+        return series
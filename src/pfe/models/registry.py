@@ -0,0 +1,63 @@
+"""
+A registry of generative models that allows running any of them
+uniformly by name (e.g., in worker processes).
+"""
+
+from typing import Any, Union
+
+import networkx as nx
+import numpy as np
+
+from pfe.misc.log import Log, Nothing
+from pfe.misc.rng import Random
+from pfe.models import graph_cutoff, hypergraph_communities, hypergraph_cutoff, hypergraph_regular
+from pfe.models.incidence import EdgeList
+
+
+MODELS: dict[str, type] = {
+    'graph_cutoff': graph_cutoff.Parameters,
+    'hypergraph_cutoff': hypergraph_cutoff.Parameters,
+    'hypergraph_regular': hypergraph_regular.Parameters,
+    'hypergraph_communities': hypergraph_communities.Parameters,
+}
+"""Maps names of models to classes of their parameters."""
+
+
+def parameters_of(model: str, design: dict[str, Any]) -> Any:
+    """Constructs (and thus validates) parameters of the model.
+
+    :raise KeyError: if the model is unknown.
+    :raise ValueError: if the parameters are invalid.
+    """
+    return MODELS[model](**design)
+
+
+def generate(model: str, parameters: Any, random: Random, log: Log = Nothing()) -> Any:
+    """Generates a graph according to the model with the provided parameters."""
+
+    if model == 'graph_cutoff':
+        return graph_cutoff.generate(parameters, log=log, random=random)
+    if model == 'hypergraph_cutoff':
+        return hypergraph_cutoff.Hypergraph.generate(parameters, log=log, random=random)
+    if model == 'hypergraph_regular':
+        return hypergraph_regular.Hypergraph.generate(parameters, log=log, random=random)
+    if model == 'hypergraph_communities':
+        return hypergraph_communities.Hypergraph.generate(parameters, log=log, random=random)
+
+    raise KeyError(model)
+
+
+def degrees(graph: Union[nx.Graph, Any]) -> np.ndarray:
+    """Returns degrees of nodes of a generated graph.
+
+    For graphs, these are degrees in the simple graph (repeated edges
+    of an ``EdgeList`` are counted once, as in ``nx.Graph``); for hypergraphs,
+    these are the numbers of hyperedges that nodes belong to.
+    """
+
+    if isinstance(graph, nx.Graph):
+        return np.fromiter((d for _, d in graph.degree), dtype=np.int64, count=graph.number_of_nodes())
+    if isinstance(graph, EdgeList):
+        return graph.degree.astype(np.int64)
+
+    return np.asarray(graph.edges.degree, dtype=np.int64)
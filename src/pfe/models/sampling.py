@@ -0,0 +1,335 @@
+"""
+Data structures that allow sampling elements of generative models
+in sub-linear time.
+"""
+
+from typing import Iterable, Iterator, Union
+
+import numpy as np
+
+from pfe.misc.rng import Random
+
+
+class IndexedSet:
+    """A set of non-negative integers that supports adding, removing
+    and picking a uniformly random element in ``O(1)``.
+
+    Elements are stored in a list; an element is removed by swapping it
+    with the last element of the list.
+    """
+
+    __slots__ = ('_items', '_positions')
+
+    def __init__(self, items: Iterable[int] = ()):
+        self._items: list[int] = []
+        self._positions: dict[int, int] = {}
+
+        for x in items:
+            self.add(x)
+
+    def __len__(self) -> int:
+        """Returns the number of elements in the set."""
+        return len(self._items)
+
+    def __contains__(self, x: int) -> bool:
+        """Checks whether ``x`` is in the set."""
+        return x in self._positions
+
+    def __iter__(self) -> Iterator[int]:
+        """Returns an iterator over elements of the set (in no particular order)."""
+        return iter(self._items)
+
+    def add(self, x: int):
+        """Adds ``x`` to the set (if it is not there yet)."""
+
+        if x not in self._positions:
+            self._positions[x] = len(self._items)
+            self._items.append(x)
+
+    def remove(self, x: int):
+        """Removes ``x`` from the set.
+
+        :raise KeyError: if ``x`` is not in the set.
+        """
+
+        i = self._positions.pop(x)
+        last = self._items.pop()
+
+        if i < len(self._items):
+            self._items[i] = last
+            self._positions[last] = i
+
+    def choice(self, u: float) -> int:
+        """Returns an element of the set chosen uniformly at random.
+
+        :param u: a random number uniformly distributed in ``[0, 1)``.
+        """
+        return self._items[int(u * len(self._items))]
+
+    def choice_except(self, u: float, x: int) -> int:
+        """Returns an element of the set other than ``x``
+        chosen uniformly at random.
+
+        :param u: a random number uniformly distributed in ``[0, 1)``.
+        :param x: an element of the set to exclude.
+        """
+
+        i = int(u * (len(self._items) - 1))
+
+        # Skip the position of `x`, so that every
+        # other element is equally likely to be chosen.
+        if i >= self._positions[x]:
+            i += 1
+
+        return self._items[i]
+
+
+class FenwickTree:
+    """A Fenwick tree (a binary indexed tree) over non-negative weights
+    that supports updating a weight and picking an index with
+    the probability proportional to its weight in ``O(log n)``.
+
+    The tree grows automatically when a weight beyond its capacity is updated.
+
+    .. [1] Peter M. Fenwick,
+           "A new data structure for cumulative frequency tables",
+           Software: Practice and Experience, 24(3):327–336, 1994.
+           https://doi.org/10.1002/spe.4380240306
+    """
+
+    __slots__ = ('_tree', '_weights', '_total')
+
+    def __init__(self, capacity: int = 16):
+        size = 1
+        while size < capacity:
+            size *= 2
+
+        self._tree = [0] * (size + 1)
+        self._weights = [0] * size
+        self._total = 0
+
+    def __len__(self) -> int:
+        """Returns the capacity of the tree."""
+        return len(self._weights)
+
+    def __getitem__(self, i: int) -> float:
+        """Returns the weight of the index ``i``."""
+        return self._weights[i] if i < len(self._weights) else 0
+
+    def total(self) -> float:
+        """Returns the sum of all weights."""
+        return self._total
+
+    def add(self, i: int, delta: float):
+        """Adds ``delta`` to the weight of the index ``i``."""
+
+        while i >= len(self._weights):
+            self._grow()
+
+        self._weights[i] += delta
+        self._total += delta
+
+        tree = self._tree
+        size = len(tree)
+
+        i += 1
+        while i < size:
+            tree[i] += delta
+            i += i & -i
+
+    def find(self, u: float) -> int:
+        """Returns an index chosen with the probability
+        proportional to its weight.
+
+        :param u: a random number uniformly distributed in ``[0, 1)``.
+        """
+
+        target = u * self._total
+        tree = self._tree
+        size = len(tree)
+
+        i = 0
+        step = len(self._weights)
+
+        # Descend the tree looking for the first index
+        # whose prefix sum exceeds `target`.
+        while step > 0:
+            if (j := i + step) < size and tree[j] <= target:
+                i = j
+                target -= tree[j]
+            step //= 2
+
+        # Guard against rounding errors at the upper end
+        # (when `u * total` is rounded up to `total`).
+        i = min(i, len(self._weights) - 1)
+        while i > 0 and self._weights[i] <= 0:
+            i -= 1
+
+        return i
+
+    def _grow(self):
+        """Doubles the capacity of the tree."""
+
+        weights = self._weights + [0] * len(self._weights)
+        tree = [0] * (len(weights) + 1)
+
+        # Build the tree in `O(n)`.
+        for i, w in enumerate(weights, start=1):
+            tree[i] += w
+            if (j := i + (i & -i)) < len(tree):
+                tree[j] += tree[i]
+
+        self._weights = weights
+        self._tree = tree
+
+
+class EndpointPool:
+    """An append-only pool of endpoints of hyperedges, which allows
+    picking nodes with the probability proportional to their degrees
+    in ``O(1)``.
+
+    Every incidence of a node to a hyperedge adds one entry to the pool,
+    thus, a node of degree ``d`` is present in the pool ``d`` times,
+    and a uniformly random entry of the pool is a node chosen
+    proportionally to its degree.
+
+    Entries are stored in a growable ``int32`` array.
+    """
+
+    __slots__ = ('_endpoints', '_size')
+
+    def __init__(self, capacity: int = 1024):
+        self._endpoints = np.empty(max(capacity, 1), dtype=np.int32)
+        self._size = 0
+
+    def __getstate__(self) -> np.ndarray:
+        """Returns the used part of the pool (for pickling)."""
+        return self.as_array().copy()
+
+    def __setstate__(self, endpoints: np.ndarray):
+        """Restores the pool (for unpickling)."""
+
+        self._endpoints = endpoints if len(endpoints) > 0 else np.empty(1, dtype=np.int32)
+        self._size = len(endpoints)
+
+    def __len__(self) -> int:
+        """Returns the number of entries in the pool (the sum of degrees)."""
+        return self._size
+
+    def append(self, node: int):
+        """Adds a single incidence of ``node``."""
+
+        if self._size == len(self._endpoints):
+            self._reserve(self._size + 1)
+
+        self._endpoints[self._size] = node
+        self._size += 1
+
+    def extend(self, nodes: Union[Iterable[int], np.ndarray]):
+        """Adds an incidence of every node from ``nodes``."""
+
+        nodes = np.asarray(nodes if isinstance(nodes, np.ndarray) else list(nodes), dtype=np.int32)
+
+        if self._size + len(nodes) > len(self._endpoints):
+            self._reserve(self._size + len(nodes))
+
+        self._endpoints[self._size:self._size + len(nodes)] = nodes
+        self._size += len(nodes)
+
+    def choice(self, u: float) -> int:
+        """Returns a node chosen proportionally to its degree.
+
+        :param u: a random number uniformly distributed in ``[0, 1)``.
+        """
+        return int(self._endpoints[int(u * self._size)])
+
+    def sample(self, random: Random, k: int) -> np.ndarray:
+        """Returns ``k`` nodes chosen (with replacement)
+        proportionally to their degrees."""
+        return self._endpoints[random.integers(self._size, k)]
+
+    def as_array(self) -> np.ndarray:
+        """Returns all entries of the pool (without copying)."""
+        return self._endpoints[:self._size]
+
+    def _reserve(self, capacity: int):
+        """Grows the underlying array (at least twice)."""
+
+        endpoints = np.empty(max(capacity, 2 * len(self._endpoints)), dtype=np.int32)
+        endpoints[:self._size] = self._endpoints[:self._size]
+
+        self._endpoints = endpoints
+
+
+class AliasTable:
+    """An alias table [1] that allows picking an index according
+    to a fixed discrete distribution in ``O(1)``.
+
+    .. [1] Michael D. Vose,
+           "A linear algorithm for generating random numbers
+           with a given distribution",
+           IEEE Transactions on Software Engineering, 17(9):972–975, 1991.
+           https://doi.org/10.1109/32.92917
+
+    :param p: probabilities of indices (normalised automatically).
+    """
+
+    __slots__ = ('_probability', '_alias', '_probability_list', '_alias_list')
+
+    def __init__(self, p: Union[Iterable[float], np.ndarray]):
+        p = np.asarray(p, dtype=np.float64).ravel()
+
+        if len(p) == 0 or np.any(p < 0) or p.sum() <= 0:
+            raise ValueError('`p` must be non-negative and not all zeros.')
+
+        n = len(p)
+        scaled = p * (n / p.sum())
+
+        probability = np.ones(n)
+        alias = np.arange(n)
+
+        small = [i for i in range(n) if scaled[i] < 1]
+        large = [i for i in range(n) if scaled[i] >= 1]
+
+        while small and large:
+            i = small.pop()
+            j = large.pop()
+
+            probability[i] = scaled[i]
+            alias[i] = j
+
+            scaled[j] -= 1 - scaled[i]
+
+            if scaled[j] < 1:
+                small.append(j)
+            else:
+                large.append(j)
+
+        self._probability = probability
+        self._alias = alias
+        self._probability_list = probability.tolist()
+        self._alias_list = alias.tolist()
+
+    def __len__(self) -> int:
+        """Returns the number of indices."""
+        return len(self._alias_list)
+
+    def choice(self, u: float) -> int:
+        """Returns an index chosen according to the distribution.
+
+        :param u: a random number uniformly distributed in ``[0, 1)``.
+        """
+
+        x = u * len(self._alias_list)
+        i = int(x)
+
+        # The fractional part of `x` is also uniformly distributed in `[0, 1)`.
+        return i if x - i < self._probability_list[i] else self._alias_list[i]
+
+    def sample(self, random: Random, k: int) -> np.ndarray:
+        """Returns ``k`` indices chosen according to the distribution."""
+
+        x = random.uniforms(k) * len(self._alias)
+        i = x.astype(np.int64)
+
+        return np.where(x - i < self._probability[i], i, self._alias[i])
@@ -0,0 +1,287 @@
+"""
+Parameter sweeps over generative models.
+
+A sweep generates several replicas of a model for every design
+(a combination of values of its parameters) in a process pool and stores
+compact summary statistics of every replica in an SQLite file, e.g.,
+the following sweep over ``graph_cutoff`` can be interrupted and resumed
+by simply running it again.
+::
+
+    designs = grid(p=[0.2, 0.25, 0.3], q=[0.9, 0.95])
+
+    sweep('graph_cutoff', designs, 'sweep.sqlite', replicas=10, fixed={'m': 5, 'k': 10**5})
+
+    for summary in results('sweep.sqlite', 'graph_cutoff'):
+        print(summary.design, summary.alpha)
+
+The file can also be queried directly, e.g.,
+``SELECT design, AVG(alpha) FROM runs GROUP BY design``.
+"""
+
+import hashlib
+import json
+import sqlite3
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass
+from itertools import product
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Union
+
+import numpy as np
+import powerlaw as pl
+
+from pfe.misc.log import Log, Nothing, suppress_stderr, suppress_stdout
+from pfe.misc.log.misc import percents
+from pfe.misc.rng import Random
+from pfe.misc.style import blue, magenta
+from pfe.models.registry import parameters_of, generate, degrees
+
+
+@dataclass
+class Summary:
+    # noinspection PyUnresolvedReferences
+    """Summary statistics of a single generated replica.
+
+    :param model: the name of the model.
+    :param design: parameters of the model.
+    :param replica: the number of the replica.
+    :param nodes: the number of nodes.
+    :param edges: the number of edges.
+    :param alpha: the fitted exponent of the power law (if fitted).
+    :param xmin: the fitted lower bound of the power law (if fitted).
+    :param histogram: the degree histogram
+                      (``histogram[k]`` is the number of nodes of degree ``k``).
+    """
+
+    model: str
+    design: dict[str, Any]
+    replica: int
+    nodes: int
+    edges: int
+    alpha: Optional[float]
+    xmin: Optional[float]
+    histogram: np.ndarray
+
+
+def grid(**values: Iterable[Any]) -> list[dict[str, Any]]:
+    """Returns all combinations of the provided values of parameters.
+
+    An example.
+    ::
+        > grid(p=[0.2, 0.3], q=[0.9])
+        [{'p': 0.2, 'q': 0.9}, {'p': 0.3, 'q': 0.9}]
+    """
+
+    keys = list(values)
+
+    return [dict(zip(keys, x)) for x in product(*(values[k] for k in keys))]
+
+
+def sample(k: int, random: Random, **ranges: Union[tuple, list]) -> list[dict[str, Any]]:
+    """Returns ``k`` random designs.
+
+    Every parameter is either specified by a tuple ``(low, high)``,
+    in which case it is drawn uniformly from the interval (integers are drawn
+    if both bounds are integers), or by a list of values to choose from.
+    """
+
+    designs = []
+
+    for _ in range(k):
+        design = {}
+
+        for key, value in ranges.items():
+            if isinstance(value, tuple):
+                low, high = value
+
+                if isinstance(low, int) and isinstance(high, int):
+                    design[key] = low + random.integer(high - low + 1)
+                else:
+                    design[key] = low + random.uniform() * (high - low)
+            else:
+                design[key] = random.choice(value)
+
+        designs.append(design)
+
+    return designs
+
+
+def sweep(model: str,
+          designs: Iterable[dict[str, Any]],
+          path: Union[str, Path],
+          replicas: int = 1,
+          seed: int = 0,
+          fixed: Optional[dict[str, Any]] = None,
+          processes: Optional[int] = None,
+          fit: bool = True,
+          log: Log = Nothing()) -> int:
+    """Runs replicas of the model for every design and stores
+    their summaries in the SQLite file ``path``.
+
+    Every design is validated (by constructing parameters of the model)
+    before anything is run; invalid designs are skipped with a warning.
+    Replicas that are already present in the file are skipped as well,
+    thus, an interrupted sweep is resumed by running it again.
+
+    Every replica is generated with its own stream of random numbers
+    derived from ``seed``, the design and the number of the replica,
+    so results do not depend on the order of designs or the number
+    of processes.
+
+    :param model: the name of the model (see ``registry.MODELS``).
+    :param designs: designs to run.
+    :param path: the path to the file to store results in.
+    :param replicas: the number of replicas of every design.
+    :param seed: the seed of the sweep.
+    :param fixed: parameters shared by all designs (optional).
+    :param processes: the number of processes to run replicas in;
+                      if ``1``, replicas are run in the current process.
+    :param fit: whether to fit a power law to degrees of every replica.
+    :param log: an instance of ``Log`` to log the progress with.
+
+    :return: the number of replicas that were run.
+    """
+
+    tasks = []
+
+    with _connect(path) as connection:
+        done = set(connection.execute('SELECT design, replica FROM runs WHERE model = ?', (model, )))
+
+    for design in designs:
+        design = {**(fixed or {}), **design}
+        key = _key(design)
+
+        try:
+            parameters_of(model, design)
+        except ValueError as error:
+            log.warn(f'Skipping {key}: {error}')
+            continue
+
+        entropy = [seed, int(hashlib.sha256(key.encode()).hexdigest()[:16], 16)]
+
+        for replica in range(replicas):
+            if (key, replica) not in done:
+                tasks.append((key, (model, design, np.random.SeedSequence(entropy, spawn_key=(replica, )), replica, fit)))
+
+    log.info(f'Running {blue | len(tasks)} replicas ({blue | len(done)} are already done).')
+
+    def save(connection: sqlite3.Connection, key: str, summary: Summary):
+        connection.execute('INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                           (model, key, summary.replica,
+                            summary.nodes, summary.edges, summary.alpha, summary.xmin,
+                            summary.histogram.astype(np.int64).tobytes()))
+        connection.commit()
+
+    with _connect(path) as connection:
+        if processes == 1:
+            for i, (key, task) in enumerate(tasks, start=1):
+                save(connection, key, summary := summarise(*task))
+
+                log.info(f'Replica {magenta | summary.replica} of {key}. [{percents(i, len(tasks))}]')
+        else:
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                futures = {pool.submit(summarise, *task): key for key, task in tasks}
+
+                for i, future in enumerate(as_completed(futures), start=1):
+                    save(connection, key := futures[future], summary := future.result())
+
+                    log.info(f'Replica {magenta | summary.replica} of {key}. [{percents(i, len(tasks))}]')
+
+    return len(tasks)
+
+
+def results(path: Union[str, Path], model: Optional[str] = None) -> list[Summary]:
+    """Reads summaries stored by ``sweep``.
+
+    :param path: the path to the file with results.
+    :param model: the name of the model to read results of (optional).
+    """
+
+    query = 'SELECT model, design, replica, nodes, edges, alpha, xmin, histogram FROM runs'
+    arguments = ()
+
+    if model is not None:
+        query += ' WHERE model = ?'
+        arguments = (model, )
+
+    with _connect(path) as connection:
+        return [Summary(model, json.loads(design), replica, nodes, edges, alpha, xmin,
+                        np.frombuffer(histogram, dtype=np.int64))
+                for model, design, replica, nodes, edges, alpha, xmin, histogram
+                in connection.execute(query + ' ORDER BY model, design, replica', arguments)]
+
+
+def summarise(model: str,
+              design: dict[str, Any],
+              seed: np.random.SeedSequence,
+              replica: int = 0,
+              fit: bool = True) -> Summary:
+    """Generates a single replica of the model and summarises it.
+
+    :param model: the name of the model.
+    :param design: parameters of the model.
+    :param seed: the seed of the replica.
+    :param replica: the number of the replica.
+    :param fit: whether to fit a power law to degrees.
+    """
+
+    graph = generate(model, parameters_of(model, design), Random(seed))
+
+    degree = degrees(graph)
+    alpha = xmin = None
+
+    if fit and np.any(degree > 0):
+        with suppress_stdout(), suppress_stderr(), warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            power_law = pl.Fit(degree[degree > 0], discrete=True)
+
+            alpha = float(power_law.power_law.alpha)
+            xmin = float(power_law.xmin)
+
+    return Summary(model, design, replica,
+                   nodes=len(degree),
+                   edges=graph.number_of_edges(),
+                   alpha=alpha,
+                   xmin=xmin,
+                   histogram=np.bincount(degree))
+
+
+def _key(design: dict[str, Any]) -> str:
+    """Returns a canonical JSON representation of the design."""
+
+    def default(x: Any) -> Any:
+        if isinstance(x, np.ndarray):
+            return x.tolist()
+        if isinstance(x, np.generic):
+            return x.item()
+        return repr(x)
+
+    return json.dumps(design, sort_keys=True, default=default)
+
+
+@contextmanager
+def _connect(path: Union[str, Path]) -> Iterator[sqlite3.Connection]:
+    """Opens the results file (and creates the table of runs if needed);
+    the connection is committed and closed on exit."""
+
+    connection = sqlite3.connect(str(path))
+    connection.execute('CREATE TABLE IF NOT EXISTS runs ('
+                       '  model     TEXT    NOT NULL,'
+                       '  design    TEXT    NOT NULL,'
+                       '  replica   INTEGER NOT NULL,'
+                       '  nodes     INTEGER NOT NULL,'
+                       '  edges     INTEGER NOT NULL,'
+                       '  alpha     REAL,'
+                       '  xmin      REAL,'
+                       '  histogram BLOB    NOT NULL,'
+                       '  PRIMARY KEY (model, design, replica)'
+                       ')')
+
+    try:
+        yield connection
+        connection.commit()
+    finally:
+        connection.close()
@@ -8,6 +8,7 @@ from pathlib import Path
 from typing import Optional, Callable, Union, Tuple, Any, Iterable, List
 
 import networkx as nx
+import numpy as np
 
 from pfe.misc.log import Log, Nothing
 from pfe.misc.log.misc import percents
@@ -209,6 +210,100 @@ def parse(publications: Iterable[dict], self_loops: bool = True, to: Optional[nx
     return graph
 
 
+class Authorship:
+    """A compact publication→author incidence in the CSR format.
+
+    Authors are identified by their positions in ``authors``, a sorted array
+    of author IDs (the dense author index); the authors of the publication
+    ``i`` are ``indices[indptr[i]:indptr[i + 1]]``.
+
+    :param authors: a sorted array of author IDs.
+    :param indptr: an array of offsets of publications in ``indices``.
+    :param indices: an array of positions of authors in ``authors``.
+    """
+
+    __slots__ = ('authors', 'indptr', 'indices')
+
+    def __init__(self, authors: np.ndarray, indptr: np.ndarray, indices: np.ndarray):
+        self.authors = authors
+        self.indptr = indptr
+        self.indices = indices
+
+    @classmethod
+    def of(cls, publications: Iterable[dict], authors: Optional[np.ndarray] = None) -> 'Authorship':
+        """Builds the incidence of the provided publications.
+
+        Repeated authors of a publication are counted once.
+
+        :param publications: publications represented as dictionaries with JSON.
+        :param authors: a sorted array of author IDs to index authors with
+                        (e.g., nodes of a graph); if not specified, the index
+                        is built from all authors of ``publications``.
+
+        :raise KeyError: if an author is not present in ``authors``.
+
+        :return: the constructed ``Authorship``.
+        """
+
+        ids = []
+        sizes = []
+
+        for publication in publications:
+            publication_authors = publication['authors']
+            publication_authors = publication_authors \
+                if isinstance(publication_authors, list) else [publication_authors]
+
+            unique = {int(x['id']) for x in publication_authors}
+
+            ids.extend(unique)
+            sizes.append(len(unique))
+
+        ids = np.asarray(ids, dtype=np.int64)
+
+        if authors is None:
+            authors, indices = np.unique(ids, return_inverse=True)
+        else:
+            indices = np.searchsorted(authors, ids)
+            indices[indices == len(authors)] = 0
+
+            if len(missing := ids[authors[indices] != ids]) > 0:
+                raise KeyError(int(missing[0]))
+
+        indptr = np.zeros(len(sizes) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=indptr[1:])
+
+        return cls(authors, indptr, indices.astype(np.int32))
+
+    def __len__(self) -> int:
+        """Returns the number of publications."""
+        return len(self.indptr) - 1
+
+    def __getitem__(self, publications: Union[slice, np.ndarray, list[int]]) -> 'Authorship':
+        """Returns the incidence of the selected publications
+        (by a slice, an array of positions or a boolean mask)
+        that shares the author index with this one."""
+
+        selected = np.arange(len(self))[publications]
+        sizes = self.sizes()[selected]
+
+        indptr = np.zeros(len(selected) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=indptr[1:])
+
+        # Positions of all selected entries of `indices`.
+        starts = np.repeat(self.indptr[selected] - indptr[:-1], sizes)
+        indices = self.indices[starts + np.arange(indptr[-1])]
+
+        return Authorship(self.authors, indptr, indices)
+
+    def sizes(self) -> np.ndarray:
+        """Returns the number of authors of every publication."""
+        return np.diff(self.indptr)
+
+    def rows(self) -> np.ndarray:
+        """Returns the publication of every entry of ``indices``."""
+        return np.repeat(np.arange(len(self)), self.sizes())
+
+
 if __name__ == '__main__':
     from pfe.misc.log import Pretty
     from pfe.misc.style import blue
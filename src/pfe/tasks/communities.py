@@ -1,148 +1,627 @@
 """
 Community detection.
+
+All algorithms share a single entry point, ``detect``, which takes
+a graph, the name of an algorithm, its parameters and a seed, and returns
+a dense membership array aligned with the sorted array of node IDs
+(see ``arrays_of``), e.g.,
+::
+
+    membership = detect(graph, 'leiden', seed=0, cache='.communities')
+
+Partitions can be cached on disk by the content of the graph and
+the parameters of the detection, so that rerunning a pipeline
+does not rerun the detection unless something has changed.
+
+A sequence of growing snapshots of a graph (e.g., cumulative yearly graphs)
+can be partitioned with ``temporal``, which starts the detection in every
+snapshot from the partition of the previous one.
 """
 
+import hashlib
 import json
+import os
+import random
 from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple, Union
 
-import community
+import community as cm
 import networkx as nx
-import igraph as ig
-from cdlib import algorithms
+import numpy as np
+import scipy.sparse as sp
 
-from pfe.misc.style import blue, underlined
 from pfe.misc.log import Log, Pretty, Nothing
+from pfe.misc.style import blue, underlined
 
 
-def louvain(graph: nx.Graph,  data: Path, log: Log = Nothing()):
-    """Community detection using the Louvain method."""
+def arrays_of(graph: nx.Graph) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Converts the graph into arrays.
 
-    # odd_vertices = [v for v in graph.nodes if graph.degree[v] == 2]
-    # log.info(f'Nodes to delete {len(odd_vertices)}')
-    #
-    # graph.remove_nodes_from(odd_vertices)
+    :param graph: a graph with integer node IDs (or strings of them)
+                  and (optionally) weighted edges.
 
-    for e in graph.edges:
-        graph.edges[e]['weight'] = float(graph.edges[e]['weight'])
+    :return: a sorted array of node IDs, an ``(m, 2)`` array of edges
+             (as pairs of positions of nodes, ``u <= v``) sorted
+             lexicographically, and an array of weights of edges.
+    """
 
-    # graph = max(nx.connected_components(graph), key=len)
+    nodes = np.sort(np.fromiter(graph.nodes, dtype=np.int64, count=graph.number_of_nodes()))
 
-    with log.scope.info(f'Detecting communities using the {underlined | "Louvain"} method.'):
-        communities = community.best_partition(graph, weight='weight')
+    m = graph.number_of_edges()
+    edges = graph.edges(data='weight', default=1)
 
+    u = np.fromiter((x for x, _, _ in edges), dtype=np.int64, count=m)
+    v = np.fromiter((y for _, y, _ in edges), dtype=np.int64, count=m)
+    weights = np.fromiter((float(w) for _, _, w in edges), dtype=np.float64, count=m)
 
-    with log.scope.info('Saving communities into a file.'):
-        new_communities = {}
-        for x, y in communities.items():
-            new_communities.setdefault(y, [])
-            new_communities[y].append(int(x))
+    u = np.searchsorted(nodes, u)
+    v = np.searchsorted(nodes, v)
+    u, v = np.minimum(u, v), np.maximum(u, v)
 
-        new_communities = new_communities.values()
-        sorted(new_communities, key=len, reverse=True)
+    order = np.lexsort((v, u))
+    edges = np.stack((u[order], v[order]), axis=1).astype(np.int32)
 
-        with open(data / 'louvain_communities.json', 'w') as file:
-            json.dump(dict(enumerate(new_communities)), file)
+    return nodes, edges, weights[order]
 
-        modularity = community.modularity(communities, graph)
-        with log.scope.info('Saving the modularity value into a file...'):
-            with open(data / 'louvain_modularity_comp.json', 'w') as file:
-                json.dump(modularity, file)
 
-        with open(data / 'graph.log', 'a+') as file:
-            file.write(f'Leiden: {modularity}\n')
+def _louvain(n: int,
+             edges: np.ndarray,
+             weights: np.ndarray,
+             seed: Optional[int],
+             initial: Optional[np.ndarray] = None,
+             **parameters) -> np.ndarray:
+    """The Louvain method [1] (see ``community.best_partition``).
 
+    .. [1] Vincent D. Blondel, Jean-Loup Guillaume, Renaud Lambiotte, and Etienne Lefebvre.
+           "Fast unfolding of communities in large networks",
+           Journal  of  Statistical  Mechanics:  Theory  and  Experiment, October 2008.
+           https://doi.org/10.1088/1742-5468/2008/10/P10008.
+    """
 
-def leiden(graph: ig.Graph, data: Path, log: Log = Nothing()):
-    """Community detection using the Leiden method."""
+    graph = nx.Graph()
+    graph.add_nodes_from(range(n))
+    graph.add_weighted_edges_from(zip(edges[:, 0].tolist(), edges[:, 1].tolist(), weights.tolist()))
 
-    odd_vertices = [v.index for v in graph.vs if v.degree() == 2]
-    log.info(f'Nodes to delete {len(odd_vertices)}')
-    graph.delete_vertices(odd_vertices)
+    if initial is not None:
+        parameters['partition'] = dict(enumerate(initial.tolist()))
 
-    # graph = (graph.clusters().giant())
-    # with open(data / 'ig_giant_cluster.json', 'w') as file:
-    #     graph.write_pajek(file)
+    communities = cm.best_partition(graph, random_state=seed, **parameters)
 
-    with log.scope.info(f'Detecting communities using the {underlined | "Leiden"} method...'):
-        objective = 'modularity'
-        communities = graph.community_leiden(objective_function=objective, weights='weight')
+    return np.fromiter((communities[x] for x in range(n)), dtype=np.int32, count=n)
 
-        log.info('The objective:               ' + objective)
-        log.info('The number of communities:   ' + str(blue | len(communities)))
-        log.info('The modularity value:        ' + str(blue | communities.modularity))
 
-    sorted(communities, key=len, reverse=True)
+def _leiden(n: int,
+            edges: np.ndarray,
+            weights: np.ndarray,
+            seed: Optional[int],
+            initial: Optional[np.ndarray] = None,
+            **parameters) -> np.ndarray:
+    """The Leiden method [1] (see ``igraph.Graph.community_leiden``)
+    that optimises the modularity by default.
 
-    with log.scope.info('Saving communities into a file...'):
-        with open(data / 'leiden_communities_full.json', 'w') as file:
-            json.dump(dict(enumerate(communities)), file)
+    .. [1] V. A. Traag, L. Waltman, and N. J. van Eck.
+           "From Louvain to Leiden: guaranteeing well-connected communities",
+           Scientific Reports, March 2019.
+           https://doi.org/10.1038/s41598-019-41695-z.
+    """
 
-    with log.scope.info('Saving the modularity value into a file...'):
-        with open(data / 'leiden_modularity_full.json', 'w') as file:
-            json.dump(communities.modularity, file)
+    # `igraph` is only required for the Leiden method.
+    import igraph as ig
 
-    with open(data / 'graph.log', 'a+') as file:
-        file.write(f'Leiden: {communities.modularity}\n')
+    graph = ig.Graph(n=n, edges=edges.tolist())
 
+    if initial is not None:
+        parameters['initial_membership'] = initial.tolist()
 
-def leiden_nx(graph: nx.Graph,  data: Path, log: Log = Nothing()):
-    """Community detection using the Leiden method from cdlib."""
+    # The generator of `igraph` is global (and cannot be read), so it is only
+    # replaced for the detection and then reset to the default one (`random`).
+    ig.set_random_number_generator(random.Random(seed))
 
-    # odd_vertices = [v for v in graph.nodes if graph.degree[v] == 2]
-    # log.info(f'Nodes to delete {len(odd_vertices)}')
-    #
-    # graph.remove_nodes_from(odd_vertices)
-    #
-    # for e in graph.edges:
-    #     graph.edges[e]['weight'] = float(graph.edges[e]['weight'])
+    try:
+        communities = graph.community_leiden(**{'objective_function': 'modularity', **parameters},
+                                             weights=weights.tolist())
+    finally:
+        ig.set_random_number_generator(random)
 
-    with log.scope.info(f'Detecting communities using the {underlined | "Leiden"} method.'):
-        communities = algorithms.leiden(graph)
+    return np.asarray(communities.membership, dtype=np.int32)
 
-    modularity = {
-        'modularity_density': communities.modularity_density().score,
-        'erdos_renyi_modularity': communities.erdos_renyi_modularity(),
-        'newman_girvan_modularity': communities.newman_girvan_modularity(),
-        'z_modularity': communities.z_modularity()
-    }
 
-    comm = []
-    for c in communities.communities:
-        if len(c) > 1:
-            comm.append([int(i) for i in c])
-    communities = comm
-    sorted(communities, key=len, reverse=True)
+def _louvain_csr(n: int,
+                 edges: np.ndarray,
+                 weights: np.ndarray,
+                 seed: Optional[int],
+                 initial: Optional[np.ndarray] = None,
+                 **parameters) -> np.ndarray:
+    """The Louvain method on arrays of the graph (see ``louvain``)."""
+    return louvain(adjacency_of(n, edges, weights), seed=seed, initial=initial, **parameters)
 
-    with log.scope.info('Saving communities into a file...'):
-        with open(data / 'leiden_communities.json', 'w') as file:
-            json.dump(dict(enumerate(communities)), file)
 
-        # with open(data / 'louvain_communities.json', 'w') as file:
-        #     json.dump(new_communities, file)
-        #
-    with log.scope.info('Saving the modularity value into a file...'):
-        with open(data / 'leiden_cdlib_modularity.json', 'w') as file:
-            json.dump(modularity, file)
+ALGORITHMS: dict[str, Callable[..., np.ndarray]] = {
+    'louvain': _louvain,
+    'leiden': _leiden,
+    'louvain_csr': _louvain_csr,
+}
+
+
+def adjacency_of(n: int, edges: np.ndarray, weights: np.ndarray) -> sp.csr_matrix:
+    """Returns the symmetric adjacency matrix of the graph
+    (a self-loop of the weight ``w`` is stored as ``2 w`` on the diagonal,
+    so that sums of rows are weighted degrees).
+
+    :param n: the number of nodes.
+    :param edges: an ``(m, 2)`` array of edges (see ``arrays_of``).
+    :param weights: an array of weights of edges.
+    """
+
+    u, v = edges[:, 0], edges[:, 1]
+
+    return sp.csr_matrix((np.concatenate((weights, weights)), (np.concatenate((u, v)), np.concatenate((v, u)))),
+                         shape=(n, n), dtype=np.float64)
+
+
+def louvain(adjacency: sp.spmatrix,
+            resolution: float = 1.0,
+            seed: Optional[int] = None,
+            initial: Optional[np.ndarray] = None,
+            batches: int = 32,
+            tolerance: float = 1e-7) -> np.ndarray:
+    """Detects communities with the Louvain method [1] on a sparse adjacency matrix.
+
+    Every level moves nodes to neighbouring communities until the modularity
+    stops increasing and then aggregates communities into nodes (as a sparse
+    product ``P^T A P``). Instead of visiting nodes one by one, every pass over
+    nodes visits them in random batches (``batches`` per pass): weights from
+    every node of a batch to its neighbouring communities are summed at once,
+    and all nodes of the batch are moved simultaneously to communities
+    with the highest gain of the modularity (ties are broken by the smallest
+    community). Thus, the result is fully determined by ``seed``.
+
+    .. [1] Vincent D. Blondel, Jean-Loup Guillaume, Renaud Lambiotte, and Etienne Lefebvre.
+           "Fast unfolding of communities in large networks",
+           Journal  of  Statistical  Mechanics:  Theory  and  Experiment, October 2008.
+           https://doi.org/10.1088/1742-5468/2008/10/P10008.
+
+    :param adjacency: a symmetric adjacency matrix (see ``adjacency_of``).
+    :param resolution: the resolution of the modularity (as in ``community.best_partition``).
+    :param seed: the seed of the order of nodes (optional).
+    :param initial: a membership array to start from (optional); as in
+                    ``community.best_partition``, it is only the starting
+                    assignment of the first level, so nodes may still
+                    leave their initial communities.
+    :param batches: the number of batches of nodes in every pass.
+    :param tolerance: the minimum increase of the modularity of a pass.
+
+    :return: a membership array (``membership[i]`` is the community of the ``i``-th node).
+    """
+
+    random = np.random.default_rng(seed)
+    adjacency = sp.csr_matrix(adjacency, dtype=np.float64)
+
+    n = adjacency.shape[0]
+    membership = np.arange(n)
+
+    if adjacency.sum() == 0:
+        return membership.astype(np.int32)
+
+    # The first level starts from the initial communities (in the original graph).
+    start = None if initial is None else np.unique(initial, return_inverse=True)[1].reshape(-1)
+
+    while True:
+        labels, level = np.unique(_level(adjacency, resolution, random, batches, tolerance, start),
+                                  return_inverse=True)
+        start = None
+
+        if len(labels) == adjacency.shape[0]:
+            break
+
+        membership = level.reshape(-1)[membership]
+        adjacency = _aggregated(adjacency, level.reshape(-1))
+
+    return membership.astype(np.int32)
+
+
+def _level(adjacency: sp.csr_matrix,
+           resolution: float,
+           random: np.random.Generator,
+           batches: int,
+           tolerance: float,
+           communities: Optional[np.ndarray] = None) -> np.ndarray:
+    """Moves nodes between communities (a single level of ``louvain``).
+
+    :param communities: dense communities of nodes to start from
+                        (optional; every node is alone by default).
+
+    :return: communities of nodes.
+    """
+
+    n = adjacency.shape[0]
+    degrees = np.asarray(adjacency.sum(axis=1)).reshape(-1)
+    scale = resolution / degrees.sum()
+
+    indptr, indices, data = adjacency.indptr, adjacency.indices, adjacency.data
+
+    communities = np.arange(n) if communities is None else communities.copy()
+    totals = np.bincount(communities, degrees, minlength=n)
+    quality = _quality(adjacency, communities, totals, resolution)
+
+    while True:
+        previous = communities.copy(), totals.copy()
+        moved = 0
+
+        for batch in np.array_split(random.permutation(n), min(batches, n)):
+            b = len(batch)
+
+            # Entries of rows of the batch (without self-loops).
+            counts = indptr[batch + 1] - indptr[batch]
+            local = np.repeat(np.arange(b), counts)
+            entries = np.repeat(indptr[batch] - (np.cumsum(counts) - counts), counts) + np.arange(len(local))
+
+            other = indices[entries] != batch[local]
+            local, entries = local[other], entries[other]
+
+            # Weights from nodes of the batch to their neighbouring communities.
+            keys, inverse = np.unique(local * n + communities[indices[entries]], return_inverse=True)
+            sums = np.bincount(inverse.reshape(-1), data[entries], minlength=len(keys))
+
+            row, column = np.divmod(keys, n)
+            bounds = np.searchsorted(row, np.arange(b + 1))
+
+            own = communities[batch]
+            k = degrees[batch]
+            mine = column == own[row]
+
+            # Gains of moving nodes (out of their communities) into neighbouring communities.
+            gains = sums - scale * (totals[column] - np.where(mine, k[row], 0)) * k[row]
+            stay = np.bincount(row[mine], sums[mine], minlength=b) - scale * (totals[own] - k) * k
+
+            nonempty = np.flatnonzero(np.diff(bounds))
+
+            best = np.full(b, -np.inf)
+            best[nonempty] = np.maximum.reduceat(gains, bounds[nonempty])
+
+            # The first (i.e., the smallest) community with the best gain.
+            candidates = np.flatnonzero(gains >= best[row])
+            chosen, first = np.unique(row[candidates], return_index=True)
+
+            targets = own.copy()
+            targets[chosen] = column[candidates[first]]
+
+            move = (best > stay + 1e-12) & (targets != own)
+
+            np.subtract.at(totals, own[move], k[move])
+            np.add.at(totals, targets[move], k[move])
+            communities[batch[move]] = targets[move]
+
+            moved += np.count_nonzero(move)
+
+        updated = _quality(adjacency, communities, totals, resolution)
+
+        if updated < quality:
+            communities, totals = previous
+            break
+        if moved == 0 or updated - quality < tolerance:
+            break
+
+        quality = updated
+
+    return communities
+
+
+def _quality(adjacency: sp.csr_matrix, communities: np.ndarray, totals: np.ndarray, resolution: float) -> float:
+    """Returns the modularity of communities of nodes of the adjacency matrix."""
+
+    total = totals.sum()
+    rows = np.repeat(np.arange(adjacency.shape[0]), np.diff(adjacency.indptr))
+    inside = communities[rows] == communities[adjacency.indices]
+
+    return float(adjacency.data[inside].sum() / total - resolution * ((totals / total) ** 2).sum())
+
+
+def _aggregated(adjacency: sp.csr_matrix, communities: np.ndarray) -> sp.csr_matrix:
+    """Returns the adjacency matrix of communities (``P^T A P``)."""
+
+    n, c = len(communities), int(communities.max()) + 1
+    p = sp.csr_matrix((np.ones(n), (np.arange(n), communities)), shape=(n, c))
+
+    return (p.T @ adjacency @ p).tocsr()
+
+
+class Cache:
+    """A content-addressed cache of partitions in a directory.
+
+    Every partition is stored in a separate ``.npy`` file named
+    after its key (see ``key``); files are replaced atomically.
+
+    :param directory: the directory of the cache (created if necessary).
+    """
+
+    __slots__ = ('directory', )
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Returns the cached membership array (or ``None`` if it is absent)."""
+
+        try:
+            return np.load(self.directory / f'{key}.npy')
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, membership: np.ndarray):
+        """Saves the membership array under the key."""
+
+        path = self.directory / f'{key}.npy'
+        temporary = path.with_name(path.name + '.tmp')
+
+        with open(temporary, 'wb') as file:
+            np.save(file, membership)
+
+        os.replace(temporary, path)
+
+    @staticmethod
+    def key(algorithm: str,
+            parameters: dict[str, Any],
+            seed: Optional[int],
+            *arrays: np.ndarray) -> str:
+        """Returns the hash of the algorithm, its parameters, the seed and the arrays of a graph."""
+
+        digest = hashlib.sha256()
+        digest.update(json.dumps([algorithm, parameters, seed], sort_keys=True, default=repr).encode())
+
+        for array in arrays:
+            array = np.ascontiguousarray(array)
+
+            digest.update(f'{array.dtype.str}{array.shape}'.encode())
+            digest.update(array.tobytes())
 
-    with open(data / 'graph.log', 'a+') as file:
-        file.write(f'Leiden: {modularity["newman_girvan_modularity"]}\n')
+        return digest.hexdigest()
+
+
+def detect(graph: Union[nx.Graph, Tuple[np.ndarray, np.ndarray, np.ndarray]],
+           algorithm: str = 'louvain',
+           seed: Optional[int] = 0,
+           cache: Optional[Union[str, Path, Cache]] = None,
+           initial: Optional[np.ndarray] = None,
+           log: Log = Nothing(),
+           **parameters) -> np.ndarray:
+    """Detects communities in the graph.
+
+    Communities are numbered densely in the decreasing order of their sizes
+    (ties are broken by their first nodes), so that the result does not
+    depend on labels that an algorithm assigns.
+
+    :param graph: either a graph or its arrays (see ``arrays_of``).
+    :param algorithm: the name of the algorithm (see ``ALGORITHMS``).
+    :param seed: the seed of the algorithm; if ``None``, the result is random,
+                 and it is not cached.
+    :param cache: a ``Cache`` or its directory (optional).
+    :param initial: a membership array to start the detection from
+                    (optional; every node is alone by default).
+    :param log: an instance of ``Log`` to log the execution with.
+    :param parameters: parameters of the algorithm.
+
+    :return: a dense membership array aligned with the sorted array of node IDs
+             (``membership[i]`` is the community of the ``i``-th node).
+    """
+
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f'Unknown algorithm: {algorithm!r}; expected one of {list(ALGORITHMS)}.')
+
+    nodes, edges, weights = arrays_of(graph) if isinstance(graph, nx.Graph) else graph
+
+    if cache is not None and seed is not None:
+        cache = cache if isinstance(cache, Cache) else Cache(cache)
+        key = Cache.key(algorithm, parameters, seed, nodes, edges, weights,
+                        *([] if initial is None else [initial]))
+
+        if (membership := cache.get(key)) is not None:
+            log.info(f'Reusing cached communities ({blue | key[:12]}).')
+            return membership
+    else:
+        cache, key = None, None
+
+    with log.scope.info(f'Detecting communities using the {underlined | algorithm} method.'):
+        membership = canonical(ALGORITHMS[algorithm](len(nodes), edges, weights, seed, initial, **parameters))
+
+        log.info(f'Detected {blue | len(np.unique(membership))} communities with the modularity '
+                 f'{blue | round(modularity((nodes, edges, weights), membership), 4)}.')
+
+    if cache is not None:
+        cache.put(key, membership)
+
+    return membership
+
+
+def temporal(snapshots: Iterable[Union[nx.Graph, Tuple[np.ndarray, np.ndarray, np.ndarray]]],
+             algorithm: str = 'louvain',
+             seed: Optional[int] = 0,
+             cache: Optional[Union[str, Path, Cache]] = None,
+             log: Log = Nothing(),
+             **parameters) -> Iterator[np.ndarray]:
+    """Detects communities in a sequence of snapshots of a graph
+    (e.g., in cumulative graphs of publications of ``1990..Y`` for every year ``Y``).
+
+    The detection in every snapshot starts from the partition of the previous
+    snapshot (new nodes are alone in their communities). Then communities
+    are labelled after communities of the previous snapshot that they
+    overlap with the most (every label is given to a single community,
+    the largest overlaps first), and new communities get new labels,
+    which were never used in any previous snapshot (even if a label
+    disappeared, e.g., as its community was merged into another one).
+    Thus, labels are stable across snapshots, but they are not necessarily dense.
+
+    :param snapshots: graphs or their arrays (see ``arrays_of``).
+    :param algorithm: the name of the algorithm (see ``ALGORITHMS``).
+    :param seed: the seed of the algorithm (see ``detect``).
+    :param cache: a ``Cache`` or its directory (optional).
+    :param log: an instance of ``Log`` to log the execution with.
+    :param parameters: parameters of the algorithm.
+
+    :return: an iterator over membership arrays of snapshots
+             aligned with sorted arrays of their node IDs.
+    """
+
+    nodes: Optional[np.ndarray] = None
+    membership: Optional[np.ndarray] = None
+
+    # The next unused label.
+    label = 0
+
+    for i, snapshot in enumerate(snapshots):
+        arrays = arrays_of(snapshot) if isinstance(snapshot, nx.Graph) else snapshot
+
+        previous = None if nodes is None else carried(nodes, membership, arrays[0])
+        initial = None if previous is None else canonical(_singletons(previous))
+
+        with log.scope.info(f'Snapshot {blue | i}: {blue | len(arrays[0])} nodes.'):
+            detected = detect(arrays, algorithm, seed, cache, initial, log, **parameters)
+
+        nodes = arrays[0]
+        membership = detected if previous is None else align(detected, previous, label)
+        label = max(label, int(membership.max(initial=-1)) + 1)
+
+        yield membership
+
+
+def carried(nodes: np.ndarray, membership: np.ndarray, to: np.ndarray) -> np.ndarray:
+    """Carries the membership over to another array of node IDs.
+
+    :param nodes: a sorted array of node IDs.
+    :param membership: a membership array aligned with ``nodes``.
+    :param to: a sorted array of node IDs to carry the membership to.
+
+    :return: a membership array aligned with ``to``,
+             where nodes absent from ``nodes`` are ``-1``.
+    """
+
+    if len(nodes) == 0:
+        return np.full(len(to), -1, dtype=membership.dtype)
+
+    positions = np.searchsorted(nodes, to)
+    positions[positions == len(nodes)] = 0
+
+    return np.where(nodes[positions] == to, membership[positions], -1)
+
+
+def align(membership: np.ndarray, previous: np.ndarray, label: int = 0) -> np.ndarray:
+    """Relabels communities after the previous labels of their nodes.
+
+    Every community takes the previous label it shares the most nodes with;
+    pairs are matched greedily in the decreasing order of the number of shared
+    nodes, and each label is taken at most once. Unmatched communities get
+    new labels (greater than all previous labels and starting from at least ``label``).
+
+    :param membership: a dense membership array.
+    :param previous: previous labels of the same nodes (``-1`` for new nodes).
+    :param label: the first label that can be given to a new community
+                  (e.g., the next label that was never used).
+    """
+
+    c = int(membership.max()) + 1 if len(membership) > 0 else 0
+    base = int(previous.max(initial=-1)) + 1
+    known = previous >= 0
+
+    # Numbers of nodes shared by pairs of (current, previous) communities.
+    pairs, overlaps = np.unique(membership[known].astype(np.int64) * base + previous[known], return_counts=True)
+    communities, labels = np.divmod(pairs, base) if base > 0 else (pairs, pairs)
+
+    relabelled = np.full(c, -1, dtype=np.int64)
+    taken = set()
+
+    for i in np.argsort(-overlaps, kind='stable').tolist():
+        community, candidate = int(communities[i]), int(labels[i])
+
+        if relabelled[community] < 0 and candidate not in taken:
+            relabelled[community] = candidate
+            taken.add(candidate)
+
+    new = relabelled < 0
+    relabelled[new] = max(base, label) + np.arange(np.count_nonzero(new))
+
+    return relabelled[membership].astype(np.int32)
+
+
+def _singletons(membership: np.ndarray) -> np.ndarray:
+    """Puts every node with the community ``-1`` into its own community."""
+
+    membership = membership.astype(np.int64)
+    alone = membership < 0
+    membership[alone] = membership.max(initial=-1) + 1 + np.arange(np.count_nonzero(alone))
+
+    return membership
+
+
+def canonical(membership: np.ndarray) -> np.ndarray:
+    """Renumbers communities densely in the decreasing order of their sizes
+    (ties are broken by their first nodes)."""
+
+    labels, first, inverse, sizes = np.unique(membership, return_index=True, return_inverse=True, return_counts=True)
+
+    order = np.lexsort((first, -sizes))
+    ranks = np.empty(len(labels), dtype=np.int32)
+    ranks[order] = np.arange(len(labels), dtype=np.int32)
+
+    return ranks[inverse.reshape(-1)]
+
+
+def modularity(graph: Union[nx.Graph, Tuple[np.ndarray, np.ndarray, np.ndarray]], membership: np.ndarray) -> float:
+    """Computes the modularity of the partition (see ``community.modularity``).
+
+    :param graph: either a graph or its arrays (see ``arrays_of``).
+    :param membership: a dense membership array aligned with the sorted array of node IDs.
+    """
+
+    _, edges, weights = arrays_of(graph) if isinstance(graph, nx.Graph) else graph
+
+    links = weights.sum()
+
+    if links == 0:
+        return 0.0
+
+    u, v = membership[edges[:, 0]], membership[edges[:, 1]]
+    c = int(membership.max()) + 1
+
+    internal = np.bincount(u[u == v], weights[u == v], minlength=c)
+    degrees = np.bincount(u, weights, minlength=c) + np.bincount(v, weights, minlength=c)
+
+    return float((internal / links - (degrees / (2 * links)) ** 2).sum())
+
+
+def without_singletons(nodes: np.ndarray, membership: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Drops nodes that are alone in their communities
+    (as partitions of the Leiden method used to be saved).
+
+    :param nodes: a sorted array of node IDs.
+    :param membership: a dense membership array aligned with ``nodes``.
+
+    :return: the sorted array of the remaining node IDs and their
+             (dense, see ``canonical``) membership array.
+    """
+
+    kept = np.bincount(membership)[membership] > 1
+
+    return nodes[kept], canonical(membership[kept])
+
+
+def communities_of(nodes: np.ndarray, membership: np.ndarray) -> dict[int, list[int]]:
+    """Returns node IDs of every community.
+
+    :param nodes: a sorted array of node IDs.
+    :param membership: a dense membership array aligned with ``nodes``.
+    """
+
+    order = np.argsort(membership, kind='stable')
+    bounds = np.cumsum(np.bincount(membership))[:-1]
+
+    return dict(enumerate(x.tolist() for x in np.split(nodes[order], bounds)))
 
 
 if __name__ == '__main__':
     log: Log = Pretty()
     log.info('Starting...')
 
-    ig_data = Path('../../../data/graph/ig')
-    #
-    # with log.scope.info('Reading `ig.Graph`...'):
-    #     ig_graph = ig.Graph.Read_Pajek(str(ig_data / 'ig_comp_graph_relabeled_nodes.net'))
-    #
-    #     log.info(f'Read a graph with '
-    #              f'{blue | len(ig_graph.vs)} vertices and '
-    #              f'{blue | len(ig_graph.es)} edges.')
-
-    # leiden(ig_graph, ig_data, log)
-
     nx_data = Path('../../../data/graph/nx')
 
     with log.scope.info('Reading `nx.Graph`.'):
@@ -152,4 +631,12 @@ if __name__ == '__main__':
                  f'{blue | nx_graph.number_of_nodes()} nodes and '
                  f'{blue | nx_graph.number_of_edges()} edges.')
 
-    leiden_nx(nx_graph, nx_data, log)
\ No newline at end of file
+    nodes = arrays_of(nx_graph)[0]
+    membership = detect(nx_graph, 'leiden', cache=nx_data / '.communities', log=log)
+
+    # Singletons are not saved (as in partitions of `cdlib`, which were used before).
+    nodes, membership = without_singletons(nodes, membership)
+
+    with log.scope.info('Saving communities into a file...'):
+        with open(nx_data / 'leiden_communities.json', 'w') as file:
+            json.dump(communities_of(nodes, membership), file)
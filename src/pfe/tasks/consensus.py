@@ -0,0 +1,245 @@
+"""
+Consensus of several runs of a stochastic community detection method.
+
+Louvain and Leiden methods yield different partitions for different seeds;
+``consensus`` runs a method with several seeds (and, optionally,
+several resolutions) in parallel and combines the partitions, e.g.,
+::
+
+    result = consensus(graph, 'louvain', seeds=16)
+
+    membership = result.membership   # the consensus partition.
+    stability = result.stability     # how consistently every node is placed.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Tuple, Union
+
+import networkx as nx
+import numpy as np
+
+from pfe.misc.log import Log, Nothing
+from pfe.misc.log.misc import percents
+from pfe.misc.style import blue, magenta
+from pfe.tasks.communities import arrays_of, canonical, detect, modularity
+
+
+@dataclass
+class Consensus:
+    # noinspection PyUnresolvedReferences
+    """The consensus of several partitions of a graph.
+
+    :param nodes: a sorted array of node IDs that arrays below are aligned with.
+    :param membership: the dense membership array of the consensus partition.
+    :param stability: the stability of every node, i.e., the mean (over runs)
+                      fraction of its consensus community that is placed
+                      in the same community as the node.
+    :param partitions: membership arrays of all runs in the original graph
+                       (a row per run).
+    :param runs: ``(seed, resolution)`` of every run.
+    :param modularity: the modularity of the consensus partition.
+    """
+
+    nodes: np.ndarray
+    membership: np.ndarray
+    stability: np.ndarray
+    partitions: np.ndarray
+    runs: list[Tuple[int, Optional[float]]]
+    modularity: float
+
+
+def consensus(graph: Union[nx.Graph, Tuple[np.ndarray, np.ndarray, np.ndarray]],
+              algorithm: str = 'louvain',
+              seeds: Union[int, Iterable[int]] = 16,
+              resolutions: Optional[Iterable[float]] = None,
+              threshold: float = 0.5,
+              iterations: int = 10,
+              processes: Optional[int] = None,
+              cache: Optional[Union[str, Path]] = None,
+              log: Log = Nothing(),
+              **parameters) -> Consensus:
+    """Detects communities with several seeds (and resolutions)
+    and builds the consensus partition [1].
+
+    Runs are executed in a pool of processes that share a single copy
+    of arrays of the graph (see ``arrays_of``). For every edge of the graph,
+    the fraction of runs that put its ends into the same community is counted.
+    Edges with the fraction of at least ``threshold`` weighted by the fraction
+    form the consensus graph, which is partitioned again with the same runs,
+    until all runs agree (or for at most ``iterations`` iterations).
+
+    .. [1] Andrea Lancichinetti and Santo Fortunato.
+           "Consensus clustering in complex networks",
+           Scientific Reports, March 2012.
+           https://doi.org/10.1038/srep00336.
+
+    :param graph: either a graph or its arrays (see ``arrays_of``).
+    :param algorithm: the name of the algorithm (see ``communities.ALGORITHMS``).
+    :param seeds: either seeds of runs or their number (then seeds are ``0, 1, ...``).
+    :param resolutions: resolutions to run every seed with
+                        (optional; the default resolution of the algorithm is used).
+    :param threshold: the minimum fraction of runs that must put
+                      the ends of an edge together to keep the edge.
+    :param iterations: the maximum number of iterations.
+    :param processes: the number of processes to run detections in;
+                      if ``1``, runs are executed in the current process.
+    :param cache: the directory of a cache of partitions (optional; see ``communities.Cache``).
+    :param log: an instance of ``Log`` to log the progress with.
+    :param parameters: other parameters of the algorithm.
+    """
+
+    if not 0 < threshold <= 1:
+        raise ValueError('`threshold` must be in (0, 1].')
+
+    seeds = list(range(seeds)) if isinstance(seeds, int) else list(seeds)
+    resolutions = [None] if resolutions is None else list(resolutions)
+    runs = [(seed, resolution) for resolution in resolutions for seed in seeds]
+
+    if not runs:
+        raise ValueError('There must be at least one seed and one resolution.')
+
+    arrays = arrays_of(graph) if isinstance(graph, nx.Graph) else graph
+    nodes, edges, weights = arrays
+
+    tasks = [(algorithm, seed, cache, {**parameters, **({} if resolution is None else {'resolution': resolution})})
+             for seed, resolution in runs]
+
+    def report(i: int, membership: np.ndarray, done: int):
+        seed, resolution = runs[i]
+        log.info(f'Run {magenta | seed}' + ('' if resolution is None else f' ({magenta | resolution})') +
+                 f': {blue | membership.max() + 1} communities. [{percents(done, len(runs))}]')
+
+    partitions = _run(arrays, tasks, processes, report)
+    current = partitions
+
+    for iteration in range(iterations):
+        # Fractions of runs that put ends of every edge together.
+        together = (current[:, edges[:, 0]] == current[:, edges[:, 1]]).mean(axis=0)
+
+        if np.all((together == 0) | (together == 1)):
+            break
+
+        kept = together >= threshold
+
+        with log.scope.info(f'Iteration {magenta | iteration + 1}: '
+                            f'{blue | np.count_nonzero(kept)} edges of the consensus graph.'):
+            current = _run((nodes, edges[kept], together[kept]), tasks, processes, report)
+
+    membership = canonical(current[0])
+
+    return Consensus(nodes=nodes,
+                     membership=membership,
+                     stability=stability(membership, partitions),
+                     partitions=partitions,
+                     runs=runs,
+                     modularity=modularity(arrays, membership))
+
+
+def stability(membership: np.ndarray, partitions: np.ndarray) -> np.ndarray:
+    """Computes the stability of every node (see ``Consensus``).
+
+    :param membership: a dense membership array of the consensus partition.
+    :param partitions: membership arrays of runs (a row per run).
+    """
+
+    sizes = np.bincount(membership)
+    result = np.zeros(len(membership))
+
+    for partition in partitions:
+        # The number of nodes of every (consensus, run) pair of communities.
+        _, inverse, counts = np.unique(membership.astype(np.int64) * (int(partition.max()) + 1) + partition,
+                                       return_inverse=True, return_counts=True)
+        result += counts[inverse.reshape(-1)] / sizes[membership]
+
+    return result / len(partitions)
+
+
+_arrays: Tuple[np.ndarray, ...] = ()
+_memory: list[SharedMemory] = []
+
+
+def _run(arrays: Tuple[np.ndarray, np.ndarray, np.ndarray],
+         tasks: list[Tuple[str, int, Optional[Union[str, Path]], dict[str, Any]]],
+         processes: Optional[int],
+         report: Callable[[int, np.ndarray, int], Any]) -> np.ndarray:
+    """Runs detections in the graph (in a pool of processes unless ``processes`` is ``1``).
+
+    :return: membership arrays of runs (a row per task).
+    """
+
+    partitions = np.empty((len(tasks), len(arrays[0])), dtype=np.int32)
+
+    if processes == 1:
+        for i, (algorithm, seed, cache, parameters) in enumerate(tasks):
+            partitions[i] = detect(arrays, algorithm, seed, cache, **parameters)
+            report(i, partitions[i], i + 1)
+
+        return partitions
+
+    shared = [_share(x) for x in arrays]
+
+    try:
+        with ProcessPoolExecutor(max_workers=processes,
+                                 initializer=_attach,
+                                 initargs=([x for _, x in shared], )) as pool:
+            futures = {pool.submit(_detect, *task): i for i, task in enumerate(tasks)}
+
+            for done, future in enumerate(as_completed(futures), start=1):
+                partitions[futures[future]] = future.result()
+                report(futures[future], partitions[futures[future]], done)
+    finally:
+        for memory, _ in shared:
+            memory.close()
+            memory.unlink()
+
+    return partitions
+
+
+def _share(array: np.ndarray) -> Tuple[SharedMemory, Tuple[str, Tuple[int, ...], str]]:
+    """Copies the array into shared memory.
+
+    :return: the shared memory and the description of the array to attach to it.
+    """
+
+    memory = SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=memory.buf)[...] = array
+
+    return memory, (memory.name, array.shape, array.dtype.str)
+
+
+def _attach(descriptions: list[Tuple[str, Tuple[int, ...], str]]):
+    """Attaches a worker process to arrays in shared memory."""
+
+    global _arrays
+
+    for name, _, _ in descriptions:
+        _memory.append(SharedMemory(name=name))
+
+    _arrays = tuple(np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+                    for memory, (_, shape, dtype) in zip(_memory, descriptions))
+
+
+def _detect(algorithm: str, seed: int, cache: Optional[Union[str, Path]], parameters: dict[str, Any]) -> np.ndarray:
+    """Detects communities in the shared graph (in a worker process)."""
+    return detect(_arrays, algorithm, seed, cache, **parameters)
+
+
+if __name__ == '__main__':
+    from pfe.misc.log import Pretty
+    from pfe.parse import publications_in, parse
+
+    log = Pretty()
+    log.info('Starting.')
+
+    with log.scope.info('Reading publications.'):
+        graph = parse(publications_in('COMP', between=(1990, 2018), log=log))
+
+    with log.scope.info('Detecting communities.'):
+        result = consensus(graph, 'louvain', seeds=16, log=log)
+
+    log.info(f'The consensus partition has {blue | result.membership.max() + 1} communities '
+             f'and the modularity {blue | round(result.modularity, 4)}; '
+             f'the median stability is {blue | round(float(np.median(result.stability)), 4)}.')
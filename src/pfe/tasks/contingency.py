@@ -0,0 +1,169 @@
+"""
+Contingency tables of pairs of partitions into communities.
+
+The table counts nodes shared by every pair of communities of two partitions;
+it is built in a single pass over nodes, and all measures of similarity
+of communities (e.g., the Jaccard index) and of partitions (e.g., NMI)
+follow from it (and from sizes of communities), e.g.,
+::
+
+    table = Contingency.of(read(nice_2018, 'louvain'), read(nice_2013, 'louvain'))
+
+    matrix = table.jaccard().toarray()
+    score = table.nmi()
+"""
+
+from typing import Tuple, Union
+
+import numpy as np
+import scipy.sparse as sp
+
+from pfe.tasks.partition import Partition
+
+
+class Contingency:
+    """A sparse contingency table of two partitions.
+
+    Measures of similarity of communities (``jaccard`` and ``containment``)
+    are relative to full sizes of communities (``rows`` and ``columns``),
+    even if partitions do not cover the same nodes (e.g., a partition of a graph
+    of 2013 and of 2018), while measures of similarity of partitions
+    (e.g., ``nmi``) only take shared nodes (i.e., the table) into account.
+
+    :param table: a sparse ``(c1, c2)`` matrix, where ``table[i, j]`` is the number
+                  of nodes in both the community ``i`` of the first partition
+                  and the community ``j`` of the second one.
+    :param rows: sizes of communities of the first partition (``c1``).
+    :param columns: sizes of communities of the second partition (``c2``).
+    """
+
+    __slots__ = ('table', 'rows', 'columns')
+
+    def __init__(self, table: sp.csr_matrix, rows: np.ndarray, columns: np.ndarray):
+        self.table = table
+        self.rows = rows
+        self.columns = columns
+
+    @classmethod
+    def of(cls, x: Union[Partition, np.ndarray], y: Union[Partition, np.ndarray]) -> 'Contingency':
+        """Builds the contingency table of two partitions.
+
+        Partitions are either instances of ``Partition`` (then only their common
+        nodes are counted in the table, but sizes of communities are full)
+        or membership arrays aligned with the same nodes.
+        """
+
+        if isinstance(x, Partition) and isinstance(y, Partition):
+            _, i, j = np.intersect1d(x.nodes, y.nodes, assume_unique=True, return_indices=True)
+            a, b = np.asarray(x.membership)[i], np.asarray(y.membership)[j]
+            rows, columns = x.sizes(), y.sizes()
+        elif not isinstance(x, Partition) and not isinstance(y, Partition):
+            a, b = np.asarray(x), np.asarray(y)
+            rows = np.bincount(a) if len(a) > 0 else np.zeros(0, dtype=np.int64)
+            columns = np.bincount(b) if len(b) > 0 else np.zeros(0, dtype=np.int64)
+        else:
+            raise TypeError('Both partitions must be either instances of `Partition` or membership arrays.')
+
+        if len(a) != len(b):
+            raise ValueError('Membership arrays must be of the same length.')
+
+        table = sp.csr_matrix((np.ones(len(a), dtype=np.int64), (a, b)), shape=(len(rows), len(columns)))
+        table.sum_duplicates()
+
+        return cls(table, rows, columns)
+
+    def __len__(self) -> int:
+        """Returns the number of counted (i.e., shared) nodes."""
+        return int(self.table.sum())
+
+    def restricted(self, rows: bool = True, columns: bool = True) -> 'Contingency':
+        """Returns the table where sizes of communities only count shared nodes.
+
+        :param rows: whether to restrict communities of the first partition.
+        :param columns: whether to restrict communities of the second partition.
+        """
+
+        x, y = self._marginals()
+
+        return Contingency(self.table, x if rows else self.rows, y if columns else self.columns)
+
+    def jaccard(self) -> sp.csr_matrix:
+        """Returns Jaccard indices ``|A ∩ B| / |A ∪ B|`` of all pairs of communities."""
+        return self._map(lambda n, a, b: n / (a + b - n))
+
+    def containment(self, rows: bool = True) -> sp.csr_matrix:
+        """Returns fractions ``|A ∩ B| / |A|`` of all pairs of communities.
+
+        :param rows: whether ``A`` is a community of the first partition
+                     (otherwise, ``A`` is a community of the second one).
+        """
+        return self._map(lambda n, a, b: n / (a if rows else b))
+
+    def mutual_information(self) -> float:
+        """Returns the mutual information of partitions (in nats)."""
+
+        n = len(self)
+        i, j, counts = self._entries()
+        x, y = self._marginals()
+
+        return float((counts / n * np.log(n * counts / (x[i] * y[j]))).sum()) if n > 0 else 0.0
+
+    def nmi(self) -> float:
+        """Returns the normalized mutual information of partitions
+        (normalized by the arithmetic mean of their entropies)."""
+
+        h = sum(map(_entropy, self._marginals()))
+
+        return 2 * self.mutual_information() / h if h > 0 else 1.0
+
+    def ari(self) -> float:
+        """Returns the adjusted Rand index of partitions."""
+
+        n = len(self)
+        _, _, counts = self._entries()
+
+        index = _pairs(counts).sum()
+        a, b = (_pairs(x).sum() for x in self._marginals())
+
+        expected = a * b / _pairs(n) if n > 1 else 0.0
+        maximum = (a + b) / 2
+
+        return float((index - expected) / (maximum - expected)) if maximum != expected else 1.0
+
+    def vi(self) -> float:
+        """Returns the variation of information of partitions (in nats)."""
+        return sum(map(_entropy, self._marginals())) - 2 * self.mutual_information()
+
+    def _entries(self):
+        """Returns rows, columns and counts of non-zero entries of the table."""
+
+        table = self.table.tocoo()
+
+        return table.row, table.col, table.data.astype(np.float64)
+
+    def _marginals(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the numbers of shared nodes of communities of both partitions."""
+
+        return (np.asarray(self.table.sum(axis=1), dtype=np.float64).reshape(-1),
+                np.asarray(self.table.sum(axis=0), dtype=np.float64).reshape(-1))
+
+    def _map(self, function) -> sp.csr_matrix:
+        """Returns a sparse matrix of ``function(|A ∩ B|, |A|, |B|)``
+        for all pairs of communities that share nodes."""
+
+        i, j, counts = self._entries()
+
+        return sp.csr_matrix((function(counts, self.rows[i], self.columns[j]), (i, j)), shape=self.table.shape)
+
+
+def _entropy(sizes: np.ndarray) -> float:
+    """Returns the entropy of a partition with communities of the specified sizes."""
+
+    p = sizes[sizes > 0] / sizes.sum() if sizes.sum() > 0 else np.zeros(0)
+
+    return float(-(p * np.log(p)).sum())
+
+
+def _pairs(x):
+    """Returns the number of unordered pairs of ``x`` elements."""
+    return np.asarray(x, dtype=np.float64) * (np.asarray(x, dtype=np.float64) - 1) / 2
@@ -2,12 +2,17 @@
 A module for calculating statistics on collaboration networks.
 """
 
+import io
 from collections import Counter
 from decimal import Decimal
 from typing import Any, Iterable, Iterator, Tuple, Optional, Union
+from weakref import WeakKeyDictionary
 
 import networkx as nx
-import community as cm
+import numpy as np
+
+from pfe.parse import Authorship
+from pfe.tasks.communities import detect
 
 
 class Distribution:
@@ -152,6 +157,168 @@ class Distribution:
         return dict(self._p)
 
 
+class Accumulator:
+    """A mergeable streaming accumulator of a discrete distribution
+    of non-negative integers.
+
+    Unlike ``Distribution``, an accumulator can be filled incrementally
+    (``add`` and ``add_many``) and combined with other accumulators
+    (``merge``), which allows computing partial distributions over chunks
+    of data (e.g., files or years) in different workers and combining them
+    afterwards. Accumulators are cheap to serialize (``to_bytes``).
+
+    Values below ``threshold`` are counted exactly. If ``threshold`` is
+    specified, values greater or equal to it are counted in a log-binned
+    sketch: values in ``[threshold * b**i, threshold * b**(i + 1))``, where
+    ``b = 1 + precision``, share the same bin, which keeps the count and the sum
+    of its values; thus, the memory is bounded by ``threshold`` plus
+    the logarithm of the maximum value, and every value is restored with
+    the relative error of at most ``precision``.
+
+    :param threshold: the value starting from which values are sketched
+                      (optional; all values are counted exactly by default).
+    :param precision: the relative precision of the sketch.
+    """
+
+    __slots__ = ('_counts', '_bins', '_sums', '_threshold', '_precision')
+
+    def __init__(self, threshold: Optional[int] = None, precision: float = 0.01):
+        if threshold is not None and threshold <= 0:
+            raise ValueError('`threshold` must be positive.')
+        if precision <= 0:
+            raise ValueError('`precision` must be positive.')
+
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._bins = np.zeros(0, dtype=np.int64)
+        self._sums = np.zeros(0, dtype=np.int64)
+        self._threshold = threshold
+        self._precision = precision
+
+    def add(self, value: int, count: int = 1) -> 'Accumulator':
+        """Adds ``count`` observations of ``value``."""
+        return self.add_many(np.asarray([value]), np.asarray([count]))
+
+    def add_many(self, values: Iterable[int], counts: Optional[Iterable[int]] = None) -> 'Accumulator':
+        """Adds the observed ``values`` (an array or any iterable).
+
+        :param values: the observed values.
+        :param counts: the numbers of observations of every value (optional).
+        """
+
+        values = np.asarray(values if isinstance(values, np.ndarray) else list(values), dtype=np.int64)
+        counts = np.ones_like(values) if counts is None else np.asarray(
+            counts if isinstance(counts, np.ndarray) else list(counts), dtype=np.int64)
+
+        if len(counts) != len(values):
+            raise ValueError('`values` and `counts` must be of the same length.')
+        if len(values) == 0:
+            return self
+        if values.min() < 0:
+            raise ValueError('Values must be non-negative.')
+        if counts.min() < 0:
+            raise ValueError('Counts must be non-negative.')
+
+        exact = values < self._threshold if self._threshold is not None else slice(None)
+
+        self._counts = _add(self._counts, _counted(values[exact], counts[exact]))
+
+        if self._threshold is not None and not np.all(exact):
+            sketched = values[~exact]
+            weights = counts[~exact]
+
+            bins = self._bin(sketched)
+
+            self._bins = _add(self._bins, _counted(bins, weights))
+            self._sums = _add(self._sums, _counted(bins, weights * sketched))
+
+        return self
+
+    def merge(self, other: 'Accumulator') -> 'Accumulator':
+        """Adds all observations of ``other`` to this accumulator."""
+
+        if (self._threshold, self._precision) != (other._threshold, other._precision):
+            raise ValueError('Accumulators with different sketches cannot be merged.')
+
+        self._counts = _add(self._counts, other._counts)
+        self._bins = _add(self._bins, other._bins)
+        self._sums = _add(self._sums, other._sums)
+
+        return self
+
+    def size(self) -> int:
+        """Returns the total number of the observed values."""
+        return int(self._counts.sum() + self._bins.sum())
+
+    def distribution(self) -> Distribution:
+        """Returns the accumulated ``Distribution``.
+
+        Every non-empty bin of the sketch is represented
+        by the (rounded) mean of its values.
+        """
+
+        distribution = {k: n for k, n in enumerate(self._counts.tolist()) if n > 0}
+
+        for n, total in zip(self._bins.tolist(), self._sums.tolist()):
+            if n > 0:
+                k = round(total / n)
+                distribution[k] = distribution.get(k, 0) + n
+
+        return Distribution(distribution)
+
+    def to_bytes(self) -> bytes:
+        """Serializes the accumulator."""
+
+        buffer = io.BytesIO()
+        np.savez(buffer,
+                 counts=self._counts,
+                 bins=self._bins,
+                 sums=self._sums,
+                 threshold=self._threshold or 0,
+                 precision=self._precision)
+
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Accumulator':
+        """Deserializes an accumulator serialized with ``to_bytes``."""
+
+        with np.load(io.BytesIO(data)) as arrays:
+            accumulator = cls(threshold=int(arrays['threshold']) or None,
+                              precision=float(arrays['precision']))
+
+            accumulator._counts = arrays['counts']
+            accumulator._bins = arrays['bins']
+            accumulator._sums = arrays['sums']
+
+        return accumulator
+
+    def _bin(self, values: np.ndarray) -> np.ndarray:
+        """Returns bins of the sketch that ``values`` fall into."""
+        return np.floor(np.log(values / self._threshold) / np.log1p(self._precision)).astype(np.int64)
+
+
+def _counted(indices: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Returns sums of ``weights`` of every index (as ``np.bincount``,
+    but in ``int64``, so that large sums are exact)."""
+
+    result = np.zeros(int(indices.max()) + 1 if len(indices) > 0 else 0, dtype=np.int64)
+    np.add.at(result, indices, weights)
+
+    return result
+
+
+def _add(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Adds two arrays of counts of (possibly) different lengths."""
+
+    if len(x) < len(y):
+        x, y = y, x
+
+    x = x.astype(np.int64)  # Makes a copy.
+    x[:len(y)] += y.astype(np.int64)
+
+    return x
+
+
 def number_of_authors(publications: list[dict]) -> int:
     """Computes the number of different authors.
     Authors are differentiated by their ID.
@@ -250,10 +417,21 @@ def authors_per_publication(publications: list[dict]) -> Distribution:
     return Distribution(distribution)
 
 
-def communities_per_publication(graph: nx.Graph, publications: Any) -> Distribution:
-    """Computes the distributions of the number of communities per publication.
+_partitions: 'WeakKeyDictionary[nx.Graph, np.ndarray]' = WeakKeyDictionary()
+
+
+def nodes_of(graph: nx.Graph) -> np.ndarray:
+    """Returns the dense node index of the graph,
+    i.e., a sorted array of (integer) node IDs."""
+    return np.sort(np.fromiter(graph.nodes, dtype=np.int64, count=graph.number_of_nodes()))
+
+
+def partition(graph: nx.Graph) -> np.ndarray:
+    """Detects communities in the graph using the Louvain method [1].
 
-    The function uses the Louvain method [1] to detect communities in the graph.
+    The partition is cached per graph instance, thus, subsequent calls
+    with the same (unmodified) graph do not rerun the detection
+    (see also ``communities.detect``).
 
     .. [1] Vincent D. Blondel, Jean-Loup Guillaume, Renaud Lambiotte, and Etienne Lefebvre.
            "Fast unfolding of communities in large networks",
@@ -261,27 +439,70 @@ def communities_per_publication(graph: nx.Graph, publications: Any) -> Distribut
            https://doi.org/10.1088/1742-5468/2008/10/P10008.
 
     :param graph: the collaboration graph.
-    :param publications: the list of publications that
-                         the graph was constructed from.
+
+    :return: a dense membership array aligned with ``nodes_of(graph)``
+             (``membership[i]`` is the community of the ``i``-th node).
+    """
+
+    if (membership := _partitions.get(graph)) is not None:
+        return membership
+
+    membership = detect(graph, 'louvain')
+
+    _partitions[graph] = membership
+
+    return membership
+
+
+def communities_per_publication(graph: nx.Graph,
+                                publications: Union[Iterable[dict], Authorship],
+                                membership: Optional[np.ndarray] = None) -> Distribution:
+    """Computes the distributions of the number of communities per publication.
+
+    Unless ``membership`` is provided, the function uses the Louvain method
+    to detect communities in the graph (see ``partition``).
+
+    The number of communities is counted in a single vectorized pass over
+    the publication→author incidence, thus, it is cheaper to build
+    an ``Authorship`` once and pass its subsets (e.g., ``authorship[mask]``)
+    than to pass lists of publications repeatedly.
+
+    :param graph: the collaboration graph.
+    :param publications: either the list of publications that the graph
+                         was constructed from or their ``Authorship``.
+    :param membership: a dense membership array aligned
+                       with ``nodes_of(graph)`` (optional).
 
     :return: the computed ``Distribution``.
     """
 
-    graph = graph.copy()
-    for edge in graph.edges:
-        graph.edges[edge]['weight'] = float(graph.edges[edge]['weight'])
+    nodes = nodes_of(graph)
 
-    communities = cm.best_partition(graph)
-    distribution = {}
+    if membership is None:
+        membership = partition(graph)
+    if not isinstance(publications, Authorship):
+        publications = Authorship.of(publications, authors=nodes)
 
-    for publication in publications:
-        partition = {communities[int(x['id'])] for x in publication['authors']}
-        partition_size = len(partition)
+    indices = publications.indices
+    if publications.authors is not nodes and not np.array_equal(publications.authors, nodes):
+        indices = np.searchsorted(nodes, publications.authors[indices])
 
-        distribution.setdefault(partition_size, 0)
-        distribution[partition_size] += 1
+    rows = publications.rows()
+    labels = membership[indices]
 
-    return Distribution(distribution)
+    # Sort entries by publications and then by communities,
+    # so that repeated communities of a publication are adjacent.
+    order = np.lexsort((labels, rows))
+    rows = rows[order]
+    labels = labels[order]
+
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = (rows[1:] != rows[:-1]) | (labels[1:] != labels[:-1])
+
+    counts = np.bincount(rows[first], minlength=len(publications))
+    distribution = np.bincount(counts)
+
+    return Distribution({k: n for k, n in enumerate(distribution.tolist()) if n > 0})
 
 
 def degree_distribution(graph: nx.Graph, weighted: bool = False) -> Distribution:
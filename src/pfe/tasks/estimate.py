@@ -0,0 +1,380 @@
+"""
+Estimates parameters of the generative models directly from
+the chronological stream of publications (in a single pass).
+"""
+
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional, Tuple
+
+import numpy as np
+import scipy.optimize as opt
+
+from pfe.misc import distributions
+from pfe.misc.log import Log, Nothing
+from pfe.misc.style import blue
+from pfe.models import graph_cutoff, hypergraph_communities, hypergraph_cutoff, hypergraph_regular
+from pfe.parse import Authorship
+from pfe.tasks.distributions import Distribution
+
+
+@dataclass
+class Statistics:
+    # noinspection PyUnresolvedReferences
+    """Quantities counted over the chronological stream of publications.
+
+    The first publication is considered to be the initial graph.
+
+    :param publications: the number of publications.
+    :param authors: the number of authors.
+    :param initial: the number of authors of the first publication.
+    :param introducing: the number of publications (except the first one)
+                        that introduce at least one new author.
+    :param pairs: the number of pairs of co-authors
+                  (counted once per publication).
+    :param deactivations: the number of authors whose last publication
+                          was published at least ``window`` days
+                          before the last publication of the stream.
+    :param sizes: the distribution of the number of authors per publication.
+    """
+
+    publications: int
+    authors: int
+    initial: int
+    introducing: int
+    pairs: int
+    deactivations: int
+    sizes: Distribution
+
+
+def chronological(publications: Iterable[dict],
+                  authors: Optional[np.ndarray] = None,
+                  log: Log = Nothing()) -> Tuple[Authorship, np.ndarray]:
+    """Sorts publications by their dates.
+
+    Publications without a valid date are skipped.
+
+    :param publications: publications represented as dictionaries with JSON.
+    :param authors: a sorted array of author IDs to index authors with (optional).
+    :param log: an instance of ``Log`` to log the execution with.
+
+    :return: the ``Authorship`` of sorted publications and their dates
+             (as an array of ``datetime64[D]``).
+    """
+
+    dated = []
+    dates = []
+
+    for publication in publications:
+        try:
+            date = np.datetime64(publication.get('date'), 'D')
+        except (TypeError, ValueError):
+            date = np.datetime64('NaT')
+
+        if np.isnat(date):
+            log.warn(f'Skipping a publication without a date: {publication.get("id")}.')
+            continue
+
+        dated.append(publication)
+        dates.append(date)
+
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    order = np.argsort(dates, kind='stable')
+
+    return Authorship.of([dated[i] for i in order], authors), dates[order]
+
+
+def statistics(authorship: Authorship, dates: np.ndarray, window: int = 365) -> Statistics:
+    """Counts ``Statistics`` of chronologically sorted publications.
+
+    :param authorship: the ``Authorship`` of sorted publications.
+    :param dates: dates of publications.
+    :param window: the number of days after which an author
+                   who does not publish anymore is considered inactive.
+    """
+
+    if len(authorship) == 0:
+        raise ValueError('There are no publications.')
+
+    sizes = authorship.sizes()
+    first, last = occurrences(authorship)
+
+    # The first publication is the initial graph; thus,
+    # its authors are not considered to be introduced.
+    introduced = np.bincount(authorship.rows()[first], minlength=len(authorship))
+    introduced[0] = 0
+
+    last_dates = dates[authorship.rows()[last]]
+
+    return Statistics(publications=len(authorship),
+                      authors=int(np.count_nonzero(first)),
+                      initial=int(sizes[0]),
+                      introducing=int(np.count_nonzero(introduced)),
+                      pairs=int((sizes * (sizes - 1) // 2).sum()),
+                      deactivations=int(np.count_nonzero(last_dates + np.timedelta64(window, 'D') <= dates[-1])),
+                      sizes=Distribution(_counts(sizes[sizes > 0])))
+
+
+def estimate(model: str,
+             publications: Iterable[dict],
+             membership: Optional[np.ndarray] = None,
+             authors: Optional[np.ndarray] = None,
+             window: int = 365,
+             log: Log = Nothing()) -> Any:
+    """Estimates parameters of the model from publications.
+
+    All events of the models are counted in a single chronological pass
+    over publications, and parameters are set to the maximum likelihood
+    estimates of probabilities of events (i.e., to their frequencies).
+
+    - ``graph_cutoff``: every new author is a node event, every other pair
+      of co-authors is an edge event, and every inactive author
+      (see ``Statistics.deactivations``) is a deactivation event.
+    - ``hypergraph_regular`` and ``hypergraph_cutoff``: every new author is
+      a node event (as a node event adds a single node, a publication that
+      introduces ``k`` new authors is ``k`` node events), any other publication
+      is an edge event, and deactivations are counted as above; cardinalities
+      of hyperedges follow the empirical number of authors per publication.
+    - ``hypergraph_communities``: see ``communities``.
+
+    :param model: the name of the model (see ``registry.MODELS``).
+    :param publications: publications represented as dictionaries with JSON.
+    :param membership: communities of authors (only for ``hypergraph_communities``;
+                       optional, a single community is assumed by default).
+    :param authors: a sorted array of author IDs that ``membership``
+                    refers to (e.g., ``nodes_of(graph)``).
+    :param window: the number of days after which an author
+                   who does not publish anymore is considered inactive.
+    :param log: an instance of ``Log`` to log the execution with.
+
+    :raise ValueError: if there are less than two publications
+                       (the first one is the initial graph, so there are no events),
+                       or if estimated parameters are invalid for the model
+                       (e.g., if deactivations outnumber new authors).
+
+    :return: estimated ``Parameters`` of the model.
+    """
+
+    authorship, dates = chronological(publications, authors, log=log)
+    counted = statistics(authorship, dates, window)
+
+    if counted.publications < 2:
+        raise ValueError('There must be at least two publications.')
+
+    log.info(f'Counted {blue | counted.publications} publications, '
+             f'{blue | counted.authors} authors and '
+             f'{blue | counted.deactivations} deactivations.')
+
+    if model == 'graph_cutoff':
+        nodes = counted.authors - counted.initial
+        edges = max(counted.pairs - nodes, 0)
+        steps = nodes + edges + counted.deactivations
+
+        return graph_cutoff.Parameters(p=nodes / max(steps, 1),
+                                       q=edges / max(edges + counted.deactivations, 1),
+                                       m=counted.initial,
+                                       k=steps)
+
+    d = distributions.empirical(counted.sizes)
+    nodes = counted.authors - counted.initial
+    edges = counted.publications - 1 - counted.introducing
+
+    if model == 'hypergraph_regular':
+        return hypergraph_regular.Parameters(n0=counted.initial,
+                                             n=counted.authors,
+                                             p=nodes / max(nodes + edges, 1),
+                                             d=d)
+    if model == 'hypergraph_cutoff':
+        return hypergraph_cutoff.Parameters(n0=counted.initial,
+                                            n=counted.authors,
+                                            p=nodes / max(nodes + edges + counted.deactivations, 1),
+                                            q=edges / max(edges + counted.deactivations, 1),
+                                            d=d)
+    if model == 'hypergraph_communities':
+        if membership is None:
+            membership = np.zeros(len(authorship.authors), dtype=np.int32)
+
+        return communities(authorship, membership, counted)
+
+    raise KeyError(model)
+
+
+def communities(authorship: Authorship,
+                membership: np.ndarray,
+                counted: Statistics) -> hypergraph_communities.Parameters:
+    """Estimates parameters of ``hypergraph_communities``.
+
+    A publication that introduces ``k`` new authors is a node-and-edge event
+    followed by ``k - 1`` node events, and any other publication is
+    an edge event. Then
+
+    - ``m`` are frequencies of communities of new authors;
+    - ``p`` are frequencies of pairs of communities of co-authors of edge events
+      (every publication has the total weight of 1);
+    - ``gamma`` maximises the likelihood of picking every existing author ``u``
+      of the community ``q``, which is ``(d(u) + gamma) / (D(q) + gamma n(q))``,
+      where ``d(u)`` is the number of preceding publications of ``u``, and
+      ``D(q)`` and ``n(q)`` are the sum of degrees and the number of authors
+      of ``q`` before the publication;
+    - cardinalities follow the empirical distribution of halves of numbers
+      of authors of publications (the model draws both parts of a hyperedge).
+
+    :param authorship: the ``Authorship`` of chronologically sorted publications.
+    :param membership: communities of authors (of ``authorship.authors``).
+    :param counted: ``Statistics`` of publications.
+    """
+
+    membership = np.asarray(membership)
+    communities = membership[authorship.indices]
+    c = int(membership.max()) + 1
+
+    rows = authorship.rows()
+    sizes = authorship.sizes()
+    first, _ = occurrences(authorship)
+
+    introduced = np.bincount(rows[first], minlength=len(authorship))
+    introduced[0] = 0
+
+    events = len(authorship) - 1 + (introduced.sum() - counted.introducing)
+    edge = introduced == 0
+    edge[0] = False
+
+    # Frequencies of communities of new authors.
+    m = np.bincount(communities[first & (rows > 0)], minlength=c)
+
+    # Frequencies of pairs of communities of co-authors of edge events.
+    p = np.zeros(c * c)
+    selected = edge[rows]
+
+    a, b = _pairs(authorship.indptr, rows, sizes, selected)
+    np.add.at(p, communities[a] * c + communities[b], 1 / (sizes[rows[a]] * (sizes[rows[a]] - 1)))
+
+    solo = selected & (sizes[rows] == 1)
+    np.add.at(p, communities[solo] * (c + 1), 1)
+
+    halves = np.concatenate((sizes[1:] // 2, sizes[1:] - sizes[1:] // 2))
+
+    return hypergraph_communities.Parameters(
+        n0=max(counted.initial, c),
+        n=counted.authors,
+        c=c,
+        pv=float((introduced.sum() - counted.introducing) / events),
+        pve=float(counted.introducing / events),
+        p=_normalised(p).reshape(c, c),
+        m=_normalised(m),
+        gamma=_gamma(authorship, rows, communities, first),
+        distribution=distributions.empirical(_counts(halves))
+    )
+
+
+def occurrences(authorship: Authorship) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns masks of the first and the last occurrences
+    of authors in ``authorship.indices``."""
+
+    indices = authorship.indices
+
+    first = np.zeros(len(indices), dtype=bool)
+    first[np.unique(indices, return_index=True)[1]] = True
+
+    last = np.zeros(len(indices), dtype=bool)
+    last[len(indices) - 1 - np.unique(indices[::-1], return_index=True)[1]] = True
+
+    return first, last
+
+
+def _pairs(indptr: np.ndarray,
+           rows: np.ndarray,
+           sizes: np.ndarray,
+           selected: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns all ordered pairs ``(a, b)`` of distinct entries
+    of the same publication (among ``selected`` entries)."""
+
+    entries = np.flatnonzero(selected)
+    counts = sizes[rows[entries]]
+
+    a = np.repeat(entries, counts)
+    within = np.arange(len(a)) - np.repeat(np.cumsum(counts) - counts, counts)
+    b = indptr[rows[a]] + within
+
+    return a[a != b], b[a != b]
+
+
+def _gamma(authorship: Authorship, rows: np.ndarray, communities: np.ndarray, first: np.ndarray) -> float:
+    """Returns the maximum likelihood estimate of ``gamma`` (see ``communities``)."""
+
+    indices = authorship.indices
+    n = len(authorship)
+
+    # The number of preceding publications of the author of every entry.
+    order = np.argsort(indices, kind='stable')
+    starts = np.searchsorted(indices[order], indices[order], side='left')
+    degrees = np.empty(len(indices), dtype=np.int64)
+    degrees[order] = np.arange(len(indices)) - starts
+
+    # Sums of degrees and numbers of authors of communities before every publication
+    # are numbers of (first) entries of the community in preceding publications.
+    keys = communities.astype(np.int64) * n + rows
+    queries = communities.astype(np.int64) * n
+    total = np.sort(keys)
+    introduced = np.sort(keys[first])
+
+    D = np.searchsorted(total, keys) - np.searchsorted(total, queries)
+    N = np.searchsorted(introduced, keys) - np.searchsorted(introduced, queries)
+
+    attached = ~first
+    d, D, N = degrees[attached], D[attached], N[attached]
+
+    if len(d) == 0:
+        return 1.0
+
+    def negative(log_gamma: float) -> float:
+        gamma = np.exp(log_gamma)
+        return -(np.log(d + gamma).sum() - np.log(D + gamma * N).sum())
+
+    result = opt.minimize_scalar(negative, bounds=(-10, 10), method='bounded')
+
+    return float(np.exp(result.x))
+
+
+def _counts(values: np.ndarray) -> dict[int, int]:
+    """Returns the number of occurrences of every (observed) value."""
+
+    values, counts = np.unique(values, return_counts=True)
+
+    return dict(zip(values.tolist(), counts.tolist()))
+
+
+def _normalised(x: np.ndarray) -> np.ndarray:
+    """Returns ``x`` divided by its sum, so that the sum is exactly 1."""
+
+    x = np.asarray(x, dtype=np.float64) / np.sum(x)
+
+    # Move the rounding error to the largest element.
+    for _ in range(10):
+        if (error := 1 - x.sum()) == 0:
+            break
+        x[np.argmax(x)] += error
+
+    return x
+
+
+if __name__ == '__main__':
+    from pfe.misc.log import Pretty
+    from pfe.parse import publications_in, parse
+    from pfe.tasks.distributions import nodes_of, partition
+
+    log = Pretty()
+    log.info('Starting.')
+
+    with log.scope.info('Reading publications.'):
+        publications = list(publications_in('COMP', between=(1990, 2018), log=log))
+
+    with log.scope.info('Detecting communities.'):
+        graph = parse(publications)
+        membership = partition(graph)
+
+    for model in ['graph_cutoff', 'hypergraph_regular', 'hypergraph_cutoff', 'hypergraph_communities']:
+        with log.scope.info(f'Estimating parameters of `{model}`.'):
+            try:
+                log.info(repr(estimate(model, publications, membership, authors=nodes_of(graph), log=log)))
+            except ValueError as error:
+                log.warn(f'Estimated parameters are invalid: {error}')
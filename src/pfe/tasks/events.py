@@ -0,0 +1,219 @@
+"""
+Replays the chronological stream of publications as a log of events
+of the generative models (i.e., additions of nodes, additions of edges
+and deactivations of nodes), so that the real data and generated graphs
+can be studied in the same vocabulary.
+"""
+
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+import numpy as np
+
+from pfe.misc.log import Log, Nothing
+from pfe.misc.style import blue
+from pfe.parse import Authorship
+from pfe.tasks.estimate import chronological, occurrences
+
+
+class Events:
+    """A compact log of events stored as columnar arrays.
+
+    Members of the event ``i`` are ``members[indptr[i]:indptr[i + 1]]``,
+    which are positions of nodes in ``authors`` (the dense author index).
+    Events are sorted by their timestamps.
+
+    :param kinds: kinds of events (``NODE``, ``EDGE`` or ``DEACTIVATION``).
+    :param times: timestamps of events.
+    :param indptr: an array of offsets of events in ``members``.
+    :param members: an array of positions of members of events in ``authors``.
+    :param authors: a sorted array of author IDs.
+    """
+
+    NODE = 0
+    EDGE = 1
+    DEACTIVATION = 2
+
+    __slots__ = ('kinds', 'times', 'indptr', 'members', 'authors')
+
+    def __init__(self,
+                 kinds: np.ndarray,
+                 times: np.ndarray,
+                 indptr: np.ndarray,
+                 members: np.ndarray,
+                 authors: np.ndarray):
+        self.kinds = kinds
+        self.times = times
+        self.indptr = indptr
+        self.members = members
+        self.authors = authors
+
+    @classmethod
+    def of(cls, authorship: Authorship, dates: np.ndarray, window: Optional[int] = 365) -> 'Events':
+        """Builds the log of events of chronologically sorted publications.
+
+        Every publication is replayed as ``NODE`` events of its new authors
+        (in the order of their positions in the publication) followed by
+        an ``EDGE`` event of all its authors. An author is deactivated
+        ``window`` days after their last publication (unless it is later
+        than the last publication of the stream); deactivations
+        follow all publications of the same day.
+
+        :param authorship: the ``Authorship`` of sorted publications.
+        :param dates: dates of publications (as an array of ``datetime64[D]``).
+        :param window: the number of days after which an author who does not
+                       publish anymore is deactivated (``None`` to never deactivate).
+        """
+
+        indices = authorship.indices
+        rows = authorship.rows()
+        sizes = authorship.sizes()
+        n = len(authorship)
+
+        first, last = occurrences(authorship)
+        introduced = np.flatnonzero(first)
+
+        if window is None:
+            deactivated = np.zeros(0, dtype=indices.dtype)
+            deactivations = np.zeros(0, dtype=dates.dtype)
+        else:
+            last = np.flatnonzero(last)
+            deactivations = dates[rows[last]] + np.timedelta64(window, 'D')
+
+            due = deactivations <= dates[-1]
+            deactivated = indices[last][due]
+            deactivations = deactivations[due]
+
+        # Events in the order of their construction:
+        # nodes, edges (publications), and deactivations.
+        kinds = np.concatenate((np.full(len(introduced), cls.NODE, dtype=np.int8),
+                                np.full(n, cls.EDGE, dtype=np.int8),
+                                np.full(len(deactivated), cls.DEACTIVATION, dtype=np.int8)))
+        times = np.concatenate((dates[rows[introduced]], dates, deactivations))
+        members = np.concatenate((indices[introduced], indices, deactivated))
+        counts = np.concatenate((np.ones(len(introduced), dtype=np.int64),
+                                 sizes,
+                                 np.ones(len(deactivated), dtype=np.int64)))
+
+        # Events are sorted by (time, publication, kind, position).
+        publications = np.concatenate((rows[introduced], np.arange(n), np.full(len(deactivated), n)))
+        positions = np.concatenate((introduced, np.zeros(n, dtype=np.int64), deactivated))
+
+        order = np.lexsort((positions, kinds, publications, times))
+
+        indptr = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+
+        return cls(kinds, times, indptr, members.astype(np.int32), authorship.authors)[order]
+
+    def __len__(self) -> int:
+        """Returns the number of events."""
+        return len(self.kinds)
+
+    def __getitem__(self, events: Union[slice, np.ndarray, list[int]]) -> 'Events':
+        """Returns the log of the selected events
+        (by a slice, an array of positions or a boolean mask)
+        that shares the author index with this one."""
+
+        selected = np.arange(len(self))[events]
+        sizes = self.sizes()[selected]
+
+        indptr = np.zeros(len(selected) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=indptr[1:])
+
+        # Positions of all selected entries of `members`.
+        starts = np.repeat(self.indptr[selected] - indptr[:-1], sizes)
+        members = self.members[starts + np.arange(indptr[-1])]
+
+        return Events(self.kinds[selected], self.times[selected], indptr, members, self.authors)
+
+    def sizes(self) -> np.ndarray:
+        """Returns the number of members of every event."""
+        return np.diff(self.indptr)
+
+    def rows(self) -> np.ndarray:
+        """Returns the event of every entry of ``members``."""
+        return np.repeat(np.arange(len(self)), self.sizes())
+
+    def of_kind(self, kind: int) -> 'Events':
+        """Returns the log of events of the specified kind."""
+        return self[self.kinds == kind]
+
+    def counts(self) -> np.ndarray:
+        """Returns the number of events of every kind."""
+        return np.bincount(self.kinds, minlength=3)
+
+    def degrees(self) -> np.ndarray:
+        """Returns the number of ``EDGE`` events of every author
+        (i.e., the degree in the hypergraph)."""
+
+        return np.bincount(self.members[(self.kinds == self.EDGE)[self.rows()]], minlength=len(self.authors))
+
+    def save(self, path: Union[str, Path]):
+        """Saves the log into an ``.npz`` file."""
+
+        np.savez_compressed(path,
+                            kinds=self.kinds,
+                            times=self.times,
+                            indptr=self.indptr,
+                            members=self.members,
+                            authors=self.authors)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'Events':
+        """Loads a log saved with ``save``."""
+
+        with np.load(path) as arrays:
+            return cls(arrays['kinds'], arrays['times'], arrays['indptr'], arrays['members'], arrays['authors'])
+
+
+def replay(publications: Iterable[dict],
+           window: Optional[int] = 365,
+           authors: Optional[np.ndarray] = None,
+           log: Log = Nothing()) -> Events:
+    """Replays publications as a log of events (see ``Events.of``).
+
+    Publications are consumed once (e.g., directly from ``publications_in``);
+    only their authors and dates are kept.
+
+    :param publications: publications represented as dictionaries with JSON.
+    :param window: the number of days after which an author who does not
+                   publish anymore is deactivated (``None`` to never deactivate).
+    :param authors: a sorted array of author IDs to index authors with (optional).
+    :param log: an instance of ``Log`` to log the execution with.
+    """
+
+    def compact(publications: Iterable[dict]) -> Iterable[dict]:
+        for publication in publications:
+            yield {'id': publication.get('id'),
+                   'date': publication.get('date'),
+                   'authors': publication['authors']}
+
+    authorship, dates = chronological(compact(publications), authors, log=log)
+
+    if len(authorship) == 0:
+        raise ValueError('There are no publications.')
+
+    events = Events.of(authorship, dates, window)
+
+    nodes, edges, deactivations = events.counts().tolist()
+
+    log.info(f'Replayed {blue | len(authorship)} publications as '
+             f'{blue | nodes} node, {blue | edges} edge and '
+             f'{blue | deactivations} deactivation events.')
+
+    return events
+
+
+if __name__ == '__main__':
+    from pfe.misc.log import Pretty
+    from pfe.parse import publications_in
+
+    log = Pretty()
+    log.info('Starting.')
+
+    with log.scope.info('Replaying publications.'):
+        events = replay(publications_in('COMP', between=(1990, 2018), log=log), log=log)
+
+    with log.scope.info('Saving events.'):
+        events.save('COMP-events.npz')
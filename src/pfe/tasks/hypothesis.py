@@ -3,8 +3,10 @@ TODO.
 """
 
 import random
-from typing import Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Sequence, Optional, Tuple
 
+import numpy as np
 import powerlaw as pl
 
 from pfe.misc.log.misc import percents
@@ -120,3 +122,116 @@ def histogram(data: dict[int, float], bins: Sequence[float]) -> list[float]:
         binned.append(sum(data[x] for x in data if within(x)))
 
     return binned
+
+
+class Comparison:
+    """Pairwise log-likelihood ratio tests between candidate distributions.
+
+    The ratios form an antisymmetric matrix (``ratios[i, j] == -ratios[j, i]``),
+    while the p-values form a symmetric one; the diagonal holds ``(0, 1)``,
+    which is what ``Fit.distribution_compare(a, a)`` returns.
+
+    :param names: names of the compared candidate distributions.
+    :param ratios: a matrix of log-likelihood ratios ``R``, where a positive
+                   ``ratios[i, j]`` means that ``names[i]`` is preferred.
+    :param p_values: a matrix of the significance values of ``R``.
+    """
+
+    __slots__ = ('names', 'ratios', 'p_values')
+
+    def __init__(self, names: Sequence[str], ratios: np.ndarray, p_values: np.ndarray):
+        self.names = list(names)
+        self.ratios = ratios
+        self.p_values = p_values
+
+    def __getitem__(self, pair: Tuple[str, str]) -> Tuple[float, float]:
+        """Returns ``(R, p)`` for the provided pair of names."""
+
+        i = self.names.index(pair[0])
+        j = self.names.index(pair[1])
+
+        return self.ratios[i, j], self.p_values[i, j]
+
+    def __iter__(self) -> Iterable[Tuple[str, str]]:
+        """Returns an iterator over all ordered pairs of names."""
+        return ((a, b) for a in self.names for b in self.names)
+
+
+def _loglikelihoods(fit: pl.Fit, name: str) -> Tuple[pl.Distribution, np.ndarray]:
+    """Fits the candidate distribution ``name`` and computes
+    log-likelihoods of every observation within ``[xmin, xmax]``."""
+
+    distribution = getattr(fit, name)
+    loglikelihoods = np.asarray(distribution.loglikelihoods(fit.data), dtype=np.float64)
+
+    return distribution, loglikelihoods
+
+
+def compare(fit: pl.Fit,
+            names: Optional[Sequence[str]] = None,
+            nested: Optional[bool] = None,
+            processes: Optional[int] = None,
+            log: Log = Nothing()) -> Comparison:
+    """Compares every pair of candidate distributions by
+    the log-likelihood ratio test [1].
+
+    The result is equivalent to calling ``fit.distribution_compare(a, b)``
+    for all ``a`` and ``b`` from ``names``, but every candidate is fitted
+    exactly once and its per-observation log-likelihoods are computed
+    exactly once; all ratios and p-values are then derived from these cached
+    vectors. Fitted candidates are stored back into ``fit``, so that, e.g.,
+    ``fit.power_law`` is not refitted afterwards.
+
+    .. [1] Aaron Clauset, Cosma Rohilla Shalizi, and M. E. J. Newman.
+           "Power-law distributions in empirical data",
+           SIAM Review, 51(4):661–703, November 2009.
+           https://doi.org/10.1137/070710111
+
+    :param fit: an instance of ``powerlaw.Fit``.
+    :param names: names of candidate distributions to compare
+                  (all supported distributions by default).
+    :param nested: whether to assume that candidates are nested; if ``None``,
+                   a pair is considered nested if one of the names contains
+                   the other one, as ``powerlaw`` does.
+    :param processes: the number of processes to fit candidates in;
+                      if ``1``, candidates are fitted in the current process.
+    :param log: an instance of ``Log`` to log steps of execution with.
+
+    :return: the computed ``Comparison``.
+    """
+
+    names = list(names if names is not None else fit.supported_distributions)
+    loglikelihoods = {}
+
+    if processes == 1:
+        for name in names:
+            log.info(f'Fitting `{name}`.')
+
+            _, loglikelihoods[name] = _loglikelihoods(fit, name)
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = {name: pool.submit(_loglikelihoods, fit, name) for name in names}
+
+            for name, future in futures.items():
+                log.info(f'Fitting `{name}`.')
+
+                distribution, loglikelihoods[name] = future.result()
+                setattr(fit, name, distribution)
+
+    ratios = np.zeros((len(names), len(names)))
+    p_values = np.ones((len(names), len(names)))
+
+    for i, a in enumerate(names):
+        for j in range(i + 1, len(names)):
+            b = names[j]
+
+            is_nested = nested
+            if is_nested is None:
+                is_nested = a in b or b in a
+
+            r, p = pl.loglikelihood_ratio(loglikelihoods[a], loglikelihoods[b], nested=is_nested)
+
+            ratios[i, j], ratios[j, i] = r, -r
+            p_values[i, j] = p_values[j, i] = p
+
+    return Comparison(names, ratios, p_values)
@@ -9,6 +9,7 @@ from pfe.misc.plot import Plots, crosses, circles
 from pfe.misc.style import blue
 from pfe.parse import parse, publications_in
 from pfe.tasks.distributions import Distribution, degree_distribution
+from pfe.tasks.hypothesis import compare
 
 
 weighted: bool = False
@@ -157,13 +158,10 @@ if __name__ == '__main__':
             log.warn('`xmax` differs.')
 
     with log.scope.info('Comparing distributions.'), suppress_stderr():
-        comparison = {}
+        comparison = compare(fit, log=log)
 
-        for a in fit.supported_distributions:
-            for b in fit.supported_distributions:
-                comparison[a, b] = fit.distribution_compare(a, b)
-
-                log.info(f'{a:<23} {b:<23} {comparison[a, b]}')
+        for a, b in comparison:
+            log.info(f'{a:<23} {b:<23} {comparison[a, b]}')
 
         with open('COMP' + '-w' * weighted + '-log-likelihood.txt', 'w') as file:
             file.write('\n'.join(f'{a:<23} {b:<23} {comparison[a, b]}'
@@ -0,0 +1,249 @@
+"""
+A compact binary format of partitions of graphs into communities.
+
+A partition file holds the membership array aligned with the dense node
+index (a sorted array of node IDs), the community→members index in the CSR
+format, and metadata (e.g., the algorithm, the seed and the modularity).
+The file consists of a magic string, the length of a JSON header,
+the header (which describes metadata and arrays), and raw arrays aligned
+to 64 bytes, so that arrays are loaded by memory mapping, e.g.,
+::
+
+    Partition.of(nodes, membership, algorithm='louvain', seed=0).save('louvain.partition')
+
+    partition = Partition.load('louvain.partition')
+    members = partition.community(0)
+
+Partitions that are stored in (legacy) JSON files,
+i.e., ``{algorithm}_communities.json`` and ``{algorithm}_author-community.json``,
+can be read with ``read_communities_json`` and ``read_author_community_json``
+(or with ``read``, which prefers the binary file).
+"""
+
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import numpy as np
+
+_MAGIC = b'PFEPART1'
+_ALIGNMENT = 64
+_ARRAYS = ('nodes', 'membership', 'indptr', 'members')
+
+
+class Partition:
+    """A partition of nodes of a graph into communities.
+
+    Members of the community ``c`` are ``nodes[members[indptr[c]:indptr[c + 1]]]``.
+
+    :param nodes: a sorted array of node IDs.
+    :param membership: an array of communities of nodes (aligned with ``nodes``).
+    :param indptr: an array of offsets of communities in ``members``.
+    :param members: an array of positions of nodes in ``nodes`` (grouped by communities).
+    :param metadata: a JSON-serialisable dictionary (e.g., with the algorithm and the seed).
+    """
+
+    __slots__ = ('nodes', 'membership', 'indptr', 'members', 'metadata')
+
+    def __init__(self,
+                 nodes: np.ndarray,
+                 membership: np.ndarray,
+                 indptr: np.ndarray,
+                 members: np.ndarray,
+                 metadata: Optional[dict[str, Any]] = None):
+        self.nodes = nodes
+        self.membership = membership
+        self.indptr = indptr
+        self.members = members
+        self.metadata = metadata or {}
+
+    @classmethod
+    def of(cls, nodes: np.ndarray, membership: np.ndarray, **metadata) -> 'Partition':
+        """Builds a partition from a membership array.
+
+        :param nodes: a sorted array of node IDs.
+        :param membership: a dense membership array aligned with ``nodes``.
+        :param metadata: metadata of the partition (e.g., ``algorithm``, ``seed``, ``modularity``).
+        """
+
+        nodes = np.asarray(nodes, dtype=np.int64)
+        membership = np.asarray(membership, dtype=np.int32)
+
+        if len(nodes) != len(membership):
+            raise ValueError('`nodes` and `membership` must be of the same length.')
+        if len(membership) > 0 and membership.min() < 0:
+            raise ValueError('`membership` must be non-negative.')
+
+        sizes = np.bincount(membership) if len(membership) > 0 else np.zeros(0, dtype=np.int64)
+
+        indptr = np.zeros(len(sizes) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=indptr[1:])
+
+        members = np.argsort(membership, kind='stable').astype(np.int32)
+
+        return cls(nodes, membership, indptr, members, metadata)
+
+    def __len__(self) -> int:
+        """Returns the number of communities."""
+        return len(self.indptr) - 1
+
+    def sizes(self) -> np.ndarray:
+        """Returns the number of members of every community."""
+        return np.diff(self.indptr)
+
+    def community(self, c: int) -> np.ndarray:
+        """Returns node IDs of members of the community ``c``."""
+        return self.nodes[self.members[self.indptr[c]:self.indptr[c + 1]]]
+
+    def communities_of(self, ids: np.ndarray) -> np.ndarray:
+        """Returns communities of nodes with the specified IDs
+        (``-1`` for nodes that are not in the partition)."""
+
+        ids = np.asarray(ids, dtype=np.int64)
+
+        if len(self.nodes) == 0:
+            return np.full(ids.shape, -1, dtype=np.int32)
+
+        positions = np.searchsorted(self.nodes, ids)
+        positions[positions == len(self.nodes)] = 0
+
+        return np.where(self.nodes[positions] == ids, self.membership[positions], -1).astype(np.int32)
+
+    def as_dict(self) -> dict[str, list[int]]:
+        """Returns node IDs of every community in the layout of ``{algorithm}_communities.json``."""
+        return {str(c): self.community(c).tolist() for c in range(len(self))}
+
+    def as_author_dict(self) -> dict[str, int]:
+        """Returns the community of every node in the layout of ``{algorithm}_author-community.json``."""
+        return dict(zip(map(str, self.nodes.tolist()), self.membership.tolist()))
+
+    def save(self, path: Union[str, Path]):
+        """Saves the partition into a binary file (atomically)."""
+
+        arrays = {x: np.ascontiguousarray(getattr(self, x)) for x in _ARRAYS}
+        layout = {}
+        offset = 0
+
+        for name, array in arrays.items():
+            layout[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+            offset += _aligned(array.nbytes)
+
+        header = json.dumps({'metadata': self.metadata, 'arrays': layout}).encode()
+        start = _aligned(len(_MAGIC) + 8 + len(header))
+
+        path = Path(path)
+        temporary = path.with_name(path.name + '.tmp')
+
+        with open(temporary, 'wb') as file:
+            file.write(_MAGIC)
+            file.write(struct.pack('<Q', len(header)))
+            file.write(header)
+
+            for name, array in arrays.items():
+                file.seek(start + layout[name]['offset'])
+                file.write(array.tobytes())
+
+            file.truncate(start + offset)
+
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path], mmap: bool = True) -> 'Partition':
+        """Loads a partition saved with ``save``.
+
+        :param path: the path to the file.
+        :param mmap: whether to map arrays into memory (read-only)
+                     instead of reading them.
+        """
+
+        with open(path, 'rb') as file:
+            if file.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError(f'Not a partition file: "{path}".')
+
+            length, = struct.unpack('<Q', file.read(8))
+            header = json.loads(file.read(length))
+
+        start = _aligned(len(_MAGIC) + 8 + length)
+        arrays = {}
+
+        for name, description in header['arrays'].items():
+            dtype = np.dtype(description['dtype'])
+            shape = tuple(description['shape'])
+            offset = start + description['offset']
+
+            if np.prod(shape) == 0:
+                arrays[name] = np.zeros(shape, dtype=dtype)
+            elif mmap:
+                arrays[name] = np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape)
+            else:
+                arrays[name] = np.fromfile(path, dtype=dtype, count=int(np.prod(shape)), offset=offset).reshape(shape)
+
+        return cls(**arrays, metadata=header['metadata'])
+
+
+def read(directory: Union[str, Path], algorithm: str) -> Partition:
+    """Reads the partition detected by ``algorithm`` from the directory.
+
+    The binary file ``{algorithm}.partition`` is preferred; otherwise,
+    the partition is read from ``{algorithm}_author-community.json``
+    or ``{algorithm}_communities.json`` (in this order).
+    """
+
+    directory = Path(directory)
+
+    if (path := directory / f'{algorithm}.partition').exists():
+        return Partition.load(path)
+    if (path := directory / f'{algorithm}_author-community.json').exists():
+        return read_author_community_json(path, algorithm=algorithm)
+    if (path := directory / f'{algorithm}_communities.json').exists():
+        return read_communities_json(path, algorithm=algorithm)
+
+    raise FileNotFoundError(f'No partition of `{algorithm}` in "{directory}".')
+
+
+def read_communities_json(path: Union[str, Path], **metadata) -> Partition:
+    """Reads a partition from a JSON file that maps
+    a community to a list of its members (e.g., ``louvain_communities.json``)."""
+
+    with open(path, 'r') as file:
+        communities = json.load(file)
+
+    sizes = [len(x) for x in communities.values()]
+
+    ids = np.fromiter((int(x) for members in communities.values() for x in members), dtype=np.int64, count=sum(sizes))
+    labels = np.repeat(np.fromiter((int(x) for x in communities), dtype=np.int64, count=len(sizes)), sizes)
+
+    return _of(ids, labels, metadata)
+
+
+def read_author_community_json(path: Union[str, Path], **metadata) -> Partition:
+    """Reads a partition from a JSON file that maps
+    an author ID to its community (e.g., ``louvain_author-community.json``)."""
+
+    with open(path, 'r') as file:
+        communities = json.load(file)
+
+    ids = np.fromiter((int(x) for x in communities.keys()), dtype=np.int64, count=len(communities))
+    labels = np.fromiter((int(x) for x in communities.values()), dtype=np.int64, count=len(communities))
+
+    return _of(ids, labels, metadata)
+
+
+def _of(ids: np.ndarray, labels: np.ndarray, metadata: dict[str, Any]) -> Partition:
+    """Builds a partition from (unsorted) node IDs and their communities.
+
+    Labels of communities are kept; if a node is listed several times,
+    its last community is taken.
+    """
+
+    nodes, last = np.unique(ids[::-1], return_index=True)
+    labels = labels[::-1][last]
+
+    return Partition.of(nodes, labels, **metadata)
+
+
+def _aligned(size: int) -> int:
+    """Rounds the size up to the alignment of arrays."""
+    return -(-size // _ALIGNMENT) * _ALIGNMENT
@@ -1,4 +1,3 @@
-import json
 from collections import Counter
 from pathlib import Path
 
@@ -7,6 +6,7 @@ import matplotlib.pyplot as plt
 from pfe.misc.log import Pretty
 from pfe.misc.log.misc import percents
 from pfe.misc.style import blue, bold, gray
+from pfe.tasks.partition import read
 
 if __name__ == '__main__':
     log = Pretty()
@@ -15,10 +15,9 @@ if __name__ == '__main__':
     data = Path('../../../data/graph/ig')
 
     with log.scope.info('Reading communities.'):
-        with open(data / 'leiden_communities.json', 'r') as file:
-            communities = json.load(file)
-            communities = [(x, len(y)) for x, y in communities.items()]
-            communities.sort(key=lambda x: x[1], reverse=True)  # Sort by community sizes.
+        communities = read(data, 'leiden').as_dict()
+        communities = [(x, len(y)) for x, y in communities.items()]
+        communities.sort(key=lambda x: x[1], reverse=True)  # Sort by community sizes.
 
     sizes = Counter(y for _, y in communities)
     total = sum(y for _, y in communities)
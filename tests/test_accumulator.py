@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from pfe.tasks.distributions import Accumulator
+
+
+def test_negative_counts_are_rejected():
+    with pytest.raises(ValueError):
+        Accumulator().add_many([3], [-5])
+
+
+def test_counts_must_match_values():
+    with pytest.raises(ValueError):
+        Accumulator().add_many([1, 2], [1])
+
+
+def test_counts_are_exact():
+    large = 2 ** 60 + 1
+    accumulator = Accumulator().add_many([3, 3], [large, 1])
+
+    assert accumulator.size() == large + 1
+    assert accumulator.distribution().as_dict() == {3: large + 1}
+
+
+def test_sums_of_sketched_values_are_exact():
+    value, count = 2 ** 40 + 1, 2 ** 20 + 1
+    accumulator = Accumulator(threshold=10).add_many([value], [count])
+
+    assert int(accumulator._sums.sum()) == value * count
+    assert accumulator.distribution().as_dict() == {value: count}
+
+
+def test_merge_equals_single_pass():
+    random = np.random.default_rng(0)
+    values = random.integers(0, 1000, 500)
+
+    merged = Accumulator(threshold=100).add_many(values[:200]).merge(Accumulator(threshold=100).add_many(values[200:]))
+
+    assert merged.to_bytes() == Accumulator(threshold=100).add_many(values).to_bytes()
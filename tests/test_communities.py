@@ -0,0 +1,126 @@
+import sys
+
+import networkx as nx
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from pfe.tasks.communities import (ALGORITHMS, adjacency_of, align, arrays_of, carried, louvain, modularity,
+                                  temporal, without_singletons)
+
+
+def test_without_singletons():
+    nodes = np.array([10, 11, 12, 13, 14, 15])
+    membership = np.array([0, 2, 0, 1, 1, 3])
+
+    kept, communities = without_singletons(nodes, membership)
+
+    np.testing.assert_array_equal(kept, [10, 12, 13, 14])
+    np.testing.assert_array_equal(communities, [0, 0, 1, 1])
+
+
+def two_cliques() -> sp.csr_matrix:
+    edges = [(u, v) for clique in (range(0, 5), range(5, 10)) for u in clique for v in clique if u < v] + [(4, 5)]
+    edges = np.array(edges, dtype=np.int32)
+
+    return adjacency_of(10, edges, np.ones(len(edges)))
+
+
+def test_louvain_finds_cliques():
+    membership = louvain(two_cliques(), seed=0)
+
+    assert len(set(membership[:5])) == 1 and len(set(membership[5:])) == 1
+    assert membership[0] != membership[9]
+
+
+def test_louvain_moves_nodes_out_of_initial_communities():
+    initial = np.array([1, 0, 0, 0, 0, 1, 1, 1, 1, 1])
+
+    membership = louvain(two_cliques(), seed=0, initial=initial)
+
+    assert membership[0] == membership[1] != membership[9]
+
+
+def test_louvain_repairs_misplaced_nodes_of_initial_partition():
+    graph = nx.planted_partition_graph(8, 30, 0.3, 0.01, seed=1)
+
+    nodes, edges, weights = arrays_of(graph)
+    adjacency = adjacency_of(len(nodes), edges, weights)
+
+    cold = louvain(adjacency, seed=0)
+
+    # Every tenth node is put into a wrong community.
+    initial = cold.copy()
+    initial[::10] = (initial[::10] + 1) % (cold.max() + 1)
+
+    warm = louvain(adjacency, seed=0, initial=initial)
+
+    assert modularity((nodes, edges, weights), warm) > modularity((nodes, edges, weights), initial)
+    assert modularity((nodes, edges, weights), warm) >= modularity((nodes, edges, weights), cold) - 1e-9
+
+
+def test_leiden_restores_the_generator_of_igraph(monkeypatch):
+    import random
+    import types
+
+    from pfe.tasks import communities
+
+    generators = []
+
+    class Graph:
+        def __init__(self, n, edges):
+            pass
+
+        def community_leiden(self, **parameters):
+            raise RuntimeError
+
+    igraph = types.SimpleNamespace(Graph=Graph, set_random_number_generator=generators.append)
+    monkeypatch.setitem(sys.modules, 'igraph', igraph)
+
+    with pytest.raises(RuntimeError):
+        communities._leiden(2, np.array([[0, 1]]), np.ones(1), seed=0)
+
+    assert isinstance(generators[0], random.Random) and generators[-1] is random
+
+
+def test_carried():
+    membership = carried(np.array([1, 3, 5]), np.array([0, 1, 2]), np.array([0, 1, 2, 5, 9]))
+
+    np.testing.assert_array_equal(membership, [-1, 0, -1, 2, -1])
+
+
+def test_align_follows_previous_labels():
+    previous = np.array([7, 7, 3, 3, -1])
+    membership = np.array([1, 1, 0, 0, 2])
+
+    np.testing.assert_array_equal(align(membership, previous), [7, 7, 3, 3, 8])
+    np.testing.assert_array_equal(align(membership, previous, label=20), [7, 7, 3, 3, 20])
+
+
+def test_temporal_carries_labels_and_never_reuses_them(monkeypatch):
+    # Communities of growing snapshots: in the second one, the community
+    # with the highest label is merged into another one, and in the third one,
+    # a new community appears.
+    detected = {6: [[0, 1], [2, 3], [4, 5]], 6.5: [[0, 1], [2, 3, 4, 5]], 8: [[0, 1], [2, 3, 4, 5], [6, 7]]}
+    snapshots = []
+
+    for key, communities in detected.items():
+        nodes = np.arange(sum(map(len, communities)))
+        edges = np.array([(u, v) for c in communities for u in c for v in c if u < v], dtype=np.int32)
+        snapshots.append((nodes, edges, np.full(len(edges), key)))
+
+    def algorithm(n, edges, weights, seed, initial=None):
+        membership = np.empty(n, dtype=np.int32)
+
+        for i, c in enumerate(detected[weights[0]]):
+            membership[c] = i
+
+        return membership
+
+    monkeypatch.setitem(ALGORITHMS, 'fixed', algorithm)
+
+    first, second, third = temporal(snapshots, 'fixed')
+
+    np.testing.assert_array_equal(first, [0, 0, 1, 1, 2, 2])
+    np.testing.assert_array_equal(second, [0, 0, 1, 1, 1, 1])
+    np.testing.assert_array_equal(third, [0, 0, 1, 1, 1, 1, 3, 3])
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from pfe.tasks.contingency import Contingency
+from pfe.tasks.partition import Partition
+
+
+def random_partition(random: np.random.Generator, nodes: np.ndarray, c: int) -> Partition:
+    membership = random.integers(0, c, len(nodes))
+    membership[:c] = np.arange(c)
+
+    return Partition.of(nodes, membership)
+
+
+@pytest.fixture
+def partitions():
+    random = np.random.default_rng(0)
+
+    # Nodes of 2018 and of the year only partially overlap.
+    x = random_partition(random, np.arange(0, 300), 12)
+    y = random_partition(random, np.arange(100, 350, 2), 9)
+
+    return x, y
+
+
+def as_sets(partition: Partition) -> list[set[int]]:
+    return [set(partition.community(c).tolist()) for c in range(len(partition))]
+
+
+def test_containment_matches_loop(partitions):
+    x, y = partitions
+    a, b = as_sets(x), as_sets(y)
+
+    # `difference_matrix_by_year_members` and `difference_matrix_leiden_louvain`.
+    by_year = np.array([[len(q & (p & set(y.nodes.tolist()))) / len(q) for q in b] for p in a])
+    by_rows = np.array([[len(p & q) / len(p) for q in b] for p in a])
+
+    table = Contingency.of(x, y)
+
+    np.testing.assert_allclose(table.containment(rows=False).toarray(), by_year)
+    np.testing.assert_allclose(table.containment().toarray(), by_rows)
+
+
+def test_jaccard_matches_loop(partitions):
+    x, y = partitions
+    a, b = as_sets(x), as_sets(y)
+
+    def jaccard(p: set, q: set) -> float:
+        return len(p & q) / len(p | q)
+
+    # `difference_matrix_by_year_members_jaccard`: communities of 2018
+    # are restricted to nodes of the year.
+    restricted = np.array([[jaccard(p & set(y.nodes.tolist()), q) for q in b] for p in a])
+    full = np.array([[jaccard(p, q) for q in b] for p in a])
+
+    table = Contingency.of(x, y)
+
+    np.testing.assert_allclose(table.restricted(columns=False).jaccard().toarray(), restricted)
+    np.testing.assert_allclose(table.jaccard().toarray(), full)
+
+
+def test_partition_measures_only_count_shared_nodes(partitions):
+    x, y = partitions
+    shared = np.intersect1d(x.nodes, y.nodes)
+
+    table = Contingency.of(x, y)
+    arrays = Contingency.of(x.communities_of(shared), y.communities_of(shared))
+
+    assert len(table) == len(shared)
+    assert table.nmi() == pytest.approx(arrays.nmi())
+    assert table.ari() == pytest.approx(arrays.ari())
+    assert table.vi() == pytest.approx(arrays.vi())
+
+
+def test_identical_partitions():
+    membership = np.array([0, 0, 1, 1, 2])
+    table = Contingency.of(membership, membership)
+
+    assert (table.nmi(), table.ari(), table.vi()) == (pytest.approx(1), pytest.approx(1), pytest.approx(0))
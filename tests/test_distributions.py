@@ -0,0 +1,46 @@
+import os
+import pickle
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from pfe.misc import distributions
+from pfe.misc.rng import Random
+
+
+def test_cardinality_is_abstract():
+    with pytest.raises(TypeError):
+        distributions.Cardinality()
+
+
+def test_normal_never_draws_below_minimum():
+    distribution = distributions.normal(0, 3)
+
+    assert distribution.sample(10_000, Random()).min() >= 2
+    assert min(distribution(Random()) for _ in range(1_000)) >= 2
+
+
+def test_normal_minimum_is_configurable():
+    distribution = distributions.normal(-5, 1, minimum=1)
+
+    assert np.all(distribution.sample(1_000, Random()) == 1)
+
+    with pytest.raises(ValueError):
+        distributions.normal(3, 1, minimum=0)
+
+
+def test_normal_is_picklable():
+    distribution = pickle.loads(pickle.dumps(distributions.normal(4, 2, minimum=3)))
+
+    assert (distribution.loc, distribution.scale, distribution.minimum) == (4, 2, 3)
+
+
+def test_distributions_do_not_import_tasks():
+    code = 'import sys, pfe.misc.distributions; print(any(x.startswith("pfe.tasks") for x in sys.modules))'
+    output = subprocess.run([sys.executable, '-c', code],
+                            env={**os.environ, 'PYTHONPATH': os.pathsep.join(sys.path)},
+                            capture_output=True, text=True, check=True).stdout
+
+    assert output.strip() == 'False'
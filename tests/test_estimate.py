@@ -0,0 +1,61 @@
+import dataclasses
+
+import numpy as np
+import pytest
+
+from pfe.models import registry
+from pfe.tasks.estimate import estimate
+
+MODELS = ['graph_cutoff', 'hypergraph_regular', 'hypergraph_cutoff', 'hypergraph_communities']
+
+
+def publication(i: int, date: str, *authors: int) -> dict:
+    return {'id': i, 'date': date, 'authors': [{'id': x} for x in authors]}
+
+
+@pytest.mark.parametrize('model', MODELS)
+def test_single_publication_is_rejected(model):
+    with pytest.raises(ValueError):
+        estimate(model, [publication(1, '2000-01-01', 1, 2, 3)])
+
+
+def test_hypergraph_regular():
+    parameters = estimate('hypergraph_regular', [publication(1, '2000-01-01', 1, 2),
+                                                 publication(2, '2000-02-01', 2, 3),
+                                                 publication(3, '2000-03-01', 1, 3),
+                                                 publication(4, '2000-04-01', 3, 4)])
+
+    assert (parameters.n0, parameters.n, parameters.p) == (2, 4, pytest.approx(2 / 3))
+
+
+def stream() -> list[dict]:
+    random = np.random.default_rng(0)
+    publications = [publication(0, '2000-01-01', 0, 1, 2)]
+    authors = 3
+
+    for i in range(1, 400):
+        new = int(random.integers(0, 3)) if random.uniform() < 0.4 else 0
+        old = random.choice(authors, size=int(random.integers(1, 4)), replace=False).tolist()
+
+        date = str(np.datetime64('2000-01-01') + i * 5)
+        publications.append(publication(i, date, *old, *range(authors, authors + new)))
+        authors += new
+
+    return publications
+
+
+def test_node_events_are_new_authors():
+    parameters = estimate('hypergraph_regular', [publication(1, '2000-01-01', 1, 2),
+                                                 publication(2, '2000-02-01', 2, 3, 4, 5),
+                                                 publication(3, '2000-03-01', 1, 3)])
+
+    # Three node events (one per new author) and a single edge event.
+    assert parameters.p == pytest.approx(3 / 4)
+
+
+@pytest.mark.parametrize('model', MODELS)
+def test_estimates_are_valid(model):
+    parameters = estimate(model, stream(), window=30)
+
+    # Parameters are validated on construction.
+    assert isinstance(dataclasses.replace(parameters), registry.MODELS[model])
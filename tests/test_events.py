@@ -0,0 +1,36 @@
+import numpy as np
+
+from pfe.tasks.estimate import chronological, statistics
+from pfe.tasks.events import Events, replay
+
+
+def publications() -> list[dict]:
+    authors = [[1, 2], [2, 3], [1], [4, 5, 1], [3], [6, 2]]
+    dates = ['2000-01-01', '2000-06-01', '2001-01-01', '2001-03-01', '2002-09-01', '2003-01-01']
+
+    return [{'id': i, 'date': date, 'authors': [{'id': x} for x in ids]}
+            for i, (date, ids) in enumerate(zip(dates, authors))]
+
+
+def test_replay_agrees_with_statistics():
+    authorship, dates = chronological(publications())
+    counted = statistics(authorship, dates, window=365)
+
+    nodes, edges, deactivations = replay(publications(), window=365).counts().tolist()
+
+    assert (nodes, edges, deactivations) == (counted.authors, counted.publications, counted.deactivations)
+
+
+def test_every_author_is_introduced_before_their_edges():
+    events = replay(publications(), window=365)
+    seen = set()
+
+    for i in range(len(events)):
+        members = events.members[events.indptr[i]:events.indptr[i + 1]].tolist()
+
+        if events.kinds[i] == Events.NODE:
+            seen.update(members)
+        else:
+            assert seen.issuperset(members)
+
+    np.testing.assert_array_equal(events.degrees(), [3, 3, 2, 1, 1, 1])
@@ -0,0 +1,43 @@
+import networkx as nx
+import numpy as np
+
+from pfe.models.incidence import EdgeList
+
+
+def edges_with_repetitions() -> EdgeList:
+    edges = EdgeList(nodes=5)
+
+    for u, v in [(0, 1), (1, 0), (0, 1), (1, 2), (2, 3), (3, 3), (3, 3)]:
+        edges.append(u, v)
+
+    return edges
+
+
+def test_degree_counts_distinct_neighbours():
+    edges = edges_with_repetitions()
+    expected = np.array([d for _, d in sorted(edges.to_networkx().degree)])
+
+    np.testing.assert_array_equal(edges.degree, expected)
+    np.testing.assert_array_equal(edges.degree, [1, 2, 2, 3, 0])
+
+
+def test_number_of_edges_counts_distinct_edges():
+    edges = edges_with_repetitions()
+
+    assert edges.number_of_edges() == edges.to_networkx().number_of_edges() == 4
+    assert edges.number_of_multiedges() == len(edges) == 7
+
+
+def test_multidegree_counts_repeated_edges():
+    np.testing.assert_array_equal(edges_with_repetitions().multidegree, [3, 4, 2, 5, 0])
+
+
+def test_degree_survives_saving(tmp_path):
+    edges = edges_with_repetitions()
+    edges.save(tmp_path / 'edges.npz')
+
+    loaded = EdgeList.load(tmp_path / 'edges.npz')
+
+    np.testing.assert_array_equal(loaded.degree, edges.degree)
+    np.testing.assert_array_equal(loaded.multidegree, edges.multidegree)
+    assert nx.utils.graphs_equal(loaded.to_networkx(), edges.to_networkx())
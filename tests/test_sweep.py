@@ -0,0 +1,39 @@
+import sqlite3
+
+import pytest
+
+from pfe.models import sweep as runner
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    opened = []
+    connect = sqlite3.connect
+
+    class Connection(sqlite3.Connection):
+        closed = False
+
+        def close(self):
+            self.closed = True
+            super().close()
+
+    def tracked(*args, **kwargs):
+        opened.append(connection := connect(*args, factory=Connection, **kwargs))
+        return connection
+
+    monkeypatch.setattr(runner.sqlite3, 'connect', tracked)
+
+    return opened
+
+
+def test_sweep_and_results_close_connections(tmp_path, connections):
+    path = tmp_path / 'runs.sqlite'
+    design = {'m': 5, 'p': 0.3, 'q': 0.9, 'k': 500}
+
+    assert runner.sweep('graph_cutoff', [design], path, replicas=2, processes=1, fit=False) == 2
+    assert runner.sweep('graph_cutoff', [design], path, replicas=2, processes=1, fit=False) == 0
+
+    summaries = runner.results(path, 'graph_cutoff')
+
+    assert [x.replica for x in summaries] == [0, 1]
+    assert connections and all(x.closed for x in connections)